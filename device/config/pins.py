@@ -1,5 +1,4 @@
 # device/config/pins.py
-from machine import Pin, SoftI2C
 
 COMPRESSOR_A_PIN = [27,12]    #    – Compresor A
 COMPRESSOR_B_PIN = [14,13]    #    – Compresor B
@@ -9,12 +8,20 @@ BUTTON_PIN = 19          # IO19 – Botón
 
 SCL_PIN = 23
 SDA_PIN = 21
+I2C_ID = 0
+# El PCF8574 del LCD está especificado a 100 kHz, pero los módulos habituales
+# funcionan a 400 kHz; si la pantalla muestra basura, bajar a 100_000.
+I2C_FREQ = 400_000
 
 MODE_SW1_PIN = 25    # Pin para activar el MODO DEMO
 MODE_SW2_PIN = 26    # Pin de repuesto para futuros modos
 
 PH_PIN = 32          # Sensor de PH
 OXIGENO_PIN = 33     # Sensor de Oxígeno
+FLOW_PIN = 18        # Caudalímetro YF-B1 (pulsos)
+ADS_ALERT_PIN = None # ALERT/RDY del ADS1115 (None = sondear el registro de config)
 
 def i2c():
-    return SoftI2C(scl=Pin(SCL_PIN), sda=Pin(SDA_PIN))
+    """Bus I2C compartido (ver utils/i2c_bus.py)."""
+    from utils.i2c_bus import bus
+    return bus()
@@ -1,7 +1,20 @@
 # device/config/runtime.py
 
+# Ciclo fijo de la bomba; solo se usa si la tabla de bombeo
+# (pump_schedule.json, editable desde /api/control) está vacía.
 AUTO_PUMP_INTERVAL_MIN = 180
 AUTO_PUMP_DURATION_MIN = 10
 COMPRESSOR_CYCLE_HOURS = 2
 
 DEMO_TIME_FACTOR = 60
+
+# Nivel de registro por módulo (los que usan utils.logger.get(nombre)).
+# p. ej. {"readings": "WARNING"} silencia el resumen periódico de lecturas.
+LOG_LEVELS = {}
+
+# Destinos del log: nivel mínimo que llega a la flash y a la consola, y
+# destinos opcionales (utils/log_sinks.py) que envían sin bloquear.
+LOG_FLASH_LEVEL = "DEBUG"
+LOG_CONSOLE_LEVEL = "DEBUG"
+LOG_SYSLOG = None          # p. ej. ("192.168.4.2", 514, "INFO")
+LOG_UART = None            # p. ej. (1, 115200, 17, "INFO"): UART, baudios, pin TX, nivel
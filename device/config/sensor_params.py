@@ -1,8 +1,57 @@
 # device/config/sensor_params.py
 
 ENABLE_RS485 = True
+ENABLE_FLOW_METER = True
+
+# Caudalímetro YF-B1: f (Hz) = 11 * Q (L/min) -> 660 pulsos por litro
+FLOW_PULSES_PER_L = 660
+DOSE_MAX_S = 1800          # corte de seguridad de una dosis por volumen
+DOSE_NO_FLOW_S = 20        # sin pulsos en este tiempo -> bomba en seco / sensor caído
 
 # RS484 sensor
 RS485_TX = 1
 RS485_RX = 3
 RS485_DE_RE = 22
+RS485_BAUDRATE = 9600
+RS485_TIMEOUT_MS = 300     # espera máxima del primer byte de respuesta
+RS485_LEVEL_ADDR = 1       # dirección Modbus del sensor de nivel
+
+# Planificación por fuente: (periodo en s, timeout en ms)
+SENSOR_SCHEDULE = {
+    "ph":    (2, 200),       # ADC interno, señal rápida
+    "do":    (2, 200),
+    "gas":   (15, 500),      # ADS1115 por I2C
+    "rs485": (60, 3000),     # nivel + temperatura, 3 intentos Modbus
+    "flow":  (1, 100),       # contador de pulsos; solo lectura del contador
+}
+
+# Muestreo adaptativo (el periodo de SENSOR_SCHEDULE es el inicial):
+# (periodo mín s, periodo máx s, cambio máx por minuto, desviación típica máx)
+SENSOR_ADAPTIVE = {
+    "ph":    (1, 60, 0.05, 0.02),      # pH
+    "do":    (1, 60, 0.2, 0.1),        # mg/L
+    "rs485": (15, 600, 1.0, 0.5),      # cm / °C
+}
+
+# ADC interno: ráfaga por lectura (muestras, "median" | "trimmed", recorte por extremo)
+ADC_OVERSAMPLE = {
+    "ph": (32, "trimmed", 8),
+    "do": (32, "median", 0),
+}
+# Filtro sobre la salida de cada ráfaga (en cuentas del ADC):
+# ("ema", alpha) | ("kalman", q, r) | None
+ADC_FILTER = {
+    "ph": ("kalman", 0.5, 16.0),
+    "do": ("ema", 0.3),
+}
+
+# Calibración de fábrica por canal: ((crudo mín, crudo máx), [(crudo, valor), ...]).
+# Los puntos se pueden sustituir desde /api/calibration (se guardan en
+# calibration.json). pH: 3.5 pH/V sobre 3.3 V a fondo de escala (4095).
+CALIBRATION = {
+    "ph":  ((0, 4095), [(0, 0.0), (4095, 11.55)]),
+    "do":  ((0, 4095), [(0, 0.0), (3722, 20.0)]),          # mg/L
+    "nh3": ((0, 32767), [(0, 1.0), (32767, 300.0)]),       # ppm, ADS1115
+    "h2s": ((0, 32767), [(0, 0.5), (32767, 50.0)]),
+}
+CAL_LUT_CELLS = 128    # celdas por tabla compilada
@@ -4,28 +4,83 @@ import uasyncio as asyncio
 from machine import Pin
 from config.pins import BUTTON_PIN
 from hw.relay_controller import controller as relays
-from utils.logger import info, debug
+from utils import logger
 
-_POLL_MS      = 10      # periodo de sondeo
-_DEBOUNCE_MS  = 30      # tiempo estable requerido (≥30 ms)
+_log = logger.get("button")
+
+_DEBOUNCE_MS  = 30      # tiempo estable requerido (≥30 ms)
+_LONG_MS      = 1500    # pulsación larga
+_DOUBLE_MS    = 400     # ventana para la segunda pulsación
+
+PRESS  = "press"
+DOUBLE = "double"
+LONG   = "long"
 
 class Button:
+    """Pulsador activo-bajo atendido por interrupción.
+
+    La IRQ solo activa una ThreadSafeFlag; la corrutina despierta en cada
+    flanco, filtra rebotes y reconoce pulsación simple, doble y larga. Sin
+    actividad en el pin no hay ningún despertar del bucle.
+    """
+
     def __init__(self, pin_no: int = BUTTON_PIN):
         self._pin   = Pin(pin_no, Pin.IN, Pin.PULL_UP)
+        self._flag  = asyncio.ThreadSafeFlag()
         self._last  = self._pin.value()
+        self._actions = {PRESS: relays.toggle_pump}
+        self.stats = {"edges": 0, PRESS: 0, DOUBLE: 0, LONG: 0}
 
-    async def run(self):
+    def on(self, gesture, fn):
+        """Asocia `fn()` a PRESS, DOUBLE o LONG (None la desactiva)."""
+        self._actions[gesture] = fn
+
+    def _irq(self, pin):
+        self._flag.set()
+
+    async def _edge(self, timeout_ms=None):
+        """Espera el siguiente cambio estable del pin y devuelve su nivel,
+        o None si vence `timeout_ms`."""
         while True:
+            if timeout_ms is None:
+                await self._flag.wait()
+            else:
+                try:
+                    await asyncio.wait_for_ms(self._flag.wait(), timeout_ms)
+                except asyncio.TimeoutError:
+                    return None
+            self.stats["edges"] += 1
+            await asyncio.sleep_ms(_DEBOUNCE_MS)
             val = self._pin.value()
-            if val != self._last:                # cambio detectado
-                await asyncio.sleep_ms(_DEBOUNCE_MS)
-                if self._pin.value() == val:     # estable
-                    if val == 0:                 # pulsador activo‑bajo
-                        relays.toggle_pump()
-                        info("Button → pump toggled")
-                    else:
-                        debug("Button released")
-                    self._last = val
-            await asyncio.sleep_ms(_POLL_MS)
+            if val != self._last:                # estable tras el rebote
+                self._last = val
+                return val
+
+    def _fire(self, gesture):
+        self.stats[gesture] += 1
+        fn = self._actions.get(gesture)
+        _log.info("Button → %s", gesture)
+        if fn:
+            fn()
+
+    async def run(self):
+        self._pin.irq(handler=self._irq, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+        while True:
+            if await self._edge() != 0:          # pulsador activo‑bajo
+                continue
+            # Pulsado: si no se suelta a tiempo es una pulsación larga.
+            if await self._edge(_LONG_MS) is None:
+                self._fire(LONG)
+                while await self._edge() != 1:
+                    pass
+                continue
+            # Soltado: una segunda pulsación en la ventana la hace doble.
+            if DOUBLE in self._actions and await self._edge(_DOUBLE_MS) == 0:
+                self._fire(DOUBLE)
+                while await self._edge() != 1:
+                    pass
+                continue
+            self._fire(PRESS)
+            _log.debug("Button released")
 
 button = Button()
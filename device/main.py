@@ -3,14 +3,23 @@
 import uasyncio
 import time
 import gc
-from utils.logger import info, error
+from utils.logger import info, error, flush as flush_log
 import system_state
+from utils.supervisor import supervisor
+from utils import logger
+from config import runtime
+
+for _module, _level in runtime.LOG_LEVELS.items():
+    logger.set_level(_level, _module)
+logger.set_sink_level("flash", runtime.LOG_FLASH_LEVEL)
+logger.set_sink_level("console", runtime.LOG_CONSOLE_LEVEL)
 
 CURRENT_MODE = system_state.get_mode()
 
 if CURRENT_MODE == 'PROGRAM':
     info("Modo PROGRAM activo. No se inician tareas ni WDT.")
     info("REPL disponible para programación.")
+    flush_log()
 
 else:
     from machine import WDT
@@ -23,7 +32,36 @@ else:
     except Exception as e:
         error(f"No se pudo iniciar el watchdog: {e}")
     
+    _RESET_CONFIRM_MS = 10000
+
+    def _wire_button(button, display_task, web_server):
+        """Doble pulsación: cambia de página. Pulsación larga: pide
+        confirmación y una segunda larga antes de 10 s reinicia el conteo."""
+        armed = [None]
+
+        def long_press():
+            t = armed[0]
+            if t is not None and time.ticks_diff(time.ticks_ms(), t) < _RESET_CONFIRM_MS:
+                armed[0] = None
+                try:
+                    web_server.reset_inoculation()
+                    display_task.notify("Conteo reiniciado", "", 5)
+                except Exception as e:
+                    error(f"Botón: no se pudo reiniciar el conteo: {e}")
+            else:
+                armed[0] = time.ticks_ms()
+                info("Botón: reinicio de inoculación armado.")
+                display_task.notify("Reiniciar conteo?", "Mantener de nuevo", _RESET_CONFIRM_MS // 1000)
+
+        button.button.on(button.DOUBLE, display_task.next_page)
+        button.button.on(button.LONG, long_press)
+
     async def main():
+        supervisor.spawn("log_flush", logger.flusher, critical=False)
+        from utils import log_sinks
+        for sink in log_sinks.from_config(runtime):
+            logger.add_sink(sink)
+            supervisor.spawn("log_" + sink.name, sink.run, critical=False)
         import web_server
         from tasks import display_task 
     
@@ -46,7 +84,7 @@ else:
         if CURRENT_MODE == 'EMERGENCY':
             info("!!! MODO EMERGENCIA ACTIVADO !!!")
             from tasks import control_task
-            uasyncio.create_task(control_task._compressor_loop())
+            control_task.start(start_timestamp, pump=False)
         
         elif CURRENT_MODE == 'WORKING' or CURRENT_MODE == 'DEMO':
             info(f"Iniciando tareas de operación {CURRENT_MODE}...")
@@ -55,7 +93,7 @@ else:
             gc.collect()
             info(f"Memoria libre: {gc.mem_free()} bytes")
             
-            uasyncio.create_task(web_server.start_server())
+            supervisor.spawn("web", lambda w: web_server.start_server())
             
             await uasyncio.sleep(2)
     
@@ -64,18 +102,20 @@ else:
             from tasks import control_task, sensor_task
             
             info("Iniciando tareas de bajo nivel (sensores, control, display)...")
-            control_task.start()
+            control_task.start(start_timestamp)
             display_task.start()
             sensor_task.start()
-            uasyncio.create_task(button.button.run())
+            _wire_button(button, display_task, web_server)
+            supervisor.spawn("button", lambda w: button.button.run(), critical=False)
+            from utils import loop_monitor
+            supervisor.spawn("loop_monitor", loop_monitor.monitor.run, critical=False)
             
             info("Todas las tareas principales han sido lanzadas.")
     
-        info("Entrando en bucle principal (alimentando WDT).")
-        while True:
-            if wdt:
-                wdt.feed()
-            await uasyncio.sleep(60)
+        # El WDT solo se alimenta mientras las tareas críticas den señales
+        # de vida; una tarea colgada acaba reiniciando la placa.
+        info("Entrando en bucle principal (supervisor y WDT).")
+        await supervisor.run(wdt)
     
     try:
         uasyncio.run(main())
@@ -83,3 +123,4 @@ else:
         info("Sistema detenido por el usuario.")
     finally:
         info("Finalizando ejecución.")
+        flush_log()
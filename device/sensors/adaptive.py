@@ -0,0 +1,53 @@
+# device/sensors/adaptive.py
+
+_ALPHA = 0.2    # peso de la última muestra en la media/varianza exponencial
+
+
+class AdaptiveRate:
+    """Periodo de muestreo guiado por la propia señal.
+
+    Mientras los campos estén quietos el periodo se duplica hasta `max_s`;
+    en cuanto la velocidad de cambio (unidades/minuto) supera `rate_per_min`
+    o la desviación típica reciente supera `std_max`, vuelve a `min_s`.
+    """
+
+    def __init__(self, fields, min_s, max_s, rate_per_min, std_max):
+        self.fields = fields
+        self.min_ms = int(min_s * 1000)
+        self.max_ms = int(max_s * 1000)
+        self.rate_per_min = rate_per_min
+        self.var_max = std_max * std_max
+        n = len(fields)
+        self._last = [None] * n
+        self._mean = [None] * n
+        self._var = [0.0] * n
+
+    def update(self, data, period_ms, dt_ms):
+        """Incorpora una lectura tomada `dt_ms` después de la anterior y
+        devuelve el periodo a aplicar a partir de ahora."""
+        moving = False
+        for i in range(len(self.fields)):
+            v = data.get(self.fields[i])
+            if v is None:
+                continue
+            last = self._last[i]
+            if last is not None and dt_ms > 0:
+                if abs(v - last) * 60000 / dt_ms > self.rate_per_min:
+                    moving = True
+            self._last[i] = v
+            mean = self._mean[i]
+            if mean is None:
+                self._mean[i] = v
+                continue
+            d = v - mean
+            self._mean[i] = mean + _ALPHA * d
+            var = (1 - _ALPHA) * (self._var[i] + _ALPHA * d * d)
+            self._var[i] = var
+            if var > self.var_max:
+                moving = True
+        if moving:
+            return self.min_ms
+        return min(period_ms * 2, self.max_ms)
+
+    def is_fast(self, period_ms):
+        return period_ms <= self.min_ms
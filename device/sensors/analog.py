@@ -0,0 +1,89 @@
+# device/sensors/analog.py
+
+from machine import Pin, ADC
+from utils.logger import info, error
+from config import pins, sensor_params
+from utils.drivers.ads1x15 import ADS1115
+from sensors.registry import Source, sync
+from sensors.filters import Oversampler, make_filter
+from sensors import calibration
+from utils.loop_monitor import timed
+
+gain_index = 1
+_GAS_CHANNELS = ((0, None), (1, None))   # NH3 en AIN0, H2S en AIN1
+
+class HybridAnalogSensors:
+    def __init__(self, i2c_bus, gain_index_val=1):
+        try:
+            self._bus = i2c_bus
+            self.adc_mux = ADS1115(i2c_bus, gain=gain_index_val)
+            if pins.ADS_ALERT_PIN is not None:
+                self.adc_mux.ready_pin(Pin(pins.ADS_ALERT_PIN, Pin.IN, Pin.PULL_UP))
+            self._gas_raw = [0, 0]
+            info(f"Sensor ADC ADS1115 (NH3/S2H) inicializado.")
+
+            self.adc_ph = ADC(Pin(pins.PH_PIN))
+            self.adc_ph.atten(ADC.ATTN_11DB)
+            self._ph = Oversampler(self.adc_ph, *sensor_params.ADC_OVERSAMPLE["ph"])
+            self._ph_filter = make_filter(sensor_params.ADC_FILTER.get("ph"))
+            info(f"Sensor PH (ADC1 Pin {pins.PH_PIN}) inicializado.")
+
+            self.adc_oxigeno = ADC(Pin(pins.OXIGENO_PIN))
+            self.adc_oxigeno.atten(ADC.ATTN_11DB)
+            self._do = Oversampler(self.adc_oxigeno, *sensor_params.ADC_OVERSAMPLE["do"])
+            self._do_filter = make_filter(sensor_params.ADC_FILTER.get("do"))
+            info(f"Sensor Oxigeno (ADC1 Pin {pins.OXIGENO_PIN}) inicializado.")
+            
+        except Exception as e:
+            error(f"No se pudo inicializar el hardware de sensores analógicos: {e}")
+            raise
+
+    @timed("adc.ph")
+    def read_ph(self):
+        """pH desde el ADC interno del ESP32 (lectura inmediata)."""
+        try:
+            raw_ph = self._ph.read()
+            if self._ph_filter:
+                raw_ph = self._ph_filter.update(raw_ph)
+            return {"ph_value": calibration.convert("ph", raw_ph)}
+        except Exception as e:
+            error("Error al leer sensor de pH (ADC): %s", e)
+            return None
+
+    @timed("adc.do")
+    def read_do(self):
+        """Oxígeno disuelto desde el ADC interno del ESP32."""
+        try:
+            raw_oxi = self._do.read()
+            if self._do_filter:
+                raw_oxi = self._do_filter.update(raw_oxi)
+            return {"do_mg_l": calibration.convert("do", raw_oxi)}
+        except Exception as e:
+            error("Error al leer sensor de oxígeno (ADC): %s", e)
+            return None
+
+    async def read_gas(self):
+        """NH3 y H2S desde el ADS1115 por I2C."""
+        try:
+            # La secuencia de conversiones no se intercala con ráfagas del LCD.
+            async with self._bus.lock:
+                raw_nh3, raw_s2h = await self.adc_mux.scan(_GAS_CHANNELS, rate=4, out=self._gas_raw)
+            return {
+                "nh3_ppm": calibration.convert("nh3", raw_nh3),
+                "s2h_ppm": calibration.convert("h2s", raw_s2h),
+            }
+        except Exception as e:
+            error("Error al leer sensores analógicos (I2C): %s", e)
+            return None
+
+
+def sources(i2c_bus):
+    """pH y DO cambian rápido y cuestan poco; los gases van por I2C."""
+    calibration.load()
+    sensors = HybridAnalogSensors(i2c_bus, gain_index_val=gain_index)
+    sched = sensor_params.SENSOR_SCHEDULE
+    return (
+        Source("ph", "analog", ("ph_value",), sync(sensors.read_ph), *sched["ph"]),
+        Source("do", "analog", ("do_mg_l",), sync(sensors.read_do), *sched["do"]),
+        Source("gas", "analog", ("nh3_ppm", "s2h_ppm"), sensors.read_gas, *sched["gas"]),
+    )
@@ -0,0 +1,144 @@
+# device/sensors/calibration.py
+
+import json
+from array import array
+from utils.logger import info, error
+from config import sensor_params
+
+_CAL_FILE = "calibration.json"
+
+
+def _interp(pts, x):
+    # Lineal a tramos sobre puntos ordenados; los tramos extremos se extrapolan.
+    i = 0
+    while i < len(pts) - 2 and x > pts[i + 1][0]:
+        i += 1
+    (x0, y0), (x1, y1) = pts[i], pts[i + 1]
+    return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
+
+class Table:
+    """Calibración multipunto compilada a una tabla de consulta uniforme.
+
+    Los puntos (crudo, valor) definen una curva lineal a tramos (con
+    extrapolación de los tramos extremos). Se muestrea en `cells + 1` nodos
+    equiespaciados sobre el rango de entrada; `__call__` calcula el índice
+    de celda con una multiplicación y une los dos nodos vecinos, sin
+    búsqueda ni divisiones.
+    """
+
+    def __init__(self, points, domain, cells=128):
+        pts = sorted((float(x), float(y)) for x, y in points)
+        if len(pts) < 2:
+            raise ValueError("se necesitan al menos 2 puntos")
+        for i in range(1, len(pts)):
+            if pts[i][0] == pts[i - 1][0]:
+                raise ValueError("dos puntos con el mismo valor crudo")
+        self.points = pts
+        self.lo, self.hi = float(domain[0]), float(domain[1])
+        self.cells = cells
+        self._scale = cells / (self.hi - self.lo)
+        self._lut = array('f', bytearray(4 * (cells + 1)))
+        step = (self.hi - self.lo) / cells
+        for i in range(cells + 1):
+            self._lut[i] = _interp(pts, self.lo + i * step)
+
+    def __call__(self, raw):
+        f = (raw - self.lo) * self._scale
+        if f <= 0:
+            return self._lut[0]
+        if f >= self.cells:
+            return self._lut[self.cells]
+        i = int(f)
+        lut = self._lut
+        return lut[i] + (f - i) * (lut[i + 1] - lut[i])
+
+
+_tables = {}
+_custom = {}         # canal -> puntos definidos por el usuario (persistidos)
+last_raw = {}        # canal -> última lectura cruda, para capturar puntos
+
+
+def _compile(channel, points):
+    domain, factory = sensor_params.CALIBRATION[channel]
+    if len(points) == 1:
+        # Un solo punto: corrige el desplazamiento de la curva de fábrica.
+        x, y = points[0]
+        dy = float(y) - _interp(sorted(factory), float(x))
+        points = [(fx, fy + dy) for fx, fy in factory]
+    return Table(points, domain, sensor_params.CAL_LUT_CELLS)
+
+
+def load():
+    """Compila las calibraciones de fábrica y aplica las guardadas en flash."""
+    for channel, (_, points) in sensor_params.CALIBRATION.items():
+        _tables[channel] = _compile(channel, points)
+    try:
+        with open(_CAL_FILE, "r") as f:
+            saved = json.load(f)
+    except OSError:
+        return
+    except Exception as e:
+        error(f"Calibración: archivo inválido, se usan valores de fábrica: {e}")
+        return
+    for channel, points in saved.items():
+        if channel not in sensor_params.CALIBRATION:
+            continue
+        try:
+            _tables[channel] = _compile(channel, points)
+            _custom[channel] = sorted((float(x), float(y)) for x, y in points)
+            info(f"Calibración '{channel}' cargada ({len(points)} puntos).")
+        except Exception as e:
+            error(f"Calibración '{channel}' guardada inválida: {e}")
+
+
+def _save():
+    try:
+        with open(_CAL_FILE, "w") as f:
+            json.dump(_custom, f)
+    except Exception as e:
+        error(f"No se pudo guardar la calibración: {e}")
+
+
+def convert(channel, raw):
+    last_raw[channel] = raw
+    return _tables[channel](raw)
+
+
+def set_points(channel, points):
+    """Sustituye la calibración de `channel`. ValueError si los puntos no
+    son válidos; la tabla anterior sigue activa en ese caso."""
+    if channel not in sensor_params.CALIBRATION:
+        raise ValueError("canal desconocido: %s" % channel)
+    points = sorted((float(x), float(y)) for x, y in points)
+    _tables[channel] = _compile(channel, points)
+    _custom[channel] = points
+    _save()
+    info(f"Calibración '{channel}' actualizada: {points}")
+
+
+def capture(channel, value):
+    """Añade un punto (última lectura cruda, `value`), p. ej. con el
+    electrodo en una solución tampón. Un punto previo con el mismo valor
+    de referencia se reemplaza."""
+    if channel not in last_raw:
+        raise ValueError("sin lectura cruda para %s" % channel)
+    value = float(value)
+    points = [p for p in _custom.get(channel, ()) if p[1] != value]
+    points.append((last_raw[channel], value))
+    set_points(channel, points)
+
+
+def reset(channel):
+    if channel not in sensor_params.CALIBRATION:
+        raise ValueError("canal desconocido: %s" % channel)
+    _tables[channel] = _compile(channel, sensor_params.CALIBRATION[channel][1])
+    _custom.pop(channel, None)
+    _save()
+    info(f"Calibración '{channel}' restablecida a fábrica.")
+
+
+def status():
+    return {ch: {"points": _custom.get(ch, t.points), "custom": ch in _custom,
+                 "raw": last_raw.get(ch)}
+            for ch, t in _tables.items()}
@@ -0,0 +1,103 @@
+# device/sensors/filters.py
+
+import micropython
+from array import array
+
+
+@micropython.native
+def _isort(buf, n):
+    # Inserción in situ: para ráfagas de 16-64 muestras es más rápida que
+    # sorted() y no reserva memoria.
+    for i in range(1, n):
+        v = buf[i]
+        j = i - 1
+        while j >= 0 and buf[j] > v:
+            buf[j + 1] = buf[j]
+            j -= 1
+        buf[j + 1] = v
+
+
+class Oversampler:
+    """Ráfaga de `n` lecturas del ADC en un buffer preasignado y diezmado
+    robusto: mediana, o media recortando `trim` muestras por cada extremo."""
+
+    def __init__(self, adc, n=32, mode="median", trim=0):
+        if mode not in ("median", "trimmed"):
+            raise ValueError("Oversampler: modo '%s' no soportado" % mode)
+        if 2 * trim >= n:
+            raise ValueError("Oversampler: recorte demasiado grande")
+        self.adc = adc
+        self.n = n
+        self.median = mode == "median"
+        self.trim = trim
+        self.buf = array('H', bytearray(2 * n))
+
+    @micropython.native
+    def _burst(self):
+        buf = self.buf
+        read = self.adc.read
+        for i in range(self.n):
+            buf[i] = read()
+
+    def read(self):
+        self._burst()
+        buf = self.buf
+        n = self.n
+        _isort(buf, n)
+        if self.median:
+            return (buf[n // 2] + buf[(n - 1) // 2]) / 2
+        acc = 0
+        for i in range(self.trim, n - self.trim):
+            acc += buf[i]
+        return acc / (n - 2 * self.trim)
+
+
+class Ema:
+    """Media móvil exponencial: y += alpha * (x - y)."""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.y = None
+
+    def update(self, x):
+        if self.y is None:
+            self.y = x
+        else:
+            self.y += self.alpha * (x - self.y)
+        return self.y
+
+
+class Kalman1D:
+    """Kalman escalar para una magnitud casi constante.
+
+    `q` es la varianza del proceso (cuánto puede moverse la señal real entre
+    muestras) y `r` la del ruido de medida, ambas en unidades de entrada².
+    """
+
+    def __init__(self, q, r):
+        self.q = q
+        self.r = r
+        self.x = None
+        self.p = r
+
+    def update(self, z):
+        if self.x is None:
+            self.x = z
+            return z
+        p = self.p + self.q
+        k = p / (p + self.r)
+        self.x += k * (z - self.x)
+        self.p = (1 - k) * p
+        return self.x
+
+
+def make_filter(spec):
+    """("ema", alpha) | ("kalman", q, r) | None -> filtro con update(x)."""
+    if not spec:
+        return None
+    kind = spec[0]
+    if kind == "ema":
+        return Ema(spec[1])
+    if kind == "kalman":
+        return Kalman1D(spec[1], spec[2])
+    raise ValueError("Filtro '%s' no soportado" % kind)
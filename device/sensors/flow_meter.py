@@ -0,0 +1,86 @@
+# device/sensors/flow_meter.py
+
+import time
+import machine
+from machine import Pin
+from utils.logger import info
+from config import pins, sensor_params
+from sensors.registry import Source, sync
+
+try:
+    from esp32 import PCNT
+except ImportError:
+    PCNT = None
+
+# Filtro antirrebote del PCNT en ciclos de APB (80 MHz): 1023 ≈ 12.8 µs.
+_PCNT_FILTER = 1023
+
+
+class FlowMeter:
+    """Caudalímetro de efecto Hall (YF-B1) por conteo de pulsos.
+
+    Con el periférico PCNT los pulsos se cuentan en hardware y Python solo
+    lee y pone a cero el contador en cada muestreo. Sin PCNT (firmware
+    antiguo) se usa una IRQ que únicamente incrementa un entero.
+    """
+
+    def __init__(self, pin_no, pulses_per_l):
+        self.pulses_per_l = pulses_per_l
+        self.flow_lpm = 0.0
+        self.volume_l = 0.0
+        self.pulses = 0
+        self._pin = Pin(pin_no, Pin.IN, Pin.PULL_UP)
+        self._last_ms = time.ticks_ms()
+        self._irq_count = 0
+        self._pcnt = None
+        if PCNT is not None:
+            self._pcnt = PCNT(0, pin=self._pin, rising=PCNT.INCREMENT, filter=_PCNT_FILTER)
+            self._pcnt.start()
+            info(f"Caudalímetro (Pin {pin_no}) en PCNT.")
+        else:
+            self._pin.irq(handler=self._on_pulse, trigger=Pin.IRQ_RISING)
+            info(f"Caudalímetro (Pin {pin_no}) por IRQ.")
+
+    def _on_pulse(self, pin):
+        self._irq_count += 1
+
+    def _take(self):
+        if self._pcnt is not None:
+            # value(0) devuelve la cuenta y la pone a cero de forma atómica.
+            return self._pcnt.value(0)
+        state = machine.disable_irq()
+        n = self._irq_count
+        self._irq_count = 0
+        machine.enable_irq(state)
+        return n
+
+    def peek(self):
+        """Volumen acumulado incluidos los pulsos aún no muestreados, sin
+        tocar el contador (lo usa la dosificación entre muestreos)."""
+        n = self._pcnt.value() if self._pcnt is not None else self._irq_count
+        return self.volume_l + n / self.pulses_per_l
+
+    def read(self):
+        """Caudal medio desde el muestreo anterior y volumen acumulado."""
+        now = time.ticks_ms()
+        n = self._take()
+        dt = time.ticks_diff(now, self._last_ms)
+        self._last_ms = now
+        self.pulses += n
+        self.volume_l += n / self.pulses_per_l
+        if dt > 0:
+            self.flow_lpm = n * 60000 / (self.pulses_per_l * dt)
+        return {"flow_lpm": self.flow_lpm, "volume_l": self.volume_l}
+
+
+meter = None
+
+
+def sources():
+    """El caudal se integra en cada muestreo; el periodo fija la resolución."""
+    global meter
+    meter = FlowMeter(pins.FLOW_PIN, sensor_params.FLOW_PULSES_PER_L)
+    return (
+        Source("flow", "flow", ("flow_lpm", "volume_l"), sync(meter.read),
+               *sensor_params.SENSOR_SCHEDULE["flow"]),
+    )
@@ -0,0 +1,56 @@
+# device/sensors/registry.py
+
+
+class Source:
+    """Fuente de lecturas con su propio periodo y timeout.
+
+    `read` es una corrutina sin argumentos que devuelve un dict con (un
+    subconjunto de) `fields`, o None si la lectura falló. Los valores se
+    publican en `current_readings[group]`.
+    """
+
+    def __init__(self, name, group, fields, read, period_s, timeout_ms=1000):
+        self.name = name
+        self.group = group
+        self.fields = fields
+        self.read = read
+        self.period_ms = int(period_s * 1000)
+        self.timeout_ms = timeout_ms
+        # Estado del planificador
+        self.due = 0
+        self.busy = False
+        self.latency_ms = None
+        self.timestamp = None
+        self.errors = 0
+        self.overruns = 0
+        self.adaptive = None      # AdaptiveRate opcional
+        self.last_ok_ms = None
+
+
+_sources = []
+
+
+def register(source):
+    for s in _sources:
+        if s.name == source.name:
+            raise ValueError("Sensor duplicado: %s" % source.name)
+    _sources.append(source)
+    return source
+
+
+def sources():
+    return _sources
+
+
+def get(name):
+    for s in _sources:
+        if s.name == name:
+            return s
+    return None
+
+
+def sync(fn):
+    """Adapta una lectura síncrona (p.ej. ADC interno) a corrutina."""
+    async def read():
+        return fn()
+    return read
@@ -0,0 +1,95 @@
+# device/sensors/rs485_level.py
+
+import uasyncio as asyncio
+from machine import Pin, UART
+from utils.logger import info, error
+from config import sensor_params
+from utils.drivers.rs485 import RS485
+from utils.modbus import ModbusClient, ReadPlan, READ_HOLDING
+from sensors.registry import Source
+
+_RS485_RETRY_GAP_MS = 200
+_REG_LEVEL_MM = 0x0004
+_REG_TEMP_DC = 0x0005
+
+class RS485Sensor:
+    def __init__(self):
+        try:
+            Pin(sensor_params.RS485_RX, Pin.IN, Pin.PULL_UP)
+            uart = UART(2, baudrate=sensor_params.RS485_BAUDRATE,
+                        tx=sensor_params.RS485_TX, rx=sensor_params.RS485_RX)
+            bus = RS485(uart, Pin(sensor_params.RS485_DE_RE, Pin.OUT),
+                        baudrate=sensor_params.RS485_BAUDRATE)
+            self.client = ModbusClient(bus, timeout_ms=sensor_params.RS485_TIMEOUT_MS)
+            info("Sensor RS485 (Nivel+Temp) inicializado.")
+        except Exception as e:
+            error(f"No se pudo inicializar la UART para RS485: {e}")
+            raise
+
+        slave = sensor_params.RS485_LEVEL_ADDR
+        # Nivel (mm) y temperatura (décimas de °C) son contiguos: una sola petición 03.
+        self.plan = ReadPlan([
+            (slave, READ_HOLDING, _REG_LEVEL_MM, 1),
+            (slave, READ_HOLDING, _REG_TEMP_DC, 1),
+        ])
+        self._values = [None, None]
+        self.valid_ranges = { 
+            "level": (-2.0, 1050.0),
+            "rs485_temperature": (-10.0, 100.0)
+        }
+
+    async def _poll(self):
+        try:
+            values = await self.client.execute(self.plan, self._values)
+        except Exception as e:
+            error("Error en envío RS485: %s", e)
+            return None, None
+        for e in self.plan.errors:
+            error("Error en transacción RS485: %s", e)
+        level, temp = values
+        return (level[0] / 10.0 if level else None,
+                temp[0] / 10.0 if temp else None)
+
+    async def _get_reading(self, params, attempts=3):
+        vals_level = []
+        vals_temp = []
+        
+        for _ in range(attempts):
+            level, temp = await self._poll()
+            
+            if level is not None:
+                min_v, max_v = self.valid_ranges.get(params[0], (-1e10, 1e10))
+                if min_v <= level <= max_v:
+                    vals_level.append(level)
+            
+            if temp is not None:
+                min_v, max_v = self.valid_ranges.get(params[1], (-1e10, 1e10))
+                if min_v <= temp <= max_v:
+                    vals_temp.append(temp)
+            
+            await asyncio.sleep_ms(_RS485_RETRY_GAP_MS)
+        
+        level_final = sorted(vals_level)[len(vals_level)//2] if vals_level else None
+        temp_final = sorted(vals_temp)[len(vals_temp)//2] if vals_temp else None
+        
+        return level_final, temp_final
+
+    async def read(self):
+        level_val_cm, temp_val_c = await self._get_reading(
+            ("level", "rs485_temperature")
+        )
+        
+        return {
+            "level": level_val_cm, 
+            "rs485_temperature": temp_val_c,
+            "ambient_temperature": None
+        }
+
+
+def sources():
+    """Nivel y temperatura del tanque: señales lentas, sondeo espaciado."""
+    sensor = RS485Sensor()
+    return (
+        Source("rs485", "rs485", ("level", "rs485_temperature", "ambient_temperature"),
+               sensor.read, *sensor_params.SENSOR_SCHEDULE["rs485"]),
+    )
@@ -2,6 +2,8 @@
 
 from config import runtime
 
+_DAY_S = 86400
+
 _current_mode = 'NORMAL'
 
 def set_mode(mode):
@@ -17,3 +19,9 @@ def get_time_factor():
         return runtime.DEMO_TIME_FACTOR
     else:
         return 1
+
+def inoculation_day(now_s, start_s):
+    """Día de inoculación en curso: el día 1 son las primeras 24 h desde
+    `start_s` (start_time.txt). LCD, /api/status y la tabla de bombeo lo
+    cuentan igual."""
+    return int(now_s - start_s) // _DAY_S + 1
@@ -1,51 +1,119 @@
 # device/tasks/control_task.py
 
 import uasyncio as asyncio
+import time
 from config import runtime
 from hw.relay_controller import controller as relays
 from utils.logger import info
+from utils.scheduler import Scheduler, Cycle
+from utils.pump_schedule import PumpSchedule
+from tasks import dosing
+from utils.supervisor import supervisor
 import system_state
 
-async def _auto_pump_loop():
-    time_factor = system_state.get_time_factor()
-    
-    interval_seconds = (runtime.AUTO_PUMP_INTERVAL_MIN * 60) // time_factor
-    duration_seconds = (runtime.AUTO_PUMP_DURATION_MIN * 60) // time_factor
-
-    info(f"Pump task started. Interval: {interval_seconds}s, Duration: {duration_seconds}s")
-
-    while True:
-        await asyncio.sleep(interval_seconds)
-        
-        auto_turned_on = False
-        if not relays.pump_is_on():
-            info(f"Auto pump ON (for {duration_seconds}s)")
-            relays.toggle_pump()
-            auto_turned_on = True
-        
-        await asyncio.sleep(duration_seconds)
-        
-        if auto_turned_on and relays.pump_is_on():
-            relays.toggle_pump()
-            info("Auto pump OFF")
-
-async def _compressor_loop():
-    time_factor = system_state.get_time_factor()
-    
-    cycle_seconds = (runtime.COMPRESSOR_CYCLE_HOURS * 3600) // time_factor
-    
-    info(f"Compressor task started. Cycle duration: {cycle_seconds}s per compressor.")
+scheduler = Scheduler()
+schedule = PumpSchedule()
+_auto_pump_on = False
+_origin = 0
+_pump_cycle = None
+
+def _pump_on():
+    global _auto_pump_on
+    if not relays.pump_is_on():
+        info("Auto pump ON")
+        relays.toggle_pump()
+        _auto_pump_on = True
+
+def _pump_off():
+    # Solo apaga la bomba si la encendió el ciclo automático.
+    global _auto_pump_on
+    if _auto_pump_on and relays.pump_is_on():
+        relays.toggle_pump()
+        info("Auto pump OFF")
+    _auto_pump_on = False
+
+def _compressor_a():
+    info("Activando Compresor A.")
+    relays.set_compressors(a_on=True)
+
+def _compressor_b():
+    info("Activando Compresor B.")
+    relays.set_compressors(a_on=False)
+
+def _on_schedule(entry):
+    info(f"Tabla de bombeo: entrada de las {entry['at']}.")
+    if "volume_l" in entry:
+        asyncio.create_task(dosing.dose(volume_l=entry["volume_l"], max_s=entry.get("max_s")))
+    else:
+        asyncio.create_task(dosing.dose(duration_s=entry["duration_s"]))
+    _arm_schedule()
 
-    while True:
-        info("Activando Compresor A.")
-        relays.set_compressors(a_on=True)
-        await asyncio.sleep(cycle_seconds)
+def _arm_schedule():
+    nxt = schedule.next_fire(time.time(), _origin)
+    if nxt is None:
+        scheduler.cancel("pump_schedule")
+        return
+    at, entry = nxt
+    scheduler.call_at("pump_schedule", at * 1000, lambda: _on_schedule(entry))
 
-        info("Activando Compresor B.")
-        relays.set_compressors(a_on=False)
-        await asyncio.sleep(cycle_seconds)
+def _apply_schedule():
+    """Con tabla, la bomba sigue sus entradas; sin ella, el ciclo fijo."""
+    if schedule.entries:
+        # Si el ciclo fijo estaba en su ventana de bombeo, su paso de
+        # apagado ya no llegará.
+        _pump_off()
+        scheduler.remove("pump")
+        _arm_schedule()
+    else:
+        scheduler.cancel("pump_schedule")
+        if _pump_cycle is not None and _pump_cycle not in scheduler.cycles:
+            scheduler.add(_pump_cycle)
 
-def start():
+def set_pump_schedule(entries):
+    """Sustituye la tabla de bombeo (lista vacía = volver al ciclo fijo).
+    ValueError si alguna entrada no es válida."""
+    schedule.set(entries)
+    schedule.save()
+    info(f"Tabla de bombeo actualizada: {len(schedule.entries)} entradas.")
+    _apply_schedule()
+
+def set_origin(timestamp):
+    """Reancla los ciclos a `timestamp` (inicio de la inoculación)."""
+    global _origin
+    if timestamp <= 0:
+        timestamp = time.time()
+    _origin = timestamp
+    scheduler.set_origin(timestamp)
+    if schedule.entries:
+        _arm_schedule()
+
+def start(origin, pump=True):
+    """Ciclos de bomba y compresores anclados a `origin` (época en s).
+
+    Tras un reinicio cada ciclo retoma la fase que le toca a la hora actual
+    en lugar de empezar de cero.
+    """
     info("Starting high-level control tasks...")
-    asyncio.create_task(_auto_pump_loop())
-    asyncio.create_task(_compressor_loop())
+    time_factor = system_state.get_time_factor()
+
+    global _pump_cycle
+    if pump:
+        interval_seconds = (runtime.AUTO_PUMP_INTERVAL_MIN * 60) // time_factor
+        duration_seconds = (runtime.AUTO_PUMP_DURATION_MIN * 60) // time_factor
+        _pump_cycle = Cycle("pump", interval_seconds + duration_seconds,
+                            ((0, _pump_off), (interval_seconds, _pump_on)))
+        schedule.load()
+        if schedule.entries:
+            info(f"Pump task started. Tabla de bombeo: {len(schedule.entries)} entradas.")
+        else:
+            info(f"Pump task started. Interval: {interval_seconds}s, Duration: {duration_seconds}s")
+            scheduler.add(_pump_cycle)
+
+    cycle_seconds = (runtime.COMPRESSOR_CYCLE_HOURS * 3600) // time_factor
+    info(f"Compressor task started. Cycle duration: {cycle_seconds}s per compressor.")
+    scheduler.add(Cycle("compressor", 2 * cycle_seconds,
+                        ((0, _compressor_a), (cycle_seconds, _compressor_b))))
+
+    set_origin(origin)
+    # Las esperas del planificador duran como mucho 60 s.
+    supervisor.spawn("control", scheduler.run, stall_s=180)
@@ -1,14 +1,21 @@
 # device/tasks/display_task.py
 
 import uasyncio as asyncio
-from time import time
+from time import time, ticks_ms, ticks_diff, ticks_add
 from hw.relay_controller import controller as relays
-from ui.display import init as lcd_init, write
+from ui.display import init as lcd_init, write, flush, pending_ms
+from config.pins import i2c
 from tasks.sensor_task import current_readings
+from utils.supervisor import supervisor
+from system_state import inoculation_day
 
 start_timestamp = 0
 current_page = 0
 PAGE_COUNT = 2
+_PAGE_S = 3
+
+_wake = asyncio.Event()
+_notice = None          # (línea 3, línea 4, ticks de fin) de un aviso temporal
 
 def ljust_manual(s, width, fillchar=' '):
     ln = len(s)
@@ -21,23 +28,27 @@ def _format_val(val, precision=0, width=4):
     s_val = "{:.{}f}".format(val, precision)
     return ljust_manual(s_val, width)
 
-async def _loop():
+async def _loop(watch):
     global current_page
     
     while True:
+        watch.begin()
         if start_timestamp > 0:
-            seconds_elapsed = time() - start_timestamp
-            days = (seconds_elapsed // 86400) + 1
-            day_line = f"Day {int(days)}"
+            day_line = f"Day {inoculation_day(time(), start_timestamp)}"
         else:
             day_line = "RTC not set"
 
         pump_line = "Pump ON" if relays.pump_is_on() else "Pump OFF"
+        flow_val = _format_val(current_readings["flow"].get("flow_lpm"), 1, 5)
+        pump_line = f"{ljust_manual(pump_line, 9)}Q: {flow_val}L/m"
         
         line_3 = ""
         line_4 = ""
 
-        if current_page == 0:
+        if _notice is not None and ticks_diff(_notice[2], ticks_ms()) > 0:
+            line_3, line_4 = _notice[0], _notice[1]
+
+        elif current_page == 0:
             ph_val = _format_val(current_readings["analog"].get("ph_value"), 1)
             oxi_val = _format_val(current_readings["analog"].get("do_mg_l"), 1)
             nh3_val = _format_val(current_readings["analog"].get("nh3_ppm"), 1)
@@ -58,20 +69,42 @@ async def _loop():
             line_3 = f"Level: {level_val} cm"
             line_4 = f"T.L.:{rs485_t_val} T.A.:{amb_t_val}"
 
-        write((
-            ljust_manual(day_line, 20),
-            ljust_manual(pump_line, 20),
-            ljust_manual(line_3, 20),
-            ljust_manual(line_4, 20)
-        ))
+        async with i2c().lock:
+            write((
+                ljust_manual(day_line, 20),
+                ljust_manual(pump_line, 20),
+                ljust_manual(line_3, 20),
+                ljust_manual(line_4, 20)
+            ))
+        # Un frame retenido por el tope de refresco sale en cuanto se pueda.
+        wait_ms = pending_ms()
+        if wait_ms is not None:
+            await asyncio.sleep_ms(wait_ms)
+            async with i2c().lock:
+                flush()
         
         current_page = (current_page + 1) % PAGE_COUNT
-        await asyncio.sleep(3)
+        watch.beat()
+        try:
+            await asyncio.wait_for(_wake.wait(), _PAGE_S)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
 
 def start():
     lcd_init()
-    asyncio.create_task(_loop())
+    supervisor.spawn("display", _loop, stall_s=30)
 
 def set_start_time(timestamp):
     global start_timestamp
     start_timestamp = timestamp
+
+def next_page():
+    """Redibuja ya con la página siguiente (el bucle ya avanzó el índice)."""
+    _wake.set()
+
+def notify(line_3, line_4="", seconds=5):
+    """Sustituye las líneas 3 y 4 por un aviso durante `seconds`."""
+    global _notice
+    _notice = (line_3, line_4, ticks_add(ticks_ms(), seconds * 1000))
+    _wake.set()
@@ -0,0 +1,148 @@
+# device/tasks/dosing.py
+
+import uasyncio as asyncio
+import struct
+import time
+from config import sensor_params
+from hw.relay_controller import controller as relays
+from utils.logger import info, warning, error
+
+_HISTORY_FILE = "doses.bin"
+# Registro de 16 bytes: época, litros pedidos, litros entregados,
+# duración en s, resultado, modo.
+_RECORD = "<IffHBB"
+_RECORD_SIZE = 16
+_HISTORY_MAX = 512        # registros; al llenarse se conserva la mitad reciente
+
+_POLL_MS = 50             # sondeo del contador durante una dosis por volumen
+
+OK = 0
+TIMEOUT = 1               # corte por duración máxima antes del volumen
+NO_FLOW = 2               # el caudalímetro no registró pulsos
+STOPPED = 3               # bomba apagada desde fuera o stop()
+SKIPPED = 4               # bomba ya encendida u otra dosis en curso
+RESULTS = ("ok", "timeout", "no_flow", "stopped", "skipped")
+
+MODE_TIME = 0
+MODE_VOLUME = 1
+
+_running = False
+_stop = False
+
+
+def _meter():
+    from sensors import flow_meter
+    return flow_meter.meter
+
+
+def _record(requested, delivered, duration_s, result, mode):
+    rec = struct.pack(_RECORD, time.time(), requested, delivered,
+                      min(duration_s, 0xFFFF), result, mode)
+    try:
+        with open(_HISTORY_FILE, "ab") as f:
+            f.write(rec)
+            size = f.tell()
+        if size >= _HISTORY_MAX * _RECORD_SIZE:
+            with open(_HISTORY_FILE, "rb") as f:
+                f.seek(size - _HISTORY_MAX // 2 * _RECORD_SIZE)
+                keep = f.read()
+            with open(_HISTORY_FILE, "wb") as f:
+                f.write(keep)
+    except Exception as e:
+        error(f"No se pudo guardar el historial de dosis: {e}")
+
+
+def history():
+    """Generador de registros (época, pedidos_l, entregados_l, duración_s,
+    resultado, modo), del más antiguo al más reciente."""
+    buf = bytearray(_RECORD_SIZE)
+    try:
+        f = open(_HISTORY_FILE, "rb")
+    except OSError:
+        return
+    with f:
+        while f.readinto(buf) == _RECORD_SIZE:
+            yield struct.unpack(_RECORD, buf)
+
+
+def is_running():
+    return _running
+
+
+def stop():
+    """Detiene la dosis en curso en el siguiente sondeo."""
+    global _stop
+    _stop = _running
+
+
+async def dose(volume_l=None, duration_s=None, max_s=None):
+    """Enciende la bomba hasta entregar `volume_l` litros (según el
+    caudalímetro) o durante `duration_s` segundos.
+
+    Por volumen, el contador se consulta cada _POLL_MS, con corte por
+    `max_s` (o DOSE_MAX_S) y si no hay caudal tras DOSE_NO_FLOW_S. Ninguna
+    dosis dura más de DOSE_MAX_S.
+    Devuelve el código de resultado y lo deja en el historial.
+    """
+    global _running, _stop
+    mode = MODE_TIME if volume_l is None else MODE_VOLUME
+    requested = volume_l if volume_l is not None else 0.0
+    meter = _meter()
+    if _running or relays.pump_is_on():
+        warning("Dosis omitida: la bomba ya está encendida.")
+        _record(requested, 0.0, 0, SKIPPED, mode)
+        return SKIPPED
+    if mode == MODE_VOLUME and meter is None:
+        error("Dosis por volumen sin caudalímetro; se omite.")
+        _record(requested, 0.0, 0, NO_FLOW, mode)
+        return NO_FLOW
+
+    # DOSE_MAX_S es el corte de seguridad para cualquier origen de la
+    # dosis (tabla de bombeo, API, botón).
+    cap = sensor_params.DOSE_MAX_S
+    limit_s = int(duration_s if mode == MODE_TIME else (max_s or cap))
+    if limit_s > cap:
+        warning("Dosis limitada a DOSE_MAX_S (%d s en lugar de %d s).", cap, limit_s)
+        limit_s = cap
+    _running, _stop = True, False
+    limit_ms = limit_s * 1000
+    poll_ms = 1000 if mode == MODE_TIME else _POLL_MS
+    no_flow_ms = sensor_params.DOSE_NO_FLOW_S * 1000
+    v0 = meter.peek() if meter else 0.0
+    t0 = time.ticks_ms()
+    relays.toggle_pump()
+    info(f"Dosis iniciada: {volume_l:.2f} L" if mode == MODE_VOLUME else f"Dosis iniciada: {duration_s} s")
+    result = OK
+    delivered = 0.0
+    try:
+        while True:
+            elapsed = time.ticks_diff(time.ticks_ms(), t0)
+            await asyncio.sleep_ms(min(poll_ms, max(1, limit_ms - elapsed)))
+            elapsed = time.ticks_diff(time.ticks_ms(), t0)
+            if meter:
+                delivered = meter.peek() - v0
+            if _stop or not relays.pump_is_on():
+                result = STOPPED
+                break
+            if mode == MODE_VOLUME and delivered >= volume_l:
+                break
+            if elapsed >= limit_ms:
+                result = TIMEOUT if mode == MODE_VOLUME else OK
+                break
+            if mode == MODE_VOLUME and delivered <= 0 and elapsed >= no_flow_ms:
+                result = NO_FLOW
+                break
+    finally:
+        if relays.pump_is_on():
+            relays.toggle_pump()
+        _running = False
+    duration = time.ticks_diff(time.ticks_ms(), t0) // 1000
+    if meter:
+        delivered = meter.peek() - v0
+    _record(requested, delivered, duration, result, mode)
+    msg = f"Dosis terminada ({RESULTS[result]}): {delivered:.2f} L en {duration} s"
+    if result in (OK, STOPPED):
+        info(msg)
+    else:
+        error(msg)
+    return result
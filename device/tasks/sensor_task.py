@@ -1,25 +1,22 @@
 # device/tasks/sensor_task.py
 
 import uasyncio as asyncio
-from machine import Pin, UART, ADC
 import time
-import struct
-from utils.logger import info, error
-from config import pins, sensor_params
+from utils.logger import info, error, get as get_logger
+from config import sensor_params
 from config.pins import i2c
-from utils.drivers.ads1x15 import ADS1115
-
-DO_ADC_RAW_MAX = 3722.0
-DO_MG_L_MAX = 20.0
-PH_SLOPE = 3.5 
-PH_OFFSET = 0.0
-ADC_MIN_RAW = 0.0
-ADC_MAX_RAW = 32767.0
-NH3_PPM_MIN = 1.0
-NH3_PPM_MAX = 300.0
-H2S_PPM_MIN = 0.5
-H2S_PPM_MAX = 50.0
-gain_index = 1
+from sensors import registry
+from sensors.adaptive import AdaptiveRate
+from utils.supervisor import supervisor
+
+_LOG_PERIOD_MS = 15000   # resumen de lecturas mientras haya transitorios
+_LOG_IDLE_MS = 600000    # resumen con todas las señales estables
+_BEAT_MS = 30000         # espera máxima entre latidos al supervisor
+
+# Resumen periódico de lecturas; su nivel se ajusta con LOG_LEVELS["readings"].
+_readings_log = get_logger("readings")
+
+_wake = asyncio.Event()
 
 current_readings = {
     "analog": {
@@ -32,180 +29,154 @@ current_readings = {
         "level": None,
         "rs485_temperature": None,
         "ambient_temperature": None
+    },
+    "flow": {
+        "flow_lpm": None,
+        "volume_l": None,
+    },
+    "meta": {
+        "timestamp": {},       # fuente -> time.time() de su última lectura
+        "latency_ms": {},      # fuente -> duración de su última lectura
+        "period_s": {},        # fuente -> periodo de muestreo vigente
     }
 }
 
-class HybridAnalogSensors:
-    def __init__(self, i2c_bus, gain_index_val=1):
-        try:
-            self.adc_mux = ADS1115(i2c_bus, gain=gain_index_val)
-            info(f"Sensor ADC ADS1115 (NH3/S2H) inicializado.")
-
-            self.adc_ph = ADC(Pin(pins.PH_PIN))
-            self.adc_ph.atten(ADC.ATTN_11DB)
-            info(f"Sensor PH (ADC1 Pin {pins.PH_PIN}) inicializado.")
-
-            self.adc_oxigeno = ADC(Pin(pins.OXIGENO_PIN))
-            self.adc_oxigeno.atten(ADC.ATTN_11DB)
-            info(f"Sensor Oxigeno (ADC1 Pin {pins.OXIGENO_PIN}) inicializado.")
-            
-        except Exception as e:
-            error(f"No se pudo inicializar el hardware de sensores analógicos: {e}")
-            raise
-
-    def _map_value(self, x, in_min, in_max, out_min, out_max):
-        if x < in_min: x = in_min
-        if in_max == in_min: return out_min
-        return (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
-
-    def read(self):
-        try:
-            raw_ph = self.adc_ph.read()
-            raw_oxi = self.adc_oxigeno.read()
-            
-            time.sleep_ms(50) 
-            raw_nh3 = self.adc_mux.read(rate=4, channel1=0)
-            time.sleep_ms(50)
-            raw_s2h = self.adc_mux.read(rate=4, channel1=1)
-
-            do_mg_l = self._map_value(raw_oxi, 0.0, DO_ADC_RAW_MAX, 0.0, DO_MG_L_MAX)
-            v_ph = (raw_ph / 4095.0) * 3.3
-            ph_value = (PH_SLOPE * v_ph) + PH_OFFSET
-            ppm_nh3 = self._map_value(raw_nh3, ADC_MIN_RAW, ADC_MAX_RAW, NH3_PPM_MIN, NH3_PPM_MAX)
-            ppm_s2h = self._map_value(raw_s2h, ADC_MIN_RAW, ADC_MAX_RAW, H2S_PPM_MIN, H2S_PPM_MAX)
-            
-            data = {
-                "ph_value": ph_value,
-                "do_mg_l": do_mg_l,
-                "nh3_ppm": ppm_nh3,
-                "s2h_ppm": ppm_s2h,
-            }
-            return data
-        except Exception as e:
-            error(f"Error al leer sensores analógicos (híbrido): {e}")
-            return None
-
-class RS485Sensor:
-    def __init__(self):
-        try:
-            Pin(sensor_params.RS485_RX, Pin.IN, Pin.PULL_UP)
-            self.uart = UART(2, baudrate=9600, tx=sensor_params.RS485_TX, rx=sensor_params.RS485_RX)
-            self.de_re = Pin(sensor_params.RS485_DE_RE, Pin.OUT)
-            self.de_re.off()
-            info("Sensor RS485 (Nivel+Temp) inicializado.")
-        except Exception as e:
-            error(f"No se pudo inicializar la UART para RS485: {e}")
-            raise
-
-        self.commands = [ 
-            b'\x01\x03\x00\x04\x00\x02\x85\xCA'
-        ]
-        self.valid_ranges = { 
-            "level": (-2.0, 1050.0),
-            "rs485_temperature": (-10.0, 100.0)
-        }
-
-    def _send(self, cmd):
-        try:
-            self.uart.read(self.uart.any())
-            self.de_re.on()
-            self.uart.write(cmd)
-            time.sleep_ms(10)
-            self.de_re.off()
-            time.sleep_ms(300)
-            return self.uart.read(20)
-        except Exception as e:
-            error(f"Error en envío RS485: {e}")
-            return None
-
-    def _decode(self, resp):
-        if not resp or len(resp) < 9 or resp[2] != 0x04:
-            return None, None
-        try:
-            level_mm = struct.unpack('>H', resp[3:5])[0]
-            val_cm = level_mm / 10.0
-            
-            temp_raw = struct.unpack('>H', resp[5:7])[0]
-            val_temp_c = temp_raw / 10.0
-            
-            return val_cm, val_temp_c
-        except Exception as e:
-            error(f"Error en decodificación RS485 (dual): {e}")
-            return None, None
-
-    def _get_reading(self, cmd, params, attempts=3):
-        vals_level = []
-        vals_temp = []
-        
-        for _ in range(attempts):
-            level, temp = self._decode(self._send(cmd))
-            
-            if level is not None:
-                min_v, max_v = self.valid_ranges.get(params[0], (-1e10, 1e10))
-                if min_v <= level <= max_v:
-                    vals_level.append(level)
-            
-            if temp is not None:
-                min_v, max_v = self.valid_ranges.get(params[1], (-1e10, 1e10))
-                if min_v <= temp <= max_v:
-                    vals_temp.append(temp)
-            
-            time.sleep_ms(200)
-        
-        level_final = sorted(vals_level)[len(vals_level)//2] if vals_level else None
-        temp_final = sorted(vals_temp)[len(vals_temp)//2] if vals_temp else None
-        
-        return level_final, temp_final
-
-    def read(self):
-        level_val_cm, temp_val_c = self._get_reading(
-            self.commands[0], 
-            ("level", "rs485_temperature")
-        )
-        
-        return {
-            "level": level_val_cm, 
-            "rs485_temperature": temp_val_c,
-            "ambient_temperature": None
-        }
-
-async def _loop():
-    rs485_reader = None
-    analog_reader = None
-    
+def _register(src):
+    """Alta de una fuente: sus campos aparecen en current_readings."""
+    registry.register(src)
+    adaptive = sensor_params.SENSOR_ADAPTIVE.get(src.name)
+    if adaptive:
+        src.adaptive = AdaptiveRate(src.fields, *adaptive)
+    group = current_readings.setdefault(src.group, {})
+    for field in src.fields:
+        group.setdefault(field, None)
+    current_readings["meta"]["period_s"][src.name] = src.period_ms / 1000
+
+def _setup():
     try:
         i2c_bus = i2c()
         info("Bus I2C para sensores inicializado.")
-        analog_reader = HybridAnalogSensors(i2c_bus, gain_index_val=gain_index)
+        from sensors import analog
+        for src in analog.sources(i2c_bus):
+            _register(src)
     except Exception as e:
         error(f"Fallo al inicializar sensores analógicos: {e}")
 
     if sensor_params.ENABLE_RS485:
         try:
-            rs485_reader = RS485Sensor()
+            from sensors import rs485_level
+            for src in rs485_level.sources():
+                _register(src)
             info("Módulo RS485 HABILITADO.")
         except Exception as e:
-            rs485_reader = None
             error(f"Fallo al inicializar RS485: {e}")
     else:
         info("Módulo RS485 DESHABILITADO por configuración.")
-    
-    info(f"Tarea de sensores iniciada. Intervalo de lectura: 15s")
+
+    if sensor_params.ENABLE_FLOW_METER:
+        try:
+            from sensors import flow_meter
+            for src in flow_meter.sources():
+                _register(src)
+        except Exception as e:
+            error(f"Fallo al inicializar el caudalímetro: {e}")
+
+async def _poll(src):
+    t0 = time.ticks_ms()
+    try:
+        data = await asyncio.wait_for_ms(src.read(), src.timeout_ms)
+    except asyncio.TimeoutError:
+        data = None
+        error("Timeout leyendo sensor %s (%d ms)", src.name, src.timeout_ms)
+    except Exception as e:
+        data = None
+        error("Error leyendo sensor %s: %s", src.name, e)
+    finally:
+        src.busy = False
+    src.latency_ms = time.ticks_diff(time.ticks_ms(), t0)
+    src.timestamp = time.time()
+    meta = current_readings["meta"]
+    meta["latency_ms"][src.name] = src.latency_ms
+    meta["timestamp"][src.name] = src.timestamp
+    if data:
+        current_readings[src.group].update(data)
+        if src.adaptive is not None:
+            _adapt(src, data, t0)
+    else:
+        src.errors += 1
+
+def _adapt(src, data, t_ms):
+    dt = time.ticks_diff(t_ms, src.last_ok_ms) if src.last_ok_ms is not None else 0
+    src.last_ok_ms = t_ms
+    period = src.adaptive.update(data, src.period_ms, dt)
+    if period == src.period_ms:
+        return
+    if src.adaptive.is_fast(period):
+        info("Sensor %s: cambio detectado, muestreo cada %ss", src.name, period / 1000)
+    elif period == src.adaptive.max_ms:
+        info("Sensor %s: señal estable, muestreo cada %ss", src.name, period / 1000)
+    src.period_ms = period
+    src.due = time.ticks_add(t_ms, period)
+    current_readings["meta"]["period_s"][src.name] = period / 1000
+    _wake.set()
+
+def _transient(sources):
+    for src in sources:
+        if src.adaptive is not None and src.adaptive.is_fast(src.period_ms):
+            return True
+    return False
+
+async def _loop(watch):
+    # Tras un reinicio del supervisor las fuentes ya están registradas.
+    if not registry.sources():
+        _setup()
+    sources = registry.sources()
+    for src in sources:
+        info(f"Sensor {src.name}: cada {src.period_ms / 1000}s (timeout {src.timeout_ms} ms)")
+    if not sources:
+        error("No hay sensores registrados; tarea de sensores detenida.")
+        return
+
+    now = time.ticks_ms()
+    for src in sources:
+        src.due = now
+    last_log = now
 
     while True:
-        if analog_reader:
-            analog_data = analog_reader.read()
-            if analog_data:
-                current_readings["analog"].update(analog_data)
-                info(f"Lecturas Analógicas: {current_readings['analog']}")
-
-        if rs485_reader:
-            rs485_data = rs485_reader.read()
-            current_readings["rs485"].update(rs485_data)
-            info(f"Lecturas RS485: {current_readings['rs485']}")
-        
-        await asyncio.sleep(15)
+        watch.begin()
+        # Cada fuente tiene su propio plazo; las que tocan se lanzan como
+        # tareas para que buses distintos se atiendan en paralelo.
+        now = time.ticks_ms()
+        log_period = _LOG_PERIOD_MS if _transient(sources) else _LOG_IDLE_MS
+        wait = log_period
+        for src in sources:
+            if time.ticks_diff(src.due, now) <= 0:
+                if src.busy:
+                    src.overruns += 1
+                else:
+                    src.busy = True
+                    asyncio.create_task(_poll(src))
+                src.due = time.ticks_add(src.due, src.period_ms)
+                if time.ticks_diff(src.due, now) <= 0:
+                    src.due = time.ticks_add(now, src.period_ms)
+            wait = min(wait, time.ticks_diff(src.due, now))
+
+        if time.ticks_diff(now, last_log) >= log_period:
+            last_log = now
+            _readings_log.info("Lecturas Analógicas: %s", current_readings['analog'])
+            _readings_log.info("Lecturas RS485: %s", current_readings['rs485'])
+            _readings_log.info("Caudal: %s", current_readings['flow'])
+        wait = min(wait, log_period - time.ticks_diff(now, last_log), _BEAT_MS)
+        watch.beat()
+
+        # Un sensor que detecta un transitorio adelanta su plazo y despierta
+        # al planificador antes de tiempo.
+        try:
+            await asyncio.wait_for_ms(_wake.wait(), max(wait, 1))
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
 
 def start():
     info("Lanzando tarea de control de sensores...")
-    asyncio.create_task(_loop())
+    supervisor.spawn("sensor", _loop, stall_s=90)
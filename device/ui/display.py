@@ -1,21 +1,35 @@
 # device/ui/display.py
 
+import time
 from config.pins import i2c
 from utils.drivers.machine_i2c_lcd import I2cLcd
 from utils.logger import info, error
+from utils.loop_monitor import section
 
 _ADDR = 0x27
 _ROWS = 4
 _COLS = 20
+_MIN_FRAME_MS = 250     # tope de refresco: frames más seguidos se fusionan
+_MERGE_GAP = 1          # reescribir 1 carácter igual cuesta lo mismo que un salto
 
 class _MockLcd:
     def backlight_on(self): pass
     def clear(self): pass
     def move_to(self, col, row): pass
     def putstr(self, text): pass
+    def burst_move(self, col, row): pass
+    def burst_data(self, data, start, end): pass
+    def burst_end(self): return 0
 
 _lcd = None
 
+# `_shadow` es lo que hay en el cristal; `_frame` el último frame pedido.
+_frame = bytearray(b" " * (_ROWS * _COLS))
+_shadow = bytearray(b" " * (_ROWS * _COLS))
+_pending = False
+_last_ms = None
+stats = {"frames": 0, "unchanged": 0, "coalesced": 0, "runs": 0, "chars": 0}
+
 def _initialize_lcd():
     global _lcd
     if _lcd is not None:
@@ -34,11 +48,93 @@ def init():
     _initialize_lcd()
     _lcd.backlight_on()
     _lcd.clear()
+    for i in range(len(_shadow)):
+        _shadow[i] = 0x20
+
+def _render(lines):
+    for row in range(_ROWS):
+        txt = str(lines[row]) if row < len(lines) else ""
+        base = row * _COLS
+        n = min(len(txt), _COLS)
+        for col in range(n):
+            _frame[base + col] = ord(txt[col]) & 0xFF
+        for col in range(n, _COLS):
+            _frame[base + col] = 0x20
+
+def _flush():
+    """Escribe solo los tramos que difieren del cristal. Devuelve el número
+    de tramos enviados (0 = nada que hacer)."""
+    runs = 0
+    for row in range(_ROWS):
+        base = row * _COLS
+        col = 0
+        while col < _COLS:
+            if _frame[base + col] == _shadow[base + col]:
+                col += 1
+                continue
+            start = end = col
+            # Extiende el tramo mientras los huecos sin cambios sean cortos.
+            while col < _COLS:
+                if _frame[base + col] != _shadow[base + col]:
+                    end = col + 1
+                elif col - end >= _MERGE_GAP:
+                    break
+                col += 1
+            _lcd.burst_move(start, row)
+            _lcd.burst_data(_frame, base + start, base + end)
+            for i in range(base + start, base + end):
+                _shadow[i] = _frame[i]
+            stats["chars"] += end - start
+            runs += 1
+    _lcd.burst_end()
+    return runs
+
+def _send():
+    global _pending, _last_ms
+    _pending = False
+    _last_ms = time.ticks_ms()
+    try:
+        with section("lcd.flush"):
+            runs = _flush()
+    except OSError as e:
+        error("Error escribiendo en el LCD: %s", e)
+        # El contenido del cristal es desconocido: fuerza un redibujado completo.
+        for i in range(len(_shadow)):
+            _shadow[i] = 0
+        return
+    if runs:
+        stats["frames"] += 1
+        stats["runs"] += runs
+    else:
+        stats["unchanged"] += 1
+
+def _throttled():
+    return _last_ms is not None and time.ticks_diff(time.ticks_ms(), _last_ms) < _MIN_FRAME_MS
 
 def write(lines):
+    """Actualiza la pantalla con `lines` (hasta 4 cadenas de 20 caracteres).
+
+    Solo se envían los caracteres que cambiaron. Dentro del tope de
+    refresco el frame queda retenido hasta el siguiente `write`/`flush`.
+    """
+    global _pending
     _initialize_lcd()
-    for row in range(_ROWS):
-        _lcd.move_to(0, row)
-        txt = lines[row] if row < len(lines) else ""
-        formatted_txt = str(txt) + ' ' * (_COLS - len(str(txt)))
-        _lcd.putstr(formatted_txt[:_COLS])
+    _render(lines)
+    if _throttled():
+        _pending = True
+        stats["coalesced"] += 1
+        return
+    _send()
+
+def pending_ms():
+    """Milisegundos hasta poder enviar el frame retenido, o None si no hay."""
+    if not _pending:
+        return None
+    if _last_ms is None:
+        return 0
+    return max(0, _MIN_FRAME_MS - time.ticks_diff(time.ticks_ms(), _last_ms))
+
+def flush():
+    """Envía el frame retenido por el tope de refresco, si ya toca."""
+    if _pending and not _throttled():
+        _send()
@@ -22,6 +22,8 @@
 # THE SOFTWARE.
 #
 import utime as time
+import uasyncio as asyncio
+from machine import Pin
 
 _REGISTER_MASK = const(0x03)
 _REGISTER_CONVERT = const(0x00)
@@ -127,11 +129,16 @@ _RATES = (
 
 
 class ADS1115:
+    # Samples per second for each `rate` index, used to time async waits
+    _SPS = (8, 16, 32, 64, 128, 250, 475, 860)
+
     def __init__(self, i2c, address=0x48, gain=1):
         self.i2c = i2c
         self.address = address
         self.gain = gain
         self.temp2 = bytearray(2)
+        self._cque = _CQUE_NONE
+        self._rdy = None
 
     def _write_register(self, register, value):
         self.temp2[0] = value >> 8
@@ -148,11 +155,70 @@ class ADS1115:
 
     def set_conv(self, rate=4, channel1=0, channel2=None):
         """Set mode for read_rev"""
-        self.mode = (_CQUE_NONE | _CLAT_NONLAT |
+        self.mode = (self._cque | _CLAT_NONLAT |
                      _CPOL_ACTVLOW | _CMODE_TRAD | _RATES[rate] |
                      _MODE_SINGLE | _OS_SINGLE | _GAINS[self.gain] |
                      _CHANNELS[(channel1, channel2)])
 
+    def ready_pin(self, pin):
+        """Use the ALERT/RDY pin to signal the end of each single-shot
+           conversion. With thresholds hi=0x8000/lo=0 the chip pulses
+           the pin low after every conversion (datasheet 9.3.8)."""
+        self._write_register(_REGISTER_LOWTHRESH, 0)
+        self._write_register(_REGISTER_HITHRESH, 0x8000)
+        self._cque = _CQUE_1CONV
+        self._rdy = asyncio.ThreadSafeFlag()
+        pin.irq(lambda p: self._rdy.set(), Pin.IRQ_FALLING)
+
+    def _start(self, mode):
+        if self._rdy is not None:
+            self._rdy.clear()
+        self._write_register(_REGISTER_CONFIG, mode)
+
+    def _conversion(self):
+        res = self._read_register(_REGISTER_CONVERT)
+        return res if res < 32768 else res - 65536
+
+    async def _wait_conversion(self, rate):
+        """Yield to the event loop until the running conversion is done."""
+        conv_ms = 1000 // self._SPS[rate] + 1
+        if self._rdy is not None:
+            try:
+                await asyncio.wait_for_ms(self._rdy.wait(), 2 * conv_ms + 10)
+                return
+            except asyncio.TimeoutError:
+                pass    # pulse lost: fall back to polling the OS bit
+        else:
+            await asyncio.sleep_ms(conv_ms)
+        while not self._read_register(_REGISTER_CONFIG) & _OS_NOTBUSY:
+            await asyncio.sleep_ms(1)
+
+    async def read_async(self, rate=4, channel1=0, channel2=None):
+        """Like read(), but awaits the conversion instead of spinning."""
+        self.set_conv(rate, channel1, channel2)
+        self._start(self.mode)
+        await self._wait_conversion(rate)
+        return self._conversion()
+
+    async def scan(self, channels, rate=4, out=None):
+        """Convert several channels back to back.
+
+           `channels` is a sequence of (channel1, channel2) tuples. As in
+           read_rev, the next conversion is started right after the previous
+           result is latched, so the chip never idles between channels."""
+        n = len(channels)
+        if out is None:
+            out = [0] * n
+        self.set_conv(rate, *channels[0])
+        self._start(self.mode)
+        for i in range(n):
+            await self._wait_conversion(rate)
+            out[i] = self._conversion()
+            if i + 1 < n:
+                self.set_conv(rate, *channels[i + 1])
+                self._start(self.mode)
+        return out
+
     def read(self, rate=4, channel1=0, channel2=None):
         """Read voltage between a channel and GND.
            Time depends on conversion rate."""
@@ -234,6 +300,8 @@ class ADS1114(ADS1115):
 
 
 class ADS1015(ADS1115):
+    _SPS = (128, 250, 490, 920, 1600, 2400, 3300, 3300)
+
     def __init__(self, i2c, address=0x48, gain=1):
         super().__init__(i2c, address, gain)
 
@@ -243,6 +311,15 @@ class ADS1015(ADS1115):
     def read(self, rate=4, channel1=0, channel2=None):
         return super().read(rate, channel1, channel2) >> 4
 
+    async def read_async(self, rate=4, channel1=0, channel2=None):
+        return (await super().read_async(rate, channel1, channel2)) >> 4
+
+    async def scan(self, channels, rate=4, out=None):
+        out = await super().scan(channels, rate, out)
+        for i in range(len(out)):
+            out[i] >>= 4
+        return out
+
     def alert_start(self, rate=4, channel1=0, channel2=None, threshold_high=0x400,
         threshold_low=0, latched=False):
         return super().alert_start(rate, channel1, channel2, threshold_high << 4,
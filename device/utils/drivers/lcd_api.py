@@ -104,16 +104,20 @@ class LcdApi:
         self.backlight = False
         self.hal_backlight_off()
 
+    def _ddram_addr(self):
+
+        addr = self.cursor_x & 0x3f
+        if self.cursor_y & 1:
+            addr += 0x40    # Lines 1 & 3 add 0x40
+        if self.cursor_y & 2:    # Lines 2 & 3 add number of columns
+            addr += self.num_columns
+        return addr
+
     def move_to(self, cursor_x, cursor_y):
 
         self.cursor_x = cursor_x
         self.cursor_y = cursor_y
-        addr = cursor_x & 0x3f
-        if cursor_y & 1:
-            addr += 0x40    # Lines 1 & 3 add 0x40
-        if cursor_y & 2:    # Lines 2 & 3 add number of columns
-            addr += self.num_columns
-        self.hal_write_command(self.LCD_DDRAM | addr)
+        self.hal_write_command(self.LCD_DDRAM | self._ddram_addr())
 
     def putchar(self, char):
 
@@ -127,13 +131,15 @@ class LcdApi:
         else:
             self.hal_write_data(ord(char))
             self.cursor_x += 1
+        # The controller auto-increments the address after each character;
+        # only a line wrap (or newline) needs an explicit move.
         if self.cursor_x >= self.num_columns:
             self.cursor_x = 0
             self.cursor_y += 1
             self.implied_newline = (char != '\n')
-        if self.cursor_y >= self.num_lines:
-            self.cursor_y = 0
-        self.move_to(self.cursor_x, self.cursor_y)
+            if self.cursor_y >= self.num_lines:
+                self.cursor_y = 0
+            self.move_to(self.cursor_x, self.cursor_y)
 
     def putstr(self, string):
 
@@ -12,6 +12,11 @@ MASK_E = 0x04
 SHIFT_BACKLIGHT = 3
 SHIFT_DATA = 4
 
+# Each byte sent to the LCD is 4 expander writes: high nibble with E set,
+# high nibble with E clear (latch), then the same for the low nibble.
+# One full 20x4 screen plus its 4 DDRAM moves fits in one burst.
+_BURST_BYTES = 84
+
 
 class I2cLcd(LcdApi):
 
@@ -19,7 +24,17 @@ class I2cLcd(LcdApi):
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
-        self.i2c.writeto(self.i2c_addr, bytearray([0]))
+        self.backlight = False
+        self._one = bytearray(1)
+        self._four = bytearray(4)
+        self._buf = bytearray(4 * _BURST_BYTES)
+        self._mv = memoryview(self._buf)
+        self._n = 0     # bytes queued by burst_move / burst_data
+        # Expander byte for every (nibble, RS) pair with the current
+        # backlight bit; index = nibble | RS << 4, E is OR-ed in when sent.
+        self._nib = bytearray(32)
+        self._build_nibbles()
+        self._write_one(0)
         sleep_ms(20)   # Allow LCD time to powerup
         # Send reset 3 times
         self.hal_write_init_nibble(self.LCD_FUNCTION_RESET)
@@ -37,37 +52,116 @@ class I2cLcd(LcdApi):
             cmd |= self.LCD_FUNCTION_2LINES
         self.hal_write_command(cmd)
 
+    def _build_nibbles(self):
+        bl = (1 << SHIFT_BACKLIGHT) if self.backlight else 0
+        for i in range(32):
+            self._nib[i] = ((i & 0x0f) << SHIFT_DATA) | bl | (MASK_RS if i & 0x10 else 0)
+
+    def _write_one(self, byte):
+        self._one[0] = byte
+        self.i2c.writeto(self.i2c_addr, self._one)
+
+    def _encode(self, buf, n, value, rs):
+        # Appends the 4 expander writes for one byte at buf[n]; returns new n.
+        nib = self._nib
+        hi = nib[(value >> 4) & 0x0f | rs]
+        lo = nib[value & 0x0f | rs]
+        buf[n] = hi | MASK_E
+        buf[n + 1] = hi
+        buf[n + 2] = lo | MASK_E
+        buf[n + 3] = lo
+        return n + 4
+
     def hal_write_init_nibble(self, nibble):
 
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        buf = self._mv
+        buf[0] = byte | MASK_E
+        buf[1] = byte
+        self.i2c.writeto(self.i2c_addr, buf[:2])
 
     def hal_backlight_on(self):
 
-        self.i2c.writeto(self.i2c_addr, bytearray([1 << SHIFT_BACKLIGHT]))
+        self._build_nibbles()
+        self._write_one(1 << SHIFT_BACKLIGHT)
 
     def hal_backlight_off(self):
 
-        self.i2c.writeto(self.i2c_addr, bytearray([0]))
+        self._build_nibbles()
+        self._write_one(0)
 
     def hal_write_command(self, cmd):
 
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        self._encode(self._four, 0, cmd, 0)
+        self.i2c.writeto(self.i2c_addr, self._four)
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             sleep_ms(5)
 
     def hal_write_data(self, data):
 
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        self._encode(self._four, 0, data, 0x10)
+        self.i2c.writeto(self.i2c_addr, self._four)
+
+    def putstr(self, string):
+        """Writes `string` in as few I2C transactions as possible.
+
+        The LCD auto-increments its address after each character, so only
+        line wraps and newlines need a DDRAM move, and those are encoded
+        into the same burst. Each character takes 4 bytes on the bus, but
+        only 2 of them (~45 us at 400 kHz) separate the low-nibble latch
+        of one character from the high-nibble latch of the next. That is
+        just over the 37 us the HD44780 needs to execute a write; clones
+        that are slower than the datasheet need pins.I2C_FREQ lowered to
+        100 kHz (~180 us).
+        """
+        buf = self._buf
+        limit = len(buf) - 8
+        n = 0
+        for char in string:
+            if n > limit:
+                self.i2c.writeto(self.i2c_addr, self._mv[:n])
+                n = 0
+            if char == '\n':
+                if self.implied_newline:
+                    self.implied_newline = False
+                    continue
+                self.cursor_x = self.num_columns
+            else:
+                n = self._encode(buf, n, ord(char), 0x10)
+                self.cursor_x += 1
+            if self.cursor_x >= self.num_columns:
+                self.cursor_x = 0
+                self.cursor_y += 1
+                self.implied_newline = (char != '\n')
+                if self.cursor_y >= self.num_lines:
+                    self.cursor_y = 0
+                n = self._encode(buf, n, self.LCD_DDRAM | self._ddram_addr(), 0)
+        if n:
+            self.i2c.writeto(self.i2c_addr, self._mv[:n])
+
+    # Queued writes for partial updates: any number of moves and runs of
+    # characters go out together in as few transactions as the buffer
+    # allows. Runs must not cross the end of a line.
+
+    def _queue(self, value, rs):
+        if self._n > len(self._buf) - 4:
+            self.burst_end()
+        self._n = self._encode(self._buf, self._n, value, rs)
+
+    def burst_move(self, cursor_x, cursor_y):
+        self.cursor_x = cursor_x
+        self.cursor_y = cursor_y
+        self._queue(self.LCD_DDRAM | self._ddram_addr(), 0)
+
+    def burst_data(self, data, start, end):
+        for i in range(start, end):
+            self._queue(data[i], 0x10)
+        self.cursor_x += end - start
+
+    def burst_end(self):
+        n = self._n
+        if n:
+            self._n = 0
+            self.i2c.writeto(self.i2c_addr, self._mv[:n])
+        return n
@@ -0,0 +1,93 @@
+# device/utils/drivers/rs485.py
+
+import uasyncio as asyncio
+from time import ticks_ms, ticks_us, ticks_diff, ticks_add
+from utils.loop_monitor import section
+
+# Por encima de 19200 baudios Modbus fija el silencio entre tramas en 1.75 ms.
+_MIN_GAP_US = 1750
+# El driver UART del ESP32 entrega los bytes por ráfagas (umbral de FIFO /
+# timeout de RX), así que el silencio efectivo nunca baja de unos ms.
+_MIN_GAP_MS = 5
+
+_tx_section = section("rs485.tx")
+
+
+class RS485:
+    """Transceptor half-duplex (MAX485) sobre UART, sin esperas bloqueantes.
+
+    `transact` envía una trama con DE/RE en alto, suelta el bus en cuanto sale
+    el último bit y devuelve la respuesta al llegar el número de bytes
+    esperado o tras el silencio entre tramas (3.5 caracteres), lo que ocurra
+    antes. Mientras llega la respuesta el bucle de uasyncio sigue atendiendo
+    otras tareas; la transmisión de la petición se espera en activo (ver
+    `_wait_tx`).
+    """
+
+    def __init__(self, uart, de_re, baudrate=9600, timeout_ms=500):
+        self.uart = uart
+        self.de_re = de_re
+        self.timeout_ms = timeout_ms
+        self._char_us = 10_000_000 // baudrate       # 8N1: 10 bits por carácter
+        gap_us = max(_MIN_GAP_US, self._char_us * 35 // 10)
+        self.gap_ms = max(_MIN_GAP_MS, (gap_us + 999) // 1000)
+        self._sreader = asyncio.StreamReader(uart)
+        self.de_re.off()
+
+    def _flush_rx(self):
+        n = self.uart.any()
+        if n:
+            self.uart.read(n)
+
+    def _wait_tx(self, nbytes, t0):
+        # Espera activa de la trama entera: si se cediera el bucle, cualquier
+        # sección síncrona de otra tarea (volcado del LCD, escritura del log)
+        # dejaría DE/RE en alto dentro de la ventana de respuesta del esclavo,
+        # que puede empezar a los 3.5 caracteres. Cuesta el tiempo de la
+        # trama (una petición Modbus de 8 bytes: 8.3 ms a 9600 baudios, por
+        # encima de los 5 ms de bloqueo objetivo, una vez por lectura; 4.2 ms
+        # a 19200). El driver del ESP32 no expone el modo RS485 half-duplex
+        # con RTS como DE, que lo haría por hardware.
+        frame_us = nbytes * self._char_us
+        txdone = getattr(self.uart, "txdone", None)
+        if txdone is None:
+            while ticks_diff(ticks_us(), t0) < frame_us:
+                pass
+        else:
+            # Tope de dos caracteres por si el driver no llega a marcarlo.
+            limit = frame_us + 2 * self._char_us
+            while not txdone() and ticks_diff(ticks_us(), t0) < limit:
+                pass
+
+    async def transact(self, frame, expected, timeout_ms=None):
+        """Envía `frame` y espera hasta `expected` bytes. None si no hay respuesta."""
+        self._flush_rx()
+        with _tx_section:
+            self.de_re.on()
+            try:
+                t0 = ticks_us()
+                self.uart.write(frame)
+                self._wait_tx(len(frame), t0)
+            finally:
+                self.de_re.off()
+        return await self._receive(expected, self.timeout_ms if timeout_ms is None else timeout_ms)
+
+    async def _receive(self, expected, timeout_ms):
+        resp = b""
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        while len(resp) < expected:
+            remaining = ticks_diff(deadline, ticks_ms())
+            if remaining <= 0:
+                break
+            # Antes del primer byte manda el timeout; después, el silencio
+            # entre tramas marca el final de la respuesta.
+            wait = min(remaining, self.gap_ms) if resp else remaining
+            try:
+                chunk = await asyncio.wait_for_ms(self._sreader.read(expected - len(resp)), wait)
+            except asyncio.TimeoutError:
+                if resp and self.uart.any():
+                    continue      # el bucle tardó en despertarnos; aún hay datos
+                break
+            if chunk:
+                resp += chunk
+        return resp or None
@@ -0,0 +1,111 @@
+# device/utils/i2c_bus.py
+
+import uasyncio as asyncio
+from machine import Pin, I2C, SoftI2C
+from config import pins
+from utils.logger import info, error
+
+
+class I2CBus:
+    """Bus I2C único compartido por LCD, ADS1115 y DS3231.
+
+    Expone la API de `machine.I2C` que usan los drivers y cuenta, por
+    dirección, transacciones, bytes y errores. Cada llamada es atómica; las
+    secuencias de varios pasos (ráfaga del LCD, conversión del ADS1115) se
+    serializan entre tareas con `async with bus.lock`.
+    """
+
+    def __init__(self, i2c, freq, hardware):
+        self.i2c = i2c
+        self.freq = freq
+        self.hardware = hardware
+        self.lock = asyncio.Lock()
+        self.stats = {}       # dirección -> [transacciones, bytes, errores]
+
+    def _count(self, addr, nbytes):
+        st = self.stats.get(addr)
+        if st is None:
+            st = self.stats[addr] = [0, 0, 0]
+        st[0] += 1
+        st[1] += nbytes
+
+    def _fail(self, addr):
+        self.stats[addr][2] += 1
+
+    def scan(self):
+        return self.i2c.scan()
+
+    def writeto(self, addr, buf, stop=True):
+        self._count(addr, len(buf))
+        try:
+            return self.i2c.writeto(addr, buf, stop)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self._count(addr, nbytes)
+        try:
+            return self.i2c.readfrom(addr, nbytes, stop)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self._count(addr, len(buf))
+        try:
+            self.i2c.readfrom_into(addr, buf, stop)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        self._count(addr, len(buf) + 1)
+        try:
+            self.i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        self._count(addr, nbytes + 1)
+        try:
+            return self.i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8):
+        self._count(addr, len(buf) + 1)
+        try:
+            self.i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        except OSError:
+            self._fail(addr)
+            raise
+
+    def info(self):
+        return {
+            "driver": "I2C" if self.hardware else "SoftI2C",
+            "freq": self.freq,
+            "devices": {"0x%02x" % a: {"transactions": s[0], "bytes": s[1], "errors": s[2]}
+                        for a, s in self.stats.items()},
+        }
+
+
+_bus = None
+
+
+def bus():
+    """Instancia compartida; la primera llamada configura el periférico."""
+    global _bus
+    if _bus is not None:
+        return _bus
+    scl, sda = Pin(pins.SCL_PIN), Pin(pins.SDA_PIN)
+    try:
+        i2c = I2C(pins.I2C_ID, scl=scl, sda=sda, freq=pins.I2C_FREQ)
+        _bus = I2CBus(i2c, pins.I2C_FREQ, True)
+        info(f"Bus I2C hardware {pins.I2C_ID} a {pins.I2C_FREQ // 1000} kHz.")
+    except Exception as e:
+        error(f"I2C hardware no disponible ({e}); se usa SoftI2C.")
+        _bus = I2CBus(SoftI2C(scl=scl, sda=sda), 100000, False)
+    return _bus
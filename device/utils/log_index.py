@@ -0,0 +1,124 @@
+# device/utils/log_index.py
+#
+# Formato de los segmentos de log y de su índice. Sin dependencias de
+# MicroPython: lo usan utils/logger.py en la placa y tools/logq.py en el PC.
+#
+# event.log es el segmento en curso; event.log.1 ... event.log.N-1 los
+# anteriores, del más reciente al más antiguo. Junto a cada segmento,
+# <segmento>.idx guarda una entrada de 12 bytes (época, offset, nº de
+# registro) cada EVERY registros; al rotar se añade una entrada final con
+# el último instante, el tamaño del archivo y el total de registros.
+
+import struct
+import time
+
+ENTRY = "<III"
+ENTRY_SIZE = 12
+EVERY = 32
+
+_gmtime = getattr(time, "gmtime", time.localtime)
+
+
+def _unix_offset():
+    # time.time() cuenta desde 2000-01-01 en el ESP32 y desde 1970 en el
+    # simulador; el índice guarda esa época.
+    year = _gmtime(0)[0]
+    days = sum(366 if (y % 4 == 0 and y % 100) or y % 400 == 0 else 365
+               for y in range(1970, year))
+    return days * 86400
+
+
+UNIX_OFFSET = _unix_offset()   # segundos Unix = época de la placa + UNIX_OFFSET
+
+
+def segment_path(base, i):
+    return base if i == 0 else "%s.%d" % (base, i)
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def stamp(epoch):
+    """Marca de tiempo de los registros ("AAAA-MM-DD hh:mm:ss")."""
+    t = _gmtime(epoch)
+    return "%04d-%02d-%02d %02d:%02d:%02d" % tuple(t[:6])
+
+
+def read_index(path):
+    """Entradas (época, offset, nº de registro) del índice de `path`."""
+    try:
+        with open(index_path(path), "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    return [struct.unpack_from(ENTRY, data, i)
+            for i in range(0, len(data) - ENTRY_SIZE + 1, ENTRY_SIZE)]
+
+
+def closed(entries, size):
+    """True si el segmento ya rotó (su última entrada marca el final)."""
+    return bool(entries) and entries[-1][1] == size
+
+
+def seek_offset(entries, t0):
+    """Offset de la última entrada anterior a `t0`: ningún registro previo
+    a ese punto puede caer en el rango."""
+    lo, hi = 0, len(entries)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if entries[mid][0] < t0:
+            lo = mid + 1
+        else:
+            hi = mid
+    return entries[lo - 1][1] if lo else 0
+
+
+def level_of(line, levels):
+    """Nivel numérico de una línea "[fecha][NIVEL] ..." (0 si no se reconoce)."""
+    a = line.find(b"][") + 2
+    if a < 2:
+        return 0
+    return levels.get(line[a:line.find(b"]", a)].decode(), 0)
+
+
+def query(base, segments, t0, t1, levels, min_level=0, epoch_offset=0):
+    """Genera (nivel, línea) de los registros con marca de tiempo entre `t0` y `t1` (épocas,
+    inclusive) del más antiguo al más reciente. El índice de cada segmento
+    lo descarta entero o da el offset desde el que leer.
+
+    `t0`, `t1` y el índice van en la época de la placa; fuera de ella
+    (tools/logq.py), `epoch_offset` es lo que hay que sumarles para
+    obtener la época del intérprete que ejecuta la consulta."""
+    import os
+    s0 = stamp(t0 + epoch_offset).encode()
+    s1 = stamp(t1 + epoch_offset).encode()
+    for i in range(segments - 1, -1, -1):
+        path = segment_path(base, i)
+        try:
+            size = os.stat(path)[6]
+        except OSError:
+            continue
+        entries = read_index(path)
+        if entries:
+            if entries[0][0] > t1:
+                return                    # este y los más recientes, fuera
+            if closed(entries, size) and entries[-1][0] < t0:
+                continue
+            offset = seek_offset(entries, t0)
+        else:
+            offset = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                ts = line[1:20]
+                if len(line) < 21 or not 48 <= line[1] <= 57 or ts < s0:
+                    continue
+                if ts > s1:
+                    return
+                lvl = level_of(line, levels)
+                if lvl >= min_level:
+                    yield lvl, line.rstrip(b"\n")
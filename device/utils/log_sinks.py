@@ -0,0 +1,181 @@
+# device/utils/log_sinks.py
+#
+# Destinos de los registros del logger además de la flash. Cada destino
+# tiene su propio nivel mínimo; los que salen por red o UART encolan el
+# registro (cola acotada: si se llena se descarta el más antiguo) y una
+# corrutina lo envía, así que `info()` / `error()` nunca esperan al medio.
+#
+# Estos módulos no deben registrar nada con utils.logger: un fallo del
+# destino se cuenta en `stats` y se informa por consola.
+
+import uasyncio as asyncio
+
+_RETRY_MS = 500           # espera tras un envío fallido
+_UART_CHUNK = 128         # bytes por escritura, dentro del buffer TX del driver
+
+# Severidad syslog (RFC 5424) por nivel del logger.
+_SEVERITY = {10: 7, 20: 6, 30: 4, 40: 3}
+_FACILITY_LOCAL0 = 16
+
+
+class Sink:
+    def __init__(self, name, level=0):
+        self.name = name
+        self.level = level
+        self.stats = {"records": 0, "dropped": 0, "errors": 0}
+
+    def emit(self, lvl_num, data):
+        """`data`: registro completo en bytes, terminado en salto de línea."""
+        raise NotImplementedError
+
+    def info(self):
+        return dict(self.stats, level=self.level)
+
+
+class ConsoleSink(Sink):
+    def __init__(self, level=0):
+        super().__init__("console", level)
+
+    def emit(self, lvl_num, data):
+        self.stats["records"] += 1
+        print(data.decode(), end="")
+
+
+class NullSink(Sink):
+    """Descarta los registros (benchmarks: mide el coste del logger sin E/S)."""
+
+    def __init__(self, level=0):
+        super().__init__("null", level)
+
+    def emit(self, lvl_num, data):
+        self.stats["records"] += 1
+
+
+class QueuedSink(Sink):
+    """Destino con cola acotada que vacía la corrutina `run()`."""
+
+    def __init__(self, name, level=0, maxlen=32):
+        super().__init__(name, level)
+        self.maxlen = maxlen
+        self._q = []
+        self._ev = asyncio.Event()
+        self.stats["sent"] = 0
+
+    def frame(self, lvl_num, data):
+        return data
+
+    def emit(self, lvl_num, data):
+        self.stats["records"] += 1
+        if len(self._q) >= self.maxlen:
+            self._q.pop(0)
+            self.stats["dropped"] += 1
+        self._q.append(self.frame(lvl_num, data))
+        self._ev.set()
+
+    async def open(self):
+        pass
+
+    async def send(self, data):
+        """Envía `data`; False si hay que reintentar más tarde."""
+        raise NotImplementedError
+
+    async def run(self, watch=None):
+        await self.open()
+        while True:
+            if not self._q:
+                self._ev.clear()
+                await self._ev.wait()
+                continue
+            try:
+                ok = await self.send(self._q[0])
+            except Exception as e:
+                self.stats["errors"] += 1
+                print("LOG-SINK %s: %s" % (self.name, e))
+                ok = False
+            if ok:
+                self._q.pop(0)
+                self.stats["sent"] += 1
+            else:
+                await asyncio.sleep_ms(_RETRY_MS)
+            if watch:
+                watch.beat()
+
+    def info(self):
+        d = super().info()
+        d["queued"] = len(self._q)
+        return d
+
+
+class UdpSyslogSink(QueuedSink):
+    """Syslog por UDP (formato BSD, RFC 3164) hacia un colector."""
+
+    def __init__(self, host, port=514, level=0, tag="bioreactor", maxlen=32):
+        super().__init__("syslog", level, maxlen)
+        self.host = host
+        self.port = port
+        self.tag = tag
+        self._sock = None
+        self._addr = None
+
+    def frame(self, lvl_num, data):
+        pri = _FACILITY_LOCAL0 * 8 + _SEVERITY.get(lvl_num, 6)
+        return ("<%d>%s: " % (pri, self.tag)).encode() + data.rstrip(b"\n")
+
+    async def open(self):
+        import socket
+        self._addr = socket.getaddrinfo(self.host, self.port)[0][-1]
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    async def send(self, data):
+        try:
+            self._sock.sendto(data, self._addr)
+        except OSError:
+            # Sin ruta (AP sin clientes) o buffers de lwIP llenos.
+            self.stats["errors"] += 1
+            return False
+        return True
+
+
+class UartSink(QueuedSink):
+    """Copia de los registros por una UART (p. ej. a un registrador serie)."""
+
+    def __init__(self, uart_id, baudrate=115200, tx=None, level=0, maxlen=32):
+        super().__init__("uart", level, maxlen)
+        self.uart_id = uart_id
+        self.baudrate = baudrate
+        self.tx = tx
+        self._uart = None
+        self._char_us = 10_000_000 // baudrate       # 8N1
+
+    async def open(self):
+        from machine import UART
+        if self.tx is None:
+            self._uart = UART(self.uart_id, baudrate=self.baudrate)
+        else:
+            self._uart = UART(self.uart_id, baudrate=self.baudrate, tx=self.tx)
+
+    async def send(self, data):
+        # Por trozos que caben en el buffer del driver, cediendo el bucle
+        # mientras salen por la línea.
+        mv = memoryview(data)
+        for i in range(0, len(data), _UART_CHUNK):
+            chunk = mv[i:i + _UART_CHUNK]
+            self._uart.write(chunk)
+            await asyncio.sleep_ms((len(chunk) * self._char_us + 999) // 1000)
+        return True
+
+
+def from_config(runtime):
+    """Destinos adicionales declarados en config/runtime.py."""
+    from utils.logger import level_num
+    sinks = []
+    syslog = getattr(runtime, "LOG_SYSLOG", None)
+    if syslog:
+        host, port, level = syslog
+        sinks.append(UdpSyslogSink(host, port, level_num(level)))
+    uart = getattr(runtime, "LOG_UART", None)
+    if uart:
+        uart_id, baudrate, tx, level = uart
+        sinks.append(UartSink(uart_id, baudrate, tx, level_num(level)))
+    return sinks
@@ -1,10 +1,38 @@
 # utils/logger.py
 
 import os
+import struct
 import time
+from array import array
+from utils.loop_monitor import section
+from utils import log_index
+from utils.log_sinks import ConsoleSink
 
+# event.log rota a event.log.1 ... event.log.4 (formato e índice en
+# utils/log_index.py); el más antiguo se descarta.
 _LOG_FILE = "event.log"
-_MAX_SIZE_BYTES = 200 * 1024
+_MAX_SIZE_BYTES = 80 * 1024     # por segmento
+_SEGMENTS = 5
+
+# Los registros se acumulan en RAM y van a la flash en una sola escritura
+# cuando el buffer se llena, cuando el más antiguo supera _FLUSH_MS o con
+# cada ERROR.
+_BUF_SIZE = 2048
+_FLUSH_MS = 10000
+
+# Últimos registros en RAM para /api/logs: ranuras fijas de _RING_SLOT
+# bytes (los registros más largos se recortan; el archivo los tiene enteros).
+_RING_N = 48
+_RING_SLOT = 160
+
+# Tormentas de fallos: un mensaje idéntico al anterior solo se cuenta (y
+# se resume como "repetido N veces", como mucho cada _REPEAT_MAX_MS), y
+# cada plantilla de mensaje tiene un cubo de _BUCKET_BURST registros que
+# se rellena a razón de uno cada _BUCKET_REFILL_MS.
+_REPEAT_MAX_MS = 60000
+_BUCKET_BURST = 5
+_BUCKET_REFILL_MS = 10000
+_BUCKETS_MAX = 32
 
 _LEVELS = {
     "DEBUG": 10,
@@ -13,50 +41,473 @@ _LEVELS = {
     "ERROR": 40,
 }
 
+_NAMES = {v: k for k, v in _LEVELS.items()}
+
 _current_level_num = _LEVELS["DEBUG"]
+_module_levels = {}       # módulo -> nivel propio (ver get())
+_loggers = {}
+_write_section = section("log.write")
+
+_buf = bytearray(_BUF_SIZE)
+_mv = memoryview(_buf)
+_len = 0
+_first_ms = None          # ticks del registro más antiguo sin volcar
+_file_size = None         # tamaño de event.log; se consulta a os.stat una vez
+_seg_count = 0            # registros en el segmento en curso
+_last_t = 0               # época del último registro escrito en este arranque
+_idx_pending = []         # entradas de índice que se escriben con el próximo volcado
+stats = {"records": 0, "flushes": 0, "bytes": 0, "errors": 0,
+         "repeated": 0, "rate_limited": 0}
+
+_last_msg = None          # último mensaje emitido (sin marca de tiempo)
+_last_lvl = 0
+_repeat = 0               # repeticiones de _last_msg aún sin resumir
+_repeat_ms = 0
+_buckets = {}             # plantilla -> [fichas, ticks de la última recarga, descartados]
+
+# La flash es un destino más con su propio nivel; consola y los de
+# utils/log_sinks.py (syslog, UART...) van en _sinks.
+_flash_level = 0
+_flash_skipped = 0        # registros que no llegaron a la flash por su nivel
+_sinks = [ConsoleSink()]
+
+_ring = bytearray(_RING_N * _RING_SLOT)
+_ring_mv = memoryview(_ring)
+_ring_len = array("H", [0] * _RING_N)
+_ring_lvl = bytearray(_RING_N)
+_seq = 0                  # número de secuencia del último registro
 
-def set_level(level: str) -> None:
+def set_level(level: str, module: str = None) -> None:
+    """Nivel global o, con `module`, el de los registros de `get(module)`."""
     global _current_level_num
     lvl = level.upper()
     if lvl not in _LEVELS:
         raise ValueError("Logger: invalid level '%s'" % level)
-    _current_level_num = _LEVELS[lvl]
+    if module is None:
+        _current_level_num = _LEVELS[lvl]
+        return
+    _module_levels[module] = _LEVELS[lvl]
+    if module in _loggers:
+        _loggers[module].level = _LEVELS[lvl]
+
+def add_sink(sink) -> None:
+    _sinks.append(sink)
+
+def remove_sink(name: str) -> None:
+    for s in _sinks:
+        if s.name == name:
+            _sinks.remove(s)
+            return
+
+def set_sink_level(name: str, level: str) -> None:
+    """Nivel mínimo de un destino ("flash", "console", "syslog"...)."""
+    global _flash_level
+    lvl = _LEVELS.get(level.upper())
+    if lvl is None:
+        raise ValueError("Logger: invalid level '%s'" % level)
+    if name == "flash":
+        _flash_level = lvl
+        return
+    for s in _sinks:
+        if s.name == name:
+            s.level = lvl
+            return
+    raise ValueError("Logger: unknown sink '%s'" % name)
+
+def sinks() -> dict:
+    out = {s.name: s.info() for s in _sinks}
+    out["flash"] = {"level": _flash_level, "skipped": _flash_skipped,
+                    "records": stats["records"] - _flash_skipped}
+    return out
 
-def _timestamp() -> str:
+def _timestamp(now_s) -> str:
     try:
-        y, m, d, _, hh, mm, ss, _ = time.localtime()
-        return f"{y:04d}-{m:02d}-{d:02d} {hh:02d}:{mm:02d}:{ss:02d}"
+        return log_index.stamp(now_s)
     except Exception:
         return f"t+{time.ticks_ms()}ms"
 
-def _rotate_log() -> None:
+def _open_segment() -> None:
+    """Tamaño y número de registros de event.log, una sola vez por arranque."""
+    global _file_size, _seg_count
+    if _file_size is not None:
+        return
+    try:
+        _file_size = os.stat(_LOG_FILE)[6]
+    except OSError:
+        _file_size = 0
+    if not _file_size:
+        return
+    entries = log_index.read_index(_LOG_FILE)
+    if not entries:
+        # Log sin índice (versiones anteriores): pasa a ser un segmento viejo.
+        _rotate()
+        return
+    _, offset, _seg_count = entries[-1]
+    try:
+        with open(_LOG_FILE, "rb") as f:
+            f.seek(offset)
+            while f.readline():
+                _seg_count += 1
+    except OSError:
+        pass
+
+def _rotate(now_s=0) -> None:
+    global _file_size, _seg_count
+    if _seg_count:
+        # Tras un reinicio aún no se conoce el último instante del segmento:
+        # se cierra con el del registro que provoca la rotación (una cota
+        # superior, así las consultas por rango no lo descartan de más).
+        try:
+            with open(log_index.index_path(_LOG_FILE), "ab") as f:
+                f.write(struct.pack(log_index.ENTRY, _last_t or now_s, _file_size, _seg_count))
+        except OSError:
+            pass
+    for i in range(_SEGMENTS - 1, 0, -1):
+        src = log_index.segment_path(_LOG_FILE, i - 1)
+        dst = log_index.segment_path(_LOG_FILE, i)
+        for a, b in ((src, dst), (log_index.index_path(src), log_index.index_path(dst))):
+            try:
+                os.remove(b)
+            except OSError:
+                pass
+            try:
+                os.rename(a, b)
+            except OSError:
+                pass
     try:
-        if os.stat(_LOG_FILE)[6] > _MAX_SIZE_BYTES:
-            os.rename(_LOG_FILE, _LOG_FILE + ".old")
+        os.remove(_LOG_FILE + ".old")     # esquema anterior de un solo respaldo
     except OSError:
         pass
+    _file_size = 0
+    _seg_count = 0
 
-def _write(line: str) -> None:
+def _write(data) -> None:
+    global _file_size
     try:
-        with open(_LOG_FILE, "a") as f:
-            f.write(line)
+        with open(_LOG_FILE, "ab") as f:
+            f.write(data)
+        _file_size += len(data)
+        stats["flushes"] += 1
+        stats["bytes"] += len(data)
     except Exception as exc:
-        print("LOG-ERR:", exc, line, end="")
+        stats["errors"] += 1
+        print("LOG-ERR:", exc)
+
+def _flush_buf() -> None:
+    global _len, _first_ms
+    if not _len:
+        return
+    with _write_section:
+        _write(_mv[:_len])
+        if _idx_pending:
+            try:
+                with open(log_index.index_path(_LOG_FILE), "ab") as f:
+                    for entry in _idx_pending:
+                        f.write(entry)
+            except OSError:
+                pass
+            del _idx_pending[:]
+    _len = 0
+    _first_ms = None
+
+def flush() -> None:
+    """Vuelca a la flash los registros pendientes (y el resumen de
+    repeticiones en curso)."""
+    _summarize()
+    _flush_buf()
+
+def pending() -> int:
+    return _len
+
+def _summarize() -> None:
+    global _repeat
+    if _repeat:
+        n = _repeat
+        _repeat = 0
+        _record(_last_lvl, f"Último mensaje repetido {n} veces más")
 
-def log(level: str, msg: str) -> None:
-    lvl_name = level.upper()
-    lvl_num = _LEVELS.get(lvl_name, 20)
+def _tokens(b, now) -> int:
+    return min(_BUCKET_BURST, b[0] + time.ticks_diff(now, b[1]) // _BUCKET_REFILL_MS)
 
-    if lvl_num < _current_level_num:
+def _evict(now) -> None:
+    # Fuera los cubos que ya se habrían rellenado del todo (mensajes sin
+    # tormenta): olvidarlos no cambia nada. Uno vacío volvería con la
+    # ráfaga completa, así que si no hay llenos sale solo el que tiene
+    # más fichas.
+    full = [k for k, v in _buckets.items() if not v[2] and _tokens(v, now) >= _BUCKET_BURST]
+    for k in full:
+        del _buckets[k]
+    if not full:
+        del _buckets[max(_buckets, key=lambda k: _tokens(_buckets[k], now))]
+
+def _allow(key, now) -> bool:
+    """Cubo de fichas por plantilla de mensaje."""
+    b = _buckets.get(key)
+    if b is None:
+        if len(_buckets) >= _BUCKETS_MAX:
+            _evict(now)
+        _buckets[key] = [_BUCKET_BURST - 1, now, 0]
+        return True
+    refill = time.ticks_diff(now, b[1]) // _BUCKET_REFILL_MS
+    if refill:
+        b[0] = min(_BUCKET_BURST, b[0] + refill)
+        b[1] = time.ticks_add(b[1], refill * _BUCKET_REFILL_MS)
+    if b[0]:
+        b[0] -= 1
+        return True
+    b[2] += 1
+    return False
+
+def _emit(lvl_num: int, msg: str, args) -> None:
+    global _last_msg, _last_lvl, _repeat, _repeat_ms
+    key = msg
+    if args:
+        try:
+            msg = msg % args
+        except Exception:
+            msg = "%s %r" % (msg, args)
+    now = time.ticks_ms()
+    if msg == _last_msg and lvl_num == _last_lvl:
+        if not _repeat:
+            _repeat_ms = now
+        _repeat += 1
+        stats["repeated"] += 1
+        if time.ticks_diff(now, _repeat_ms) >= _REPEAT_MAX_MS:
+            _summarize()
+        return
+    if not _allow(key, now):
+        stats["rate_limited"] += 1
+        return
+    _summarize()
+    _last_msg, _last_lvl = msg, lvl_num
+    b = _buckets.get(key)
+    if b is not None and b[2]:
+        msg = f"{msg} (+{b[2]} suprimidos)"
+        b[2] = 0
+    _record(lvl_num, msg)
+
+def _record(lvl_num: int, msg: str) -> None:
+    global _len, _first_ms, _seq, _seg_count, _last_t, _flash_skipped
+    now_s = time.time()
+    record = f"[{_timestamp(now_s)}][{_NAMES[lvl_num]}] {msg}\n"
+    stats["records"] += 1
+
+    data = record.encode()
+    for s in _sinks:
+        if lvl_num >= s.level:
+            s.emit(lvl_num, data)
+    n = len(data)
+    _seq += 1
+    i = _seq % _RING_N
+    k = min(n - 1, _RING_SLOT)
+    # Sin partir un carácter UTF-8 (los mensajes llevan tildes): si el
+    # corte cae en un byte de continuación, se retrocede hasta su inicio.
+    while k < n - 1 and k and data[k] & 0xC0 == 0x80:
+        k -= 1
+    _ring_mv[i * _RING_SLOT:i * _RING_SLOT + k] = memoryview(data)[:k]
+    _ring_len[i] = k
+    _ring_lvl[i] = lvl_num
+
+    if lvl_num < _flash_level:
+        _flash_skipped += 1
+        return
+    _open_segment()
+    if _file_size + _len + n > _MAX_SIZE_BYTES and _file_size + _len:
+        _flush_buf()
+        _rotate(now_s)
+    if _len + n > _BUF_SIZE:
+        _flush_buf()
+    # Offset exacto del registro: lo pendiente en RAM va detrás del archivo.
+    if _seg_count % log_index.EVERY == 0:
+        _idx_pending.append(struct.pack(log_index.ENTRY, now_s, _file_size + _len, _seg_count))
+    _seg_count += 1
+    _last_t = now_s
+    if n > _BUF_SIZE:
+        with _write_section:
+            _write(data)
+    else:
+        _mv[_len:_len + n] = data
+        _len += n
+        if _first_ms is None:
+            _first_ms = time.ticks_ms()
+    if lvl_num >= _LEVELS["ERROR"] or (
+            _first_ms is not None and time.ticks_diff(time.ticks_ms(), _first_ms) >= _FLUSH_MS):
+        _flush_buf()
+
+def log(level: str, msg: str, *args) -> None:
+    """Registra `msg % args`; el formateo solo ocurre si el nivel está
+    activo, así que en rutas calientes conviene pasar los valores como
+    argumentos en lugar de construir un f-string."""
+    lvl_num = _LEVELS.get(level.upper(), 20)
+    if lvl_num >= _current_level_num:
+        _emit(lvl_num, msg, args)
+
+def level_num(name: str) -> int:
+    return _LEVELS.get(name.upper(), 0)
+
+def last_seq() -> int:
+    return _seq
+
+def tail(since: int = 0, min_level: int = 0, until: int = None):
+    """Generador de (seq, nivel, bytes) de los registros posteriores a
+    `since` (y hasta `until`, si se da) que siguen en RAM. Si alguno ya
+    salió del anillo, `in_ring` devuelve False y hay que leerlos de la
+    flash (`file_tail`)."""
+    last = _seq if until is None else until
+    seq = max(since, _seq - _RING_N) + 1
+    while seq <= last:
+        if seq <= _seq - _RING_N:
+            return            # sobrescrito mientras se consumía el generador
+        i = seq % _RING_N
+        if _ring_lvl[i] >= min_level:
+            yield seq, _ring_lvl[i], bytes(_ring_mv[i * _RING_SLOT:i * _RING_SLOT + _ring_len[i]])
+        seq += 1
+
+def in_ring(since: int) -> bool:
+    return since >= _seq - _RING_N
+
+def _tail_offset(path, lines):
+    """(offset, líneas encontradas) para leer las últimas `lines` líneas
+    de `path` recorriéndolo desde el final en bloques."""
+    try:
+        size = os.stat(path)[6]
+    except OSError:
+        return None, 0
+    buf = bytearray(512)
+    found = 0
+    pos = size
+    with open(path, "rb") as f:
+        while pos > 0:
+            step = min(512, pos)
+            pos -= step
+            f.seek(pos)
+            f.readinto(buf)
+            # El último byte del archivo es el salto de la última línea.
+            for j in range(step - 1, -1, -1):
+                if buf[j] == 10 and pos + j != size - 1:
+                    found += 1
+                    if found == lines:
+                        return pos + j + 1, found
+    return 0, found + (1 if size else 0)
+
+def file_tail(since: int, min_level: int = 0, until: int = None):
+    """Como `tail`, pero leyendo del final de los segmentos de log los
+    registros que ya no están en RAM (vuelca antes lo pendiente). Lo que
+    rotó fuera del último segmento no se recupera. Si la flash guarda solo
+    algunos niveles, las líneas del archivo no se corresponden con las
+    secuencias y se devuelven con seq None."""
+    flush()
+    want = _seq - since
+    if want <= 0:
         return
+    files = []
+    found = 0
+    for i in range(_SEGMENTS):
+        path = log_index.segment_path(_LOG_FILE, i)
+        start, got = _tail_offset(path, want - found)
+        if start is None:
+            break
+        files.append((path, start))
+        found += got
+        if found >= want:
+            break
+    seq = _seq - found
+    for path, offset in reversed(files):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                seq += 1
+                if until is not None and seq > until:
+                    return
+                lvl = log_index.level_of(line, _LEVELS)
+                if lvl >= min_level:
+                    yield (None if _flash_skipped else seq), lvl, line.rstrip(b"\n")
+
+def between(t0: int, t1: int, min_level: int = 0):
+    """(nivel, línea) de los registros entre las épocas `t0` y `t1`; el
+    índice de cada segmento lleva directamente al offset de inicio."""
+    flush()
+    return log_index.query(_LOG_FILE, _SEGMENTS, t0, t1, _LEVELS, min_level)
+
+def segments():
+    """Resumen de los segmentos (del en curso al más antiguo) según su índice."""
+    _open_segment()
+    out = []
+    for i in range(_SEGMENTS):
+        path = log_index.segment_path(_LOG_FILE, i)
+        try:
+            size = os.stat(path)[6]
+        except OSError:
+            break
+        entries = log_index.read_index(path)
+        info = {"file": path, "bytes": size, "index_entries": len(entries),
+                "first": entries[0][0] if entries else None,
+                "last": None, "records": None}
+        if i == 0:
+            info["bytes"] = _file_size + _len
+            info["last"] = _last_t or None
+            info["records"] = _seg_count
+        elif log_index.closed(entries, size):
+            info["last"] = entries[-1][0]
+            info["records"] = entries[-1][2]
+        out.append(info)
+    return out
+
+async def flusher(watch=None) -> None:
+    """Vuelca periódicamente aunque no lleguen registros nuevos."""
+    import uasyncio
+    while True:
+        wait = _FLUSH_MS
+        if _repeat and time.ticks_diff(time.ticks_ms(), _repeat_ms) >= _REPEAT_MAX_MS:
+            _summarize()
+        if _first_ms is not None:
+            wait = _FLUSH_MS - time.ticks_diff(time.ticks_ms(), _first_ms)
+            if wait <= 0:
+                flush()
+                wait = _FLUSH_MS
+        if watch:
+            watch.beat()
+        await uasyncio.sleep_ms(wait)
+
+def debug(msg: str, *args) -> None:
+    if _current_level_num <= 10: _emit(10, msg, args)
+def info(msg: str, *args) -> None:
+    if _current_level_num <= 20: _emit(20, msg, args)
+def warning(msg: str, *args) -> None:
+    if _current_level_num <= 30: _emit(30, msg, args)
+def error(msg: str, *args) -> None:
+    if _current_level_num <= 40: _emit(40, msg, args)
+
+
+class Logger:
+    """Registrador de un módulo con nivel propio (`set_level(nivel, nombre)`
+    o `LOG_LEVELS` en config/runtime.py); sin él usa el global."""
+
+    def __init__(self, name):
+        self.name = name
+        self.level = _module_levels.get(name)
+
+    def _on(self, lvl_num):
+        return lvl_num >= (_current_level_num if self.level is None else self.level)
+
+    def debug(self, msg, *args):
+        if self._on(10): _emit(10, msg, args)
+
+    def info(self, msg, *args):
+        if self._on(20): _emit(20, msg, args)
+
+    def warning(self, msg, *args):
+        if self._on(30): _emit(30, msg, args)
 
-    record = f"[{_timestamp()}][{lvl_name}] {msg}\n"
-    print(record, end='')
+    def error(self, msg, *args):
+        if self._on(40): _emit(40, msg, args)
 
-    _rotate_log()
-    _write(record)
 
-def debug(msg: str)   -> None: log("DEBUG",   msg)
-def info(msg: str)    -> None: log("INFO",    msg)
-def warning(msg: str) -> None: log("WARNING", msg)
-def error(msg: str)   -> None: log("ERROR",   msg)
+def get(name: str) -> Logger:
+    lg = _loggers.get(name)
+    if lg is None:
+        lg = _loggers[name] = Logger(name)
+    return lg
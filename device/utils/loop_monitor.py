@@ -0,0 +1,147 @@
+# device/utils/loop_monitor.py
+
+import uasyncio as asyncio
+import time
+from array import array
+
+# Cubetas del histograma de retraso en ms: [0,1), [1,2), [2,4) ... [4096,inf).
+_EDGES_MS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+
+class Histogram:
+    """Histograma de tamaño fijo en cubetas de potencias de 2 (ms). Los
+    percentiles devuelven el límite superior de su cubeta."""
+
+    def __init__(self):
+        self.counts = array("I", [0] * (len(_EDGES_MS) + 1))
+        self.n = 0
+        self.max_us = 0
+        self.total_us = 0
+
+    def add(self, us):
+        ms = us // 1000
+        i = 0
+        for edge in _EDGES_MS:
+            if ms < edge:
+                break
+            i += 1
+        self.counts[i] += 1
+        self.n += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p):
+        if not self.n:
+            return None
+        target = self.n * p
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return _EDGES_MS[i] if i < len(_EDGES_MS) else self.max_us / 1000
+        return self.max_us / 1000
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.n = self.max_us = self.total_us = 0
+
+    def report(self):
+        return {
+            "samples": self.n,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_us / 1000,
+            "mean_ms": self.total_us / self.n / 1000 if self.n else None,
+            "buckets": {str(_EDGES_MS[i]): c for i, c in enumerate(self.counts[:-1]) if c},
+        }
+
+
+class LoopMonitor:
+    """Corrutina que duerme `period_ms` y anota con cuánto retraso vuelve a
+    ejecutarse: el tiempo que el bucle estuvo bloqueado por código síncrono."""
+
+    def __init__(self, period_ms=100):
+        self.period_ms = period_ms
+        self.lag = Histogram()
+
+    async def run(self, watch=None):
+        period_us = self.period_ms * 1000
+        t0 = time.ticks_us()
+        while True:
+            await asyncio.sleep_ms(self.period_ms)
+            now = time.ticks_us()
+            self.lag.add(max(0, time.ticks_diff(now, t0) - period_us))
+            t0 = now
+            if watch:
+                watch.beat()
+
+
+class _Section:
+    __slots__ = ("name", "count", "total_us", "max_us", "_t0")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        self._t0 = 0
+
+    def __enter__(self):
+        self._t0 = time.ticks_us()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.ticks_diff(time.ticks_us(), self._t0)
+        self.count += 1
+        self.total_us += dt
+        if dt > self.max_us:
+            self.max_us = dt
+        return False
+
+
+_sections = {}
+monitor = LoopMonitor()
+
+
+def section(name):
+    """Gestor de contexto que cronometra una sección síncrona:
+
+        with section("lcd.flush"):
+            ...
+    """
+    s = _sections.get(name)
+    if s is None:
+        s = _sections[name] = _Section(name)
+    return s
+
+
+def timed(name):
+    """Decorador equivalente a `section` para una función síncrona."""
+    def wrap(fn):
+        s = section(name)
+
+        def timed_fn(*args, **kwargs):
+            with s:
+                return fn(*args, **kwargs)
+        return timed_fn
+    return wrap
+
+
+def report():
+    return {
+        "period_ms": monitor.period_ms,
+        "lag": monitor.lag.report(),
+        "sections": {s.name: {
+            "count": s.count,
+            "mean_ms": s.total_us / s.count / 1000 if s.count else None,
+            "max_ms": s.max_us / 1000,
+        } for s in _sections.values()},
+    }
+
+
+def reset():
+    monitor.lag.reset()
+    for s in _sections.values():
+        s.count = s.total_us = s.max_us = 0
@@ -0,0 +1,189 @@
+# device/utils/modbus.py
+
+import uasyncio as asyncio
+from array import array
+
+READ_HOLDING = 0x03
+READ_INPUT = 0x04
+WRITE_SINGLE = 0x06
+WRITE_MULTIPLE = 0x10
+
+# Límite de la especificación para una lectura (funciones 03/04).
+MAX_READ_REGS = 125
+
+# Códigos locales (negativos para no chocar con las excepciones Modbus).
+ERR_TIMEOUT = -1
+ERR_CRC = -2
+ERR_FRAME = -3
+
+
+def _crc_table():
+    tbl = array('H', range(256))
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        tbl[i] = crc
+    return tbl
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data, n=None):
+    """CRC-16/MODBUS por tabla (un acceso por byte en vez de 8 desplazamientos)."""
+    tbl = _CRC_TABLE
+    crc = 0xFFFF
+    for i in range(len(data) if n is None else n):
+        crc = (crc >> 8) ^ tbl[(crc ^ data[i]) & 0xFF]
+    return crc
+
+
+def build_frame(slave, function, address, value):
+    """Trama de 8 bytes (funciones 03/04/06) con el CRC ya calculado."""
+    f = bytearray(8)
+    f[0] = slave
+    f[1] = function
+    f[2] = address >> 8
+    f[3] = address & 0xFF
+    f[4] = value >> 8
+    f[5] = value & 0xFF
+    crc = crc16(f, 6)
+    f[6] = crc & 0xFF
+    f[7] = crc >> 8
+    return f
+
+
+class ModbusError(Exception):
+    """Fallo de una transacción. `code` es el código de excepción Modbus
+    devuelto por el esclavo o uno de ERR_TIMEOUT / ERR_CRC / ERR_FRAME."""
+
+    def __init__(self, slave, function, code):
+        super().__init__("Modbus esclavo %d fn %02x: código %d" % (slave, function, code))
+        self.slave = slave
+        self.function = function
+        self.code = code
+
+
+class ReadPlan:
+    """Lecturas de registros agrupadas en el mínimo de peticiones.
+
+    `blocks` es una lista de (esclavo, función, dirección, cantidad). Los
+    bloques contiguos (o separados por hasta `max_gap` registros) del mismo
+    esclavo y función se fusionan en una sola petición, cuyas tramas se
+    construyen una vez aquí y se reutilizan en cada sondeo.
+    """
+
+    def __init__(self, blocks, max_gap=0):
+        self.blocks = list(blocks)
+        order = sorted(range(len(self.blocks)), key=lambda i: self.blocks[i][:3])
+        self.requests = []   # [esclavo, función, inicio, cantidad, trama, [(bloque, offset)]]
+        cur = None
+        for i in order:
+            slave, fn, addr, count = self.blocks[i]
+            if (cur is not None and cur[0] == slave and cur[1] == fn
+                    and addr <= cur[2] + cur[3] + max_gap
+                    and max(cur[2] + cur[3], addr + count) - cur[2] <= MAX_READ_REGS):
+                cur[3] = max(cur[2] + cur[3], addr + count) - cur[2]
+                cur[5].append((i, addr - cur[2]))
+            else:
+                cur = [slave, fn, addr, count, None, [(i, 0)]]
+                self.requests.append(cur)
+        for req in self.requests:
+            req[4] = build_frame(req[0], req[1], req[2], req[3])
+        self.errors = []
+
+
+class ModbusClient:
+    """Maestro Modbus RTU sobre un transporte con `transact(frame, expected, timeout_ms)`.
+
+    Un único maestro por bus: el candado serializa las transacciones de
+    todas las tareas que comparten el cliente.
+    """
+
+    def __init__(self, bus, timeout_ms=300):
+        self.bus = bus
+        self.timeout_ms = timeout_ms
+        self.timeouts = {}       # esclavo -> ms (por defecto timeout_ms)
+        self._lock = asyncio.Lock()
+        self.stats = {"requests": 0, "timeouts": 0, "crc_errors": 0, "exceptions": 0}
+
+    def set_timeout(self, slave, timeout_ms):
+        self.timeouts[slave] = timeout_ms
+
+    async def _transact(self, slave, function, frame, expected):
+        async with self._lock:
+            self.stats["requests"] += 1
+            resp = await self.bus.transact(frame, expected, self.timeouts.get(slave, self.timeout_ms))
+        if not resp:
+            self.stats["timeouts"] += 1
+            raise ModbusError(slave, function, ERR_TIMEOUT)
+        n = len(resp)
+        if n < 5 or crc16(resp, n - 2) != resp[n - 2] | resp[n - 1] << 8:
+            self.stats["crc_errors"] += 1
+            raise ModbusError(slave, function, ERR_CRC)
+        if resp[0] != slave:
+            raise ModbusError(slave, function, ERR_FRAME)
+        if resp[1] == function | 0x80:
+            self.stats["exceptions"] += 1
+            raise ModbusError(slave, function, resp[2])
+        if resp[1] != function or n != expected:
+            raise ModbusError(slave, function, ERR_FRAME)
+        return resp
+
+    async def _read(self, slave, function, frame, count):
+        resp = await self._transact(slave, function, frame, 5 + 2 * count)
+        if resp[2] != 2 * count:
+            raise ModbusError(slave, function, ERR_FRAME)
+        return [resp[3 + 2 * i] << 8 | resp[4 + 2 * i] for i in range(count)]
+
+    async def read_holding(self, slave, address, count=1):
+        return await self._read(slave, READ_HOLDING, build_frame(slave, READ_HOLDING, address, count), count)
+
+    async def read_input(self, slave, address, count=1):
+        return await self._read(slave, READ_INPUT, build_frame(slave, READ_INPUT, address, count), count)
+
+    async def write_register(self, slave, address, value):
+        frame = build_frame(slave, WRITE_SINGLE, address, value & 0xFFFF)
+        resp = await self._transact(slave, WRITE_SINGLE, frame, 8)
+        if resp[:6] != frame[:6]:
+            raise ModbusError(slave, WRITE_SINGLE, ERR_FRAME)
+
+    async def write_registers(self, slave, address, values):
+        count = len(values)
+        frame = bytearray(9 + 2 * count)
+        frame[0] = slave
+        frame[1] = WRITE_MULTIPLE
+        frame[2] = address >> 8
+        frame[3] = address & 0xFF
+        frame[4] = count >> 8
+        frame[5] = count & 0xFF
+        frame[6] = 2 * count
+        for i, v in enumerate(values):
+            frame[7 + 2 * i] = (v >> 8) & 0xFF
+            frame[8 + 2 * i] = v & 0xFF
+        crc = crc16(frame, 7 + 2 * count)
+        frame[-2] = crc & 0xFF
+        frame[-1] = crc >> 8
+        resp = await self._transact(slave, WRITE_MULTIPLE, frame, 8)
+        if resp[:6] != frame[:6]:
+            raise ModbusError(slave, WRITE_MULTIPLE, ERR_FRAME)
+
+    async def execute(self, plan, out=None):
+        """Ejecuta un ReadPlan. Devuelve una lista paralela a `plan.blocks`
+        con los valores de cada bloque, o None si su petición falló; un
+        esclavo caído no impide leer a los demás del mismo bus."""
+        if out is None:
+            out = [None] * len(plan.blocks)
+        errors = []
+        for slave, fn, _, count, frame, members in plan.requests:
+            try:
+                values = await self._read(slave, fn, frame, count)
+            except ModbusError as e:
+                errors.append(e)
+                for i, _ in members:
+                    out[i] = None
+                continue
+            for i, off in members:
+                out[i] = values[off:off + plan.blocks[i][3]]
+        plan.errors = errors
+        return out
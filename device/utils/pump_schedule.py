@@ -0,0 +1,140 @@
+# device/utils/pump_schedule.py
+
+import json
+from config import sensor_params
+from utils.logger import info, error
+from system_state import inoculation_day
+
+_SCHEDULE_FILE = "pump_schedule.json"
+_DAY_S = 86400
+
+
+def _bisect_right(a, x):
+    lo, hi = 0, len(a)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < a[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _parse(entry):
+    """Normaliza una entrada de la tabla; ValueError si no es válida.
+
+    {"at": "HH:MM", "days": [primero, último], "duration_s": s} o
+    {"at": ..., "volume_l": L, "max_s": s}. `days` es opcional (todos los
+    días) y `último` puede ser null (sin fin).
+    """
+    try:
+        hh, mm = entry["at"].split(":")
+        hh, mm = int(hh), int(mm)
+    except Exception:
+        raise ValueError("'at' debe ser HH:MM")
+    if not (0 <= hh < 24 and 0 <= mm < 60):
+        raise ValueError("hora fuera de rango: %s" % entry["at"])
+    days = entry.get("days") or (1, None)
+    first = int(days[0])
+    last = None if days[1] is None else int(days[1])
+    if first < 1 or (last is not None and last < first):
+        raise ValueError("rango de días inválido: %s" % (days,))
+    e = {"at": "%02d:%02d" % (hh, mm), "days": [first, last], "tod": hh * 3600 + mm * 60}
+    if "volume_l" in entry:
+        e["volume_l"] = float(entry["volume_l"])
+        e["max_s"] = int(entry.get("max_s", 0))
+        if e["volume_l"] <= 0:
+            raise ValueError("volume_l debe ser positivo")
+        if not 0 <= e["max_s"] <= sensor_params.DOSE_MAX_S:
+            raise ValueError("max_s fuera de rango (0-%d)" % sensor_params.DOSE_MAX_S)
+    elif "duration_s" in entry:
+        e["duration_s"] = int(entry["duration_s"])
+        if not 0 < e["duration_s"] <= sensor_params.DOSE_MAX_S:
+            raise ValueError("duration_s fuera de rango (1-%d)" % sensor_params.DOSE_MAX_S)
+    else:
+        raise ValueError("cada entrada necesita duration_s o volume_l")
+    return e
+
+
+def _overlap(a, b):
+    a0, a1 = a["days"]
+    b0, b1 = b["days"]
+    return (a1 is None or b0 <= a1) and (b1 is None or a0 <= b1)
+
+
+class PumpSchedule:
+    """Tabla de dosificación por hora del día y día de inoculación.
+
+    Los días se cuentan desde el origen, como en el LCD (`inoculation_day`):
+    el día 1 son sus primeras 24 h, así que un día de inoculación empieza a
+    la hora del origen y no a medianoche. Para cada día se compila una sola
+    vez la lista ordenada de horas activas (como desplazamiento desde el
+    comienzo del día); el siguiente disparo se encuentra con una búsqueda
+    binaria.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._day = None
+        self._times = []
+        self._active = []
+
+    def set(self, entries):
+        parsed = sorted((_parse(e) for e in entries), key=lambda e: e["tod"])
+        for i in range(len(parsed)):
+            for j in range(i + 1, len(parsed)):
+                if parsed[i]["tod"] == parsed[j]["tod"] and _overlap(parsed[i], parsed[j]):
+                    raise ValueError("dos entradas a las %s en los mismos días" % parsed[i]["at"])
+        self.entries = parsed
+        self._day = None
+
+    def export(self):
+        return [{k: v for k, v in e.items() if k != "tod"} for e in self.entries]
+
+    def load(self):
+        try:
+            with open(_SCHEDULE_FILE, "r") as f:
+                self.set(json.load(f))
+            info(f"Tabla de bombeo cargada ({len(self.entries)} entradas).")
+        except OSError:
+            pass
+        except Exception as e:
+            error(f"Tabla de bombeo inválida, se ignora: {e}")
+
+    def save(self):
+        try:
+            with open(_SCHEDULE_FILE, "w") as f:
+                json.dump(self.export(), f)
+        except Exception as e:
+            error(f"No se pudo guardar la tabla de bombeo: {e}")
+
+    def _compile(self, day, shift):
+        active = [e for e in self.entries
+                  if e["days"][0] <= day and (e["days"][1] is None or day <= e["days"][1])]
+        self._active = sorted(active, key=lambda e: (e["tod"] - shift) % _DAY_S)
+        self._times = [(e["tod"] - shift) % _DAY_S for e in self._active]
+        self._day = (day, shift)
+
+    def next_fire(self, now_s, origin_s):
+        """(época en s, entrada) del primer disparo posterior a `now_s`, o
+        None si ninguna entrada volverá a estar activa."""
+        if not self.entries:
+            return None
+        day = inoculation_day(now_s, origin_s)
+        start = origin_s + (day - 1) * _DAY_S      # comienzo del día en curso
+        shift = origin_s % _DAY_S                  # hora del día del origen
+        off = now_s - start
+        horizon = max(e["days"][0] for e in self.entries)
+        open_ended = any(e["days"][1] is None or e["days"][1] >= day for e in self.entries)
+        while open_ended or day <= horizon:
+            if self._day != (day, shift):
+                self._compile(day, shift)
+            i = _bisect_right(self._times, off)
+            if i < len(self._times):
+                return start + self._times[i], self._active[i]
+            start += _DAY_S
+            day += 1
+            off = -1
+            open_ended = open_ended and any(e["days"][1] is None or e["days"][1] >= day
+                                            for e in self.entries)
+        return None
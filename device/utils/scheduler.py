@@ -0,0 +1,213 @@
+# device/utils/scheduler.py
+
+import heapq
+import time
+import uasyncio as asyncio
+from utils.logger import info, warning, error
+
+# Tope de cada espera: si el RTC se corrige, los plazos se reevalúan pronto.
+_MAX_SLEEP_MS = 60000
+# Retraso a partir del cual se avisa en el log.
+_LATE_WARN_MS = 5000
+
+
+def now_ms():
+    """Milisegundos de época (RTC); base común de todos los plazos."""
+    return time.time_ns() // 1_000_000
+
+
+class Cycle:
+    """Secuencia periódica de pasos anclada a un origen absoluto.
+
+    `steps` es una lista de (desfase en s, función) ordenada, con desfases
+    dentro de [0, period_s). El paso k-ésimo se ejecuta en
+    origen + n * periodo + desfase, así que los retrasos no se acumulan y
+    tras un reinicio se puede saber en qué fase del ciclo se está.
+    """
+
+    def __init__(self, name, period_s, steps):
+        self.name = name
+        self.period_ms = int(period_s * 1000)
+        self.steps = [(int(off * 1000), fn) for off, fn in steps]
+        self.runs = 0
+        self.missed = 0
+        self.late_last_ms = 0
+        self.late_max_ms = 0
+        self.next_ms = None
+        self.next_step = None
+
+    def at(self, origin_ms, t_ms):
+        """(paso vigente en t_ms, su inicio, inicio del siguiente paso)."""
+        p = self.period_ms
+        base = origin_ms + (t_ms - origin_ms) // p * p
+        pos = t_ms - base
+        n = len(self.steps)
+        idx = n - 1
+        for i in range(n):
+            if self.steps[i][0] > pos:
+                idx = i - 1
+                break
+        if idx < 0:
+            # Antes del primer paso del ciclo: sigue vigente el último del anterior.
+            idx = n - 1
+            base -= p
+        start = base + self.steps[idx][0]
+        if idx + 1 < n:
+            nxt = base + self.steps[idx + 1][0]
+        else:
+            nxt = base + p + self.steps[0][0]
+        return idx, start, nxt
+
+
+class Timer:
+    """Disparo único en un instante absoluto (ver Scheduler.call_at)."""
+
+    period_ms = None
+
+    def __init__(self, name):
+        self.name = name
+        self.fn = None
+        self.gen = 0          # las entradas del montículo de otra generación caducan
+        self.runs = 0
+        self.missed = 0
+        self.late_last_ms = 0
+        self.late_max_ms = 0
+        self.next_ms = None
+        self.next_step = 0
+
+
+class Scheduler:
+    """Un montículo de plazos para todos los ciclos y una sola corrutina."""
+
+    def __init__(self):
+        self.origin_ms = None
+        self.cycles = []
+        self.timers = {}
+        self._heap = []
+        self._seq = 0
+        self._wake = asyncio.Event()
+
+    def add(self, cycle):
+        self.cycles.append(cycle)
+        if self.origin_ms is not None:
+            self._arm(cycle, True)
+            self._wake.set()
+        return cycle
+
+    def remove(self, name):
+        """Quita el ciclo `name` y sus plazos pendientes."""
+        self.cycles = [c for c in self.cycles if c.name != name]
+        self._heap = [e for e in self._heap if e[2].name != name]
+        heapq.heapify(self._heap)
+
+    def call_at(self, name, deadline_ms, fn):
+        """Ejecuta `fn()` en `deadline_ms` (época en ms). Un temporizador
+        nuevo con el mismo nombre sustituye al pendiente."""
+        t = self.timers.get(name)
+        if t is None:
+            t = self.timers[name] = Timer(name)
+        t.fn = fn
+        t.gen += 1
+        t.next_ms = deadline_ms
+        self._seq += 1
+        heapq.heappush(self._heap, [deadline_ms, self._seq, t, t.gen])
+        self._wake.set()
+        return t
+
+    def cancel(self, name):
+        t = self.timers.get(name)
+        if t is not None:
+            t.gen += 1
+            t.next_ms = None
+
+    def set_origin(self, origin_s):
+        """Fija el origen de todos los ciclos (época en s) y los pone en la
+        fase que corresponde a la hora actual."""
+        self.origin_ms = origin_s * 1000
+        self._heap = [e for e in self._heap if e[2].period_ms is None]
+        heapq.heapify(self._heap)
+        for c in self.cycles:
+            self._arm(c, True)
+        self._wake.set()
+
+    def _run_step(self, c, idx):
+        try:
+            c.steps[idx][1]()
+        except Exception as e:
+            error("Planificador: fallo en '%s' paso %d: %s", c.name, idx, e)
+
+    def _arm(self, c, resume):
+        idx, _, nxt = c.at(self.origin_ms, now_ms())
+        if resume:
+            self._run_step(c, idx)
+        c.next_ms = nxt
+        c.next_step = (idx + 1) % len(c.steps)
+        self._seq += 1
+        heapq.heappush(self._heap, [nxt, self._seq, c, c.next_step])
+
+    def _fire(self, c, idx, deadline):
+        now = now_ms()
+        late = now - deadline
+        c.runs += 1
+        c.late_last_ms = late
+        if late > c.late_max_ms:
+            c.late_max_ms = late
+        if late > _LATE_WARN_MS:
+            warning("Planificador: '%s' paso %d con %d ms de retraso", c.name, idx, late)
+        if c.period_ms is None:
+            c.next_ms = None
+            try:
+                c.fn()
+            except Exception as e:
+                error("Planificador: fallo en '%s': %s", c.name, e)
+            return
+        self._run_step(c, idx)
+        # Si el retraso se comió pasos enteros, queda en vigor el actual.
+        cur, start, _ = c.at(self.origin_ms, now)
+        if start != deadline:
+            c.missed += 1
+            self._arm(c, cur != idx)
+        else:
+            self._arm(c, False)
+
+    async def run(self, watch=None):
+        while True:
+            if watch:
+                watch.beat()
+            if not self._heap:
+                await self._wake.wait()
+                self._wake.clear()
+                continue
+            deadline, _, c, idx = self._heap[0]
+            if c.period_ms is None and idx != c.gen:     # cancelado o reprogramado
+                heapq.heappop(self._heap)
+                continue
+            wait = deadline - now_ms()
+            if c.period_ms is not None and wait > c.period_ms:
+                # El reloj retrocedió (ajuste del RTC): recalcula las fases.
+                info("Planificador: reloj ajustado, recalculando fases.")
+                self.set_origin(self.origin_ms // 1000)
+                continue
+            if wait > 0:
+                try:
+                    await asyncio.wait_for_ms(self._wake.wait(), min(wait, _MAX_SLEEP_MS))
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            heapq.heappop(self._heap)
+            if watch:
+                watch.begin()
+            self._fire(c, idx, deadline)
+
+    def info(self):
+        jobs = self.cycles + list(self.timers.values())
+        return {c.name: {
+            "period_s": None if c.period_ms is None else c.period_ms / 1000,
+            "next_step": c.next_step,
+            "next_in_s": None if c.next_ms is None else (c.next_ms - now_ms()) // 1000,
+            "runs": c.runs,
+            "missed": c.missed,
+            "late_last_ms": c.late_last_ms,
+            "late_max_ms": c.late_max_ms,
+        } for c in jobs}
@@ -0,0 +1,156 @@
+# device/utils/supervisor.py
+
+import uasyncio as asyncio
+import time
+from utils.logger import info, warning, error, flush as flush_log
+
+_CHECK_MS = 10000         # revisión de salud y alimentación del WDT
+_BACKOFF_MIN_MS = 1000
+_BACKOFF_MAX_MS = 60000
+_STABLE_MS = 120000       # tras este tiempo sin caer se olvidan los fallos previos
+_MAX_FAILS = 5            # caídas seguidas que dejan de considerarse transitorias
+
+RUNNING = "running"
+RESTARTING = "restarting"
+DONE = "done"
+
+
+class Watch:
+    """Estado de una tarea supervisada.
+
+    El bucle de la tarea llama a `begin()` al empezar el trabajo de una
+    iteración y a `beat()` al terminarlo (o solo a `beat()` si no hay
+    trabajo que medir).
+    """
+
+    def __init__(self, name, factory, critical, stall_s):
+        self.name = name
+        self.factory = factory
+        self.critical = critical
+        self.stall_ms = None if stall_s is None else int(stall_s * 1000)
+        self.state = RUNNING
+        self.iterations = 0
+        self.last_ms = time.ticks_ms()
+        self.iter_last_ms = 0
+        self.iter_max_ms = 0
+        self.restarts = 0
+        self.fails = 0
+        self.last_error = None
+        self._t0 = None
+
+    def begin(self):
+        self._t0 = time.ticks_ms()
+
+    def beat(self):
+        now = time.ticks_ms()
+        if self._t0 is not None:
+            dt = time.ticks_diff(now, self._t0)
+            self.iter_last_ms = dt
+            if dt > self.iter_max_ms:
+                self.iter_max_ms = dt
+            self._t0 = None
+        self.iterations += 1
+        self.last_ms = now
+
+    def healthy(self, now):
+        if self.state == DONE:
+            return True
+        if self.state == RESTARTING:
+            return self.fails <= _MAX_FAILS
+        return self.stall_ms is None or time.ticks_diff(now, self.last_ms) < self.stall_ms
+
+
+class Supervisor:
+    """Lanza las tareas de larga duración, las reinicia con espera
+    exponencial si lanzan una excepción (o, las críticas, si terminan) y
+    solo alimenta el WDT mientras todas las críticas están sanas."""
+
+    def __init__(self):
+        self.watches = []
+        self.feeds = 0
+        self.healthy = True
+        self._last_feed_ms = None
+
+    def spawn(self, name, factory, critical=True, stall_s=None):
+        """`factory(watch)` devuelve la corrutina de la tarea. Con `stall_s`
+        la tarea se da por colgada si pasa ese tiempo sin `beat()`."""
+        w = Watch(name, factory, critical, stall_s)
+        self.watches.append(w)
+        asyncio.create_task(self._run(w))
+        return w
+
+    async def _run(self, w):
+        backoff = _BACKOFF_MIN_MS
+        while True:
+            w.state = RUNNING
+            w.last_ms = started = time.ticks_ms()
+            try:
+                await w.factory(w)
+            except Exception as e:
+                reason = str(e)
+            else:
+                if not w.critical:
+                    w.state = DONE
+                    info("Supervisor: la tarea '%s' terminó.", w.name)
+                    return
+                # Una tarea crítica no termina por sí sola (p. ej. sensores
+                # sin fuentes registradas): se reinicia como si hubiera caído.
+                reason = "terminó"
+            w.last_error = reason
+            if time.ticks_diff(time.ticks_ms(), started) > _STABLE_MS:
+                w.fails = 0
+                backoff = _BACKOFF_MIN_MS
+            w.fails += 1
+            w.state = RESTARTING
+            error("Supervisor: la tarea '%s' cayó (%s); reinicio en %d s", w.name, reason, backoff // 1000)
+            await asyncio.sleep_ms(backoff)
+            backoff = min(backoff * 2, _BACKOFF_MAX_MS)
+            w.restarts += 1
+
+    def check(self):
+        """True si todas las tareas críticas están sanas."""
+        now = time.ticks_ms()
+        ok = True
+        for w in self.watches:
+            if w.critical and not w.healthy(now):
+                ok = False
+                if self.healthy:
+                    warning("Supervisor: tarea '%s' no responde (%s); WDT sin alimentar.", w.name, w.state)
+        if not ok and self.healthy:
+            # El WDT puede reiniciar la placa: que el motivo quede en la flash.
+            flush_log()
+        if ok and not self.healthy:
+            info("Supervisor: todas las tareas críticas sanas de nuevo.")
+        self.healthy = ok
+        return ok
+
+    async def run(self, wdt=None):
+        while True:
+            if self.check() and wdt:
+                wdt.feed()
+                self.feeds += 1
+                self._last_feed_ms = time.ticks_ms()
+            await asyncio.sleep_ms(_CHECK_MS)
+
+    def info(self):
+        now = time.ticks_ms()
+        return {
+            "healthy": self.healthy,
+            "wdt_feeds": self.feeds,
+            "last_feed_s": None if self._last_feed_ms is None
+                else time.ticks_diff(now, self._last_feed_ms) // 1000,
+            "tasks": {w.name: {
+                "state": w.state,
+                "critical": w.critical,
+                "healthy": w.healthy(now),
+                "iterations": w.iterations,
+                "since_beat_ms": time.ticks_diff(now, w.last_ms),
+                "iter_last_ms": w.iter_last_ms,
+                "iter_max_ms": w.iter_max_ms,
+                "restarts": w.restarts,
+                "last_error": w.last_error,
+            } for w in self.watches},
+        }
+
+
+supervisor = Supervisor()
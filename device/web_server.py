@@ -8,6 +8,8 @@ from microdot import Microdot, Response, send_file
 from utils.logger import info, error
 from hw.relay_controller import controller as relays
 from tasks import display_task, sensor_task
+from sensors import calibration
+from system_state import inoculation_day
 
 try:
     from config.system_version import VERSION, COMMIT, BUILD_DATE
@@ -39,6 +41,22 @@ def set_inoculation_start_time(timestamp):
     inoculation_start_time = timestamp
     info(f"Fecha de inicio de inoculación establecida en el servidor web: {inoculation_start_time}")
 
+def reset_inoculation():
+    """Reinicia el conteo de días: guarda la hora actual como inicio."""
+    new_start_time = time.time()
+
+    with open(_START_TIME_FILE, "w") as f:
+        f.write(str(new_start_time))
+
+    set_inoculation_start_time(new_start_time)
+
+    display_task.set_start_time(new_start_time)
+
+    from tasks import control_task
+    control_task.set_origin(new_start_time)
+
+    info(f"Nuevo tiempo de inicio guardado: {new_start_time}")
+
 @app.route('/')
 async def serve_index(request):
     info("Web Server: Sirviendo www/index.html")
@@ -54,9 +72,8 @@ async def get_status(request):
     
     days_since_inoculation = 0
     if inoculation_start_time > 0:
-        current_time = time.time()
-        seconds_since_start = current_time - inoculation_start_time
-        days_since_inoculation = int(seconds_since_start / 86400)
+        # Días completos: 0 durante el día 1 del LCD.
+        days_since_inoculation = inoculation_day(time.time(), inoculation_start_time) - 1
 
     comp_state = relays.compressors_state()
     aerator1_status = (comp_state == "A")
@@ -64,7 +81,8 @@ async def get_status(request):
 
     status = {
         "pump_on": relays.pump_is_on(),
-        "flow_lpm": 0,
+        "flow_lpm": sensor_task.current_readings["flow"]["flow_lpm"] or 0,
+        "volume_l": sensor_task.current_readings["flow"]["volume_l"] or 0,
         "inoculation_days": days_since_inoculation,
         "aerator1_on": aerator1_status,
         "aerator2_on": aerator2_status,
@@ -86,18 +104,54 @@ async def control_actuators(request):
         
         elif action == "reset_inoculation":
             info("Web API: Reiniciando el conteo de inoculación.")
-            new_start_time = time.time()
-            
-            with open(_START_TIME_FILE, "w") as f:
-                f.write(str(new_start_time))
-            
-            set_inoculation_start_time(new_start_time)
-            
-            display_task.set_start_time(new_start_time)
-            
-            info(f"Nuevo tiempo de inicio guardado: {new_start_time}")
+            reset_inoculation()
             return {"status": "success", "message": "Conteo de inoculación reiniciado."}
             
+        elif action == "get_schedule":
+            from tasks import control_task
+            return {"status": "success", "entries": control_task.schedule.export()}
+
+        elif action == "set_schedule":
+            from tasks import control_task
+            try:
+                control_task.set_pump_schedule(data.get("entries") or [])
+            except ValueError as e:
+                return {"status": "error", "message": str(e)}, 400
+            info("Web API: tabla de bombeo actualizada.")
+            return {"status": "success", "entries": control_task.schedule.export()}
+
+        elif action == "dose":
+            from tasks import dosing
+            if dosing.is_running() or relays.pump_is_on():
+                return {"status": "error", "message": "La bomba ya está en marcha"}, 409
+            from config import sensor_params
+            # Se valida aquí: un error dentro de la tarea llegaría con la
+            # bomba ya encendida y la petición respondida.
+            try:
+                volume_l = data.get("volume_l")
+                volume_l = None if volume_l is None else float(volume_l)
+                duration_s = data.get("duration_s")
+                duration_s = None if duration_s is None else int(duration_s)
+                max_s = int(data.get("max_s") or 0)
+            except (TypeError, ValueError):
+                return {"status": "error", "message": "volume_l, duration_s y max_s deben ser numéricos"}, 400
+            if not 0 <= max_s <= sensor_params.DOSE_MAX_S:
+                return {"status": "error",
+                        "message": "max_s fuera de rango (0-%d)" % sensor_params.DOSE_MAX_S}, 400
+            if volume_l is not None and volume_l > 0:
+                uasyncio.create_task(dosing.dose(volume_l=volume_l, max_s=max_s or None))
+            elif duration_s is not None and duration_s > 0:
+                uasyncio.create_task(dosing.dose(duration_s=duration_s))
+            else:
+                return {"status": "error", "message": "Se esperaba volume_l o duration_s"}, 400
+            info("Web API: dosis solicitada.")
+            return {"status": "success"}
+
+        elif action == "stop_dose":
+            from tasks import dosing
+            dosing.stop()
+            return {"status": "success", "running": dosing.is_running()}
+
         else:
             return {"status": "error", "message": "Acción no reconocida"}, 400
 
@@ -105,6 +159,155 @@ async def control_actuators(request):
         error(f"Error en API control: {e}")
         return {"status": "error", "message": "Petición inválida"}, 400
 
+@app.route('/api/schedule')
+async def get_schedule(request):
+    from tasks import control_task
+    return {"jobs": control_task.scheduler.info(),
+            "table": control_task.schedule.export()}
+
+def _dose_row(rec):
+    from tasks import dosing
+    ts, requested, delivered, duration_s, result, mode = rec
+    return ts, round(requested, 3), round(delivered, 3), duration_s, \
+        dosing.RESULTS[result], "volume" if mode else "time"
+
+def _doses_csv():
+    from tasks import dosing
+    yield "time,requested_l,delivered_l,duration_s,result,mode\n"
+    for rec in dosing.history():
+        yield "%d,%.3f,%.3f,%d,%s,%s\n" % _dose_row(rec)
+
+@app.route('/api/doses')
+async def get_doses(request):
+    """Historial de dosis: JSON con las `limit` más recientes o, con
+    ?format=csv, el historial completo en streaming."""
+    from tasks import dosing
+    if request.args.get("format") == "csv":
+        return Response(_doses_csv(), headers={"Content-Type": "text/csv"})
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return {"status": "error", "message": "limit debe ser un entero"}, 400
+    rows = []
+    for rec in dosing.history():
+        rows.append(_dose_row(rec))
+        if len(rows) > limit:
+            rows.pop(0)
+    return {"running": dosing.is_running(),
+            "fields": ["time", "requested_l", "delivered_l", "duration_s", "result", "mode"],
+            "doses": rows}
+
+@app.route('/api/tasks')
+async def get_tasks(request):
+    from utils.supervisor import supervisor
+    return supervisor.info()
+
+@app.route('/api/loop')
+async def get_loop(request):
+    """Retraso del bucle de eventos y secciones síncronas cronometradas;
+    ?reset=1 pone los contadores a cero tras leerlos."""
+    from utils import loop_monitor
+    data = loop_monitor.report()
+    if request.args.get("reset"):
+        loop_monitor.reset()
+    return data
+
+def _logs_body(records, source, limit, seq):
+    import json
+    from utils import logger
+    yield '{"seq":%d,"source":"%s","stats":%s,"records":[' % (
+        seq, source, json.dumps(logger.stats))
+    sep = ""
+    for seq, lvl, line in records:
+        if not limit:
+            break
+        limit -= 1
+        yield sep + json.dumps([seq, lvl, line.decode()])
+        sep = ","
+    yield "]}"
+
+@app.route('/api/logs')
+async def get_logs(request):
+    """Registros con número de secuencia mayor que `since`, desde el anillo
+    en RAM o, si ya salieron de él, leídos de los segmentos de log. `level`
+    filtra por nivel mínimo y `limit` acota la respuesta; el cliente sigue
+    con since = última seq recibida (si `seq` < since, la placa reinició).
+
+    Con `from` / `to` (segundos Unix, como `Date.now() / 1000`) devuelve
+    el rango de tiempo buscando en el índice de los segmentos. Esos
+    registros llevan seq null: el índice no guarda la secuencia de RAM, que
+    se reinicia en cada arranque, así que no sirven para seguir con
+    `since`; un rango se pagina repitiendo la consulta con `from` = marca
+    del último registro recibido.
+
+    La respuesta llega hasta el registro `seq` de la cabecera, el último
+    al recibir la petición: lo que se registre mientras se envía queda
+    para la siguiente."""
+    from utils import logger, log_index
+    args = request.args
+    min_level = logger.level_num(args.get("level", "DEBUG"))
+    try:
+        limit = int(args.get("limit", 200))
+        since = int(args.get("since", 0))
+        t0 = int(args.get("from", 0)) - log_index.UNIX_OFFSET
+        t1 = int(args["to"]) - log_index.UNIX_OFFSET if "to" in args else time.time()
+    except ValueError:
+        return {"status": "error", "message": "since, limit, from y to deben ser enteros"}, 400
+    if limit < 0:
+        return {"status": "error", "message": "limit no puede ser negativo"}, 400
+    upto = logger.last_seq()
+    if "from" in args or "to" in args:
+        records = ((None, lvl, line) for lvl, line in logger.between(max(0, t0), t1, min_level))
+        source = "index"
+    elif logger.in_ring(since):
+        records, source = logger.tail(since, min_level, upto), "ram"
+    else:
+        records, source = logger.file_tail(since, min_level, upto), "file"
+    return Response(_logs_body(records, source, limit, upto),
+                    headers={"Content-Type": "application/json"})
+
+@app.route('/api/logs/index')
+async def get_log_index(request):
+    """Segmentos de log (`first` / `last` en segundos Unix, como los
+    `from` / `to` de /api/logs) y estado de los destinos."""
+    from utils import logger, log_index
+    segments = logger.segments()
+    for seg in segments:
+        for k in ("first", "last"):
+            if seg[k] is not None:
+                seg[k] += log_index.UNIX_OFFSET
+    return {"segments": segments, "sinks": logger.sinks()}
+
+@app.route('/api/i2c')
+async def get_i2c(request):
+    from config.pins import i2c
+    return i2c().info()
+
+@app.route('/api/calibration')
+async def get_calibration(request):
+    return calibration.status()
+
+@app.route('/api/calibration', methods=['POST'])
+async def set_calibration(request):
+    try:
+        data = request.json
+        channel = data.get("channel")
+        if "points" in data:
+            calibration.set_points(channel, data["points"])
+        elif "capture" in data:
+            calibration.capture(channel, data["capture"])
+        elif data.get("reset"):
+            calibration.reset(channel)
+        else:
+            return {"status": "error", "message": "Se esperaba points, capture o reset"}, 400
+        info(f"Web API: calibración de '{channel}' modificada.")
+        return {"status": "success", "calibration": calibration.status().get(channel)}
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}, 400
+    except Exception as e:
+        error(f"Error en API calibración: {e}")
+        return {"status": "error", "message": "Petición inválida"}, 400
+
 async def start_server():
     gc.collect()
     info(f"Memoria libre al iniciar start_server: {gc.mem_free()} bytes")
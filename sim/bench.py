@@ -0,0 +1,159 @@
+# sim/bench.py
+#
+# Benchmarks reproducibles sobre el simulador:
+#
+#   python sim/bench.py --seconds 30
+#
+# - Latencia del bucle de eventos: una sonda duerme PROBE_MS y anota el
+#   retraso con el que vuelve a ejecutarse (bloqueos síncronos del firmware).
+# - Monitor del firmware (utils/loop_monitor): histograma de retraso del
+#   bucle y tiempos de las secciones síncronas cronometradas (log, LCD, ADC).
+# - Montículo: pico de memoria Python reservada (tracemalloc). Es relativo;
+#   los objetos de CPython ocupan más que en MicroPython.
+# - Coste por llamada al logger con el nivel filtrado: f-string previo
+#   frente a formato diferido (`debug("... %s", valor)`).
+# - Rendimiento HTTP: peticiones/s a /api/status desde un hilo cliente.
+
+import argparse
+import http.client
+import sys
+import threading
+import time
+import tracemalloc
+
+import run
+
+PROBE_MS = 10
+
+
+class LoopProbe:
+    def __init__(self):
+        self.lags = []
+
+    async def task(self):
+        import uasyncio as asyncio
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep_ms(PROBE_MS)
+            self.lags.append((time.perf_counter() - t0) * 1000 - PROBE_MS)
+
+    def report(self):
+        lags = sorted(self.lags)
+        if not lags:
+            return {}
+
+        def pct(p):
+            return lags[min(len(lags) - 1, int(len(lags) * p))]
+
+        return {"samples": len(lags), "p50_ms": pct(0.50),
+                "p99_ms": pct(0.99), "max_ms": lags[-1]}
+
+
+def log_cost(n=20000):
+    """µs por llamada `debug` filtrada (nivel INFO): f-string construido por
+    el llamador frente a formato diferido dentro del logger; y µs por
+    `info` emitido hacia un NullSink (formato + anillo, sin E/S)."""
+    from utils import logger
+    from utils.log_sinks import NullSink
+    from tasks.sensor_task import current_readings
+    readings = current_readings["analog"]
+    saved = logger._current_level_num, logger._sinks, logger._flash_level, logger._allow
+    logger.set_level("INFO")
+    logger._sinks = [NullSink()]
+    logger._flash_level = 100
+    logger._allow = lambda key, now: True      # sin límite de ritmo
+    try:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            logger.debug(f"Lecturas Analógicas: {readings}")
+        t1 = time.perf_counter()
+        for _ in range(n):
+            logger.debug("Lecturas Analógicas: %s", readings)
+        t2 = time.perf_counter()
+        for i in range(n):
+            logger.info("Lectura %d: %s", i, readings)
+        t3 = time.perf_counter()
+    finally:
+        logger._current_level_num, logger._sinks, logger._flash_level, logger._allow = saved
+    return (t1 - t0) / n * 1e6, (t2 - t1) / n * 1e6, (t3 - t2) / n * 1e6
+
+
+def http_load(port, seconds, path="/api/status"):
+    """Cliente secuencial; devuelve (peticiones completadas, errores)."""
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", path)
+            conn.getresponse().read()
+            conn.close()
+            done += 1
+        except OSError:
+            errors += 1
+            time.sleep(0.2)
+    return done, errors
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks del firmware en el simulador")
+    ap.add_argument("--seconds", type=float, default=30)
+    ap.add_argument("--http-port", type=int, default=8081)
+    ap.add_argument("--http-seconds", type=float, default=5,
+                    help="duración de la carga HTTP al final de la corrida (0 = sin carga)")
+    ap.add_argument("--no-timing", action="store_true")
+    args = ap.parse_args(argv)
+
+    board, workdir = run.prepare("WORKING", None, args.http_port,
+                                 timing=not args.no_timing)
+    import uasyncio
+    probe = LoopProbe()
+    uasyncio.hooks.append(probe.task)
+
+    http_result = {}
+    if args.http_seconds > 0:
+        def client():
+            time.sleep(max(0, args.seconds - args.http_seconds))
+            http_result["t0"] = time.monotonic()
+            http_result["done"], http_result["errors"] = http_load(
+                args.http_port, args.http_seconds)
+            http_result["t1"] = time.monotonic()
+        threading.Thread(target=client, daemon=True).start()
+
+    tracemalloc.start()
+    try:
+        run.boot_and_run(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("\n==== Benchmark (%.0fs, timing=%s) ====" % (args.seconds, board.timing))
+    lag = probe.report()
+    if lag:
+        print("Lag del bucle: n=%(samples)d p50=%(p50_ms).2fms p99=%(p99_ms).2fms "
+              "max=%(max_ms).2fms" % lag)
+    from utils import loop_monitor
+    fw = loop_monitor.report()
+    if fw["lag"]["samples"]:
+        print("Lag (monitor del firmware, %dms): n=%d p50<=%sms p99<=%sms max=%.2fms" % (
+            fw["period_ms"], fw["lag"]["samples"], fw["lag"]["p50_ms"],
+            fw["lag"]["p99_ms"], fw["lag"]["max_ms"]))
+    for name, s in sorted(fw["sections"].items()):
+        if s["count"]:
+            print("  %-12s n=%-5d media=%.3fms max=%.3fms" % (
+                name, s["count"], s["mean_ms"], s["max_ms"]))
+    print("Pico de montículo (CPython): %d bytes" % heap_peak)
+    eager_us, lazy_us, emit_us = log_cost()
+    print("debug() filtrado: f-string %.2fus/llamada, diferido %.2fus/llamada" % (
+        eager_us, lazy_us))
+    print("info() emitido a NullSink: %.2fus/llamada" % emit_us)
+    if "done" in http_result:
+        dt = http_result["t1"] - http_result["t0"]
+        print("HTTP /api/status: %d peticiones en %.1fs (%.1f req/s, %d errores)" % (
+            http_result["done"], dt, http_result["done"] / dt, http_result["errors"]))
+    print(board.summary())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# sim/board.py
+#
+# Estado compartido de la placa simulada: niveles de pines, dispositivos
+# colgados de cada bus y contadores de tráfico. Los stubs de `machine`,
+# `network` y `esp32` leen y escriben aquí; los escenarios y benchmarks
+# lo manipulan para "mover" las señales.
+
+import time
+
+# Bit-bang típico de SoftI2C en el ESP32 y periférico hardware a 400 kHz.
+SOFT_I2C_HZ = 100_000
+HW_I2C_HZ = 400_000
+
+
+class Board:
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.pins = {}            # id -> nivel lógico
+        self.pin_changed = {}     # id -> instante del último cambio de una salida
+        self.pin_irqs = {}        # id -> [(handler, trigger, pin_obj)]
+        self.adc = {}             # id de pin -> valor crudo o callable(t)
+        self.i2c_devices = {}     # dirección -> dispositivo virtual
+        self.uart_peers = {}      # id de UART -> dispositivo virtual
+        self.wlan = {}            # interfaz -> estado
+        self.flow = None          # VirtualFlowMeter
+        self.rtc_datetime = None
+        self.wdt = None
+        self.timing = True        # simular el tiempo que bloquean los buses
+        self._debt_us = 0.0
+        self.stats = {
+            "i2c_transactions": {},
+            "i2c_bytes": {},
+            "i2c_errors": {},
+            "uart_tx_frames": 0,
+            "uart_rx_bytes": 0,
+            "rs485_lost_bytes": 0,
+            "wdt_feeds": 0,
+            "wdt_max_gap_ms": 0,
+        }
+
+    # --- Tiempo -----------------------------------------------------------
+    def now(self):
+        """Segundos desde el arranque de la simulación."""
+        return time.monotonic() - self.t0
+
+    def spend_us(self, us):
+        """Acumula tiempo de bus bloqueante y lo paga en bloques de 1 ms.
+
+        `time.sleep` no es fiable por debajo del milisegundo, así que el
+        coste se agrupa; el total bloqueado coincide con el del hardware.
+        """
+        if not self.timing:
+            return
+        self._debt_us += us
+        if self._debt_us >= 1000:
+            time.sleep(self._debt_us / 1e6)
+            self._debt_us = 0.0
+
+    # --- Pines ------------------------------------------------------------
+    def pin_value(self, pin_id, default=0):
+        return self.pins.get(pin_id, default)
+
+    def set_pin(self, pin_id, value):
+        """Fija el nivel de una entrada y dispara las IRQ registradas."""
+        value = 1 if value else 0
+        old = self.pins.get(pin_id)
+        self.pins[pin_id] = value
+        if old is None or old == value:
+            return
+        edge = 1 if value else 2   # Pin.IRQ_RISING / Pin.IRQ_FALLING
+        for handler, trigger, pin in self.pin_irqs.get(pin_id, ()):
+            if handler and trigger & edge:
+                handler(pin)
+
+    # --- I2C --------------------------------------------------------------
+    def i2c_account(self, addr, nbytes, freq):
+        st = self.stats
+        st["i2c_transactions"][addr] = st["i2c_transactions"].get(addr, 0) + 1
+        st["i2c_bytes"][addr] = st["i2c_bytes"].get(addr, 0) + nbytes
+        # 9 bits por byte (dato + ACK) más el byte de dirección y start/stop.
+        self.spend_us((nbytes + 1) * 9 * 1e6 / freq + 10)
+
+    def i2c_device(self, addr):
+        dev = self.i2c_devices.get(addr)
+        if dev is None:
+            st = self.stats["i2c_errors"]
+            st[addr] = st.get(addr, 0) + 1
+            raise OSError(19)      # ENODEV, igual que el puerto ESP32
+        return dev
+
+    # --- Resumen ----------------------------------------------------------
+    def summary(self):
+        st = self.stats
+        lines = ["I2C por dirección:"]
+        for addr in sorted(st["i2c_transactions"]):
+            lines.append("  0x%02x: %d transacciones, %d bytes" % (
+                addr, st["i2c_transactions"][addr], st["i2c_bytes"][addr]))
+        lines.append("UART: %d tramas TX, %d bytes RX, %d perdidos con DE/RE en alto" % (
+            st["uart_tx_frames"], st["uart_rx_bytes"], st["rs485_lost_bytes"]))
+        lines.append("WDT: %d alimentaciones, hueco máx %d ms" % (
+            st["wdt_feeds"], st["wdt_max_gap_ms"]))
+        lcd = self.i2c_devices.get(0x27)
+        if lcd is not None and hasattr(lcd, "text"):
+            lines.append("LCD:")
+            for row in lcd.text():
+                lines.append("  |%s|" % row)
+        return "\n".join(lines)
+
+
+board = Board()
@@ -0,0 +1,322 @@
+# sim/devices.py
+#
+# Dispositivos virtuales conectados a la placa simulada. Cada señal puede
+# ser un número fijo o un callable `f(t)` con `t` en segundos desde el
+# arranque, de modo que los escenarios pueden guionizar transitorios.
+
+import calendar
+import threading
+import time
+from board import board
+
+
+def _sample(src):
+    return src(board.now()) if callable(src) else src
+
+
+def _bcd(v):
+    return (v // 10) << 4 | (v % 10)
+
+
+def _dec(b):
+    return (b >> 4) * 10 + (b & 0x0F)
+
+
+def modbus_crc(data):
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class VirtualADS1115:
+    """ADS1115 con tiempos de conversión reales según el data rate."""
+
+    _SPS = (8, 16, 32, 64, 128, 250, 475, 860)
+    _FSR = (6.144, 4.096, 2.048, 1.024, 0.512, 0.256, 0.256, 0.256)
+    _MUX = {4: 0, 5: 1, 6: 2, 7: 3}
+
+    def __init__(self, channels=None, rdy_pin=None):
+        self.channels = channels or {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}
+        self.rdy_pin = rdy_pin
+        self.regs = [0, 0x8583, 0x8000, 0x7FFF]
+        self._ready_at = 0.0
+        self._value = 0
+        self.conversions = 0
+
+    def _convert(self):
+        cfg = self.regs[1]
+        ch = self._MUX.get((cfg >> 12) & 0x7, 0)
+        fsr = self._FSR[(cfg >> 9) & 0x7]
+        volts = _sample(self.channels.get(ch, 0.0))
+        raw = int(volts / fsr * 32768)
+        self._value = max(-32768, min(32767, raw)) & 0xFFFF
+        self.conversions += 1
+
+    def _conv_s(self):
+        return 1.0 / self._SPS[(self.regs[1] >> 5) & 0x7]
+
+    def _busy(self):
+        return board.now() < self._ready_at
+
+    def write_mem(self, reg, buf):
+        value = buf[0] << 8 | buf[1]
+        self.regs[reg & 3] = value
+        if reg & 3 == 1:
+            continuous = not value & 0x0100
+            if value & 0x8000 or continuous:
+                self._ready_at = board.now() + self._conv_s()
+                self._convert()
+                if self._rdy_mode():
+                    t = threading.Timer(self._conv_s(), self._pulse_rdy)
+                    t.daemon = True
+                    t.start()
+
+    def _rdy_mode(self):
+        # ALERT/RDY como "conversión lista": comparador activo y umbrales
+        # con el MSB de Hi a 1 y el de Lo a 0.
+        return (self.rdy_pin is not None and self.regs[1] & 0x3 != 0x3
+                and self.regs[3] & 0x8000 and not self.regs[2] & 0x8000)
+
+    def _pulse_rdy(self):
+        board.set_pin(self.rdy_pin, 0)
+        board.set_pin(self.rdy_pin, 1)
+
+    def read_mem(self, reg, n):
+        reg &= 3
+        if reg == 0:
+            if not (self.regs[1] & 0x0100) and not self._busy():
+                # Modo continuo: la última conversión siempre está lista.
+                self._convert()
+            value = self._value
+        elif reg == 1:
+            value = self.regs[1] & 0x7FFF
+            if not self._busy():
+                value |= 0x8000
+        else:
+            value = self.regs[reg]
+        return bytes((value >> 8, value & 0xFF))[:n]
+
+
+class VirtualDS3231:
+    """DS3231 que sigue la hora UTC del host más un desfase programable."""
+
+    def __init__(self):
+        self.offset = 0
+        self.regs = bytearray(19)
+        self.regs[0x0E] = 0x1C
+        self.regs[0x11] = 25      # 25.00 °C
+
+    def _fill_time(self):
+        t = time.gmtime(int(time.time()) + self.offset)
+        self.regs[0] = _bcd(t[5])
+        self.regs[1] = _bcd(t[4])
+        self.regs[2] = _bcd(t[3])
+        self.regs[3] = _bcd(t[6] + 1)
+        self.regs[4] = _bcd(t[2])
+        self.regs[5] = _bcd(t[1])
+        self.regs[6] = _bcd(t[0] % 100)
+
+    def write_mem(self, reg, buf):
+        for i, b in enumerate(buf):
+            self.regs[(reg + i) % len(self.regs)] = b
+        if reg == 0 and len(buf) >= 7:
+            r = self.regs
+            target = calendar.timegm((2000 + _dec(r[6]), _dec(r[5] & 0x7F), _dec(r[4]),
+                                      _dec(r[2] & 0x3F), _dec(r[1]), _dec(r[0]), 0, 0, 0))
+            self.offset = target - int(time.time())
+
+    def read_mem(self, reg, n):
+        self._fill_time()
+        return bytes(self.regs[(reg + i) % len(self.regs)] for i in range(n))
+
+
+class VirtualLcd:
+    """Expansor PCF8574 + HD44780 20x4 que decodifica los nibbles.
+
+    Reconstruye el contenido de la DDRAM a partir de los flancos de E, de
+    forma que las pruebas pueden comparar `text()` con lo esperado y medir
+    cuántas transacciones cuesta cada refresco.
+    """
+
+    _ROW_ADDR = (0x00, 0x40, 0x14, 0x54)
+
+    def __init__(self, cols=20, rows=4):
+        self.cols, self.rows = cols, rows
+        self.ddram = bytearray(b" " * 0x68)
+        self.addr = 0
+        self.four_bit = False
+        self._nibble = None
+        self._prev = 0
+        self.commands = 0
+        self.chars = 0
+
+    def write(self, buf):
+        for b in buf:
+            if self._prev & 0x04 and not b & 0x04:      # flanco de bajada de E
+                self._latch(self._prev)
+            self._prev = b
+
+    def _latch(self, port):
+        rs = port & 0x01
+        nib = port >> 4
+        if not self.four_bit:
+            if nib == 0x2:
+                self.four_bit = True
+            return
+        if self._nibble is None:
+            self._nibble = nib
+            return
+        value = self._nibble << 4 | nib
+        self._nibble = None
+        if rs:
+            self._data(value)
+        else:
+            self._command(value)
+
+    def _command(self, cmd):
+        self.commands += 1
+        if cmd & 0x80:
+            self.addr = cmd & 0x7F
+        elif cmd == 0x01:
+            self.ddram[:] = b" " * len(self.ddram)
+            self.addr = 0
+        elif cmd == 0x02:
+            self.addr = 0
+
+    def _data(self, value):
+        self.chars += 1
+        if self.addr < len(self.ddram):
+            self.ddram[self.addr] = value
+        self.addr += 1
+        if self.addr == 0x28:
+            self.addr = 0x40
+        elif self.addr >= 0x68:
+            self.addr = 0
+
+    def text(self):
+        out = []
+        for r in range(self.rows):
+            a = self._ROW_ADDR[r]
+            out.append(self.ddram[a:a + self.cols].decode("latin-1"))
+        return out
+
+
+class ModbusSlave:
+    """Esclavo Modbus RTU sobre RS485 (funciones 03/04/06/16).
+
+    `registers` mapea dirección -> valor (o callable(t)). Las respuestas se
+    entregan byte a byte según la velocidad de la UART, tras un tiempo de
+    respuesta del esclavo.
+    """
+
+    def __init__(self, address=1, registers=None, de_pin=None, latency_ms=20):
+        self.address = address
+        self.registers = registers or {}
+        self.de_pin = de_pin
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.dropped = 0
+
+    def _reg(self, addr):
+        return int(_sample(self.registers.get(addr, 0))) & 0xFFFF
+
+    def handle(self, frame):
+        if len(frame) < 8 or frame[0] != self.address:
+            return None
+        crc = modbus_crc(frame[:-2])
+        if frame[-2] != crc & 0xFF or frame[-1] != crc >> 8:
+            return None
+        if self.de_pin is not None and not board.pin_value(self.de_pin):
+            # Transceptor en recepción: la trama nunca salió al bus.
+            self.dropped += 1
+            return None
+        self.requests += 1
+        fc = frame[1]
+        start = frame[2] << 8 | frame[3]
+        if fc in (3, 4):
+            count = frame[4] << 8 | frame[5]
+            body = bytearray((self.address, fc, count * 2))
+            for a in range(start, start + count):
+                v = self._reg(a)
+                body += bytes((v >> 8, v & 0xFF))
+        elif fc == 6:
+            self.registers[start] = frame[4] << 8 | frame[5]
+            body = bytearray(frame[:6])
+        elif fc == 16:
+            count = frame[4] << 8 | frame[5]
+            for i in range(count):
+                self.registers[start + i] = frame[7 + 2 * i] << 8 | frame[8 + 2 * i]
+            body = bytearray(frame[:6])
+        else:
+            body = bytearray((self.address, fc | 0x80, 0x01))
+        crc = modbus_crc(body)
+        return bytes(body) + bytes((crc & 0xFF, crc >> 8))
+
+
+class RS485Bus:
+    """Bus RS485 compartido por varios esclavos Modbus.
+
+    `de_pin` es el DE/RE del transceptor del maestro: los bytes de la
+    respuesta que llegan mientras sigue en alto se pierden (ver UART).
+    """
+
+    def __init__(self, *slaves, de_pin=None):
+        self.slaves = list(slaves)
+        self.de_pin = de_pin
+
+    def handle(self, frame):
+        for s in self.slaves:
+            resp = s.handle(frame)
+            if resp is not None:
+                return resp, s.latency_ms
+        return None, 0
+
+
+class VirtualFlowMeter:
+    """Caudalímetro de efecto Hall: genera en `pin` los pulsos que
+    corresponden a `lpm` (L/min, número o callable) con un hilo propio."""
+
+    def __init__(self, pin, lpm, pulses_per_l, tick_s=0.01):
+        self.pin = pin
+        self.lpm = lpm
+        self.pulses_per_l = pulses_per_l
+        self.pulses = 0
+        self._acc = 0.0
+        self._tick = tick_s
+        board.pins[pin] = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        last = board.now()
+        while True:
+            time.sleep(self._tick)
+            now = board.now()
+            self._acc += _sample(self.lpm) * self.pulses_per_l / 60 * (now - last)
+            last = now
+            while self._acc >= 1:
+                self._acc -= 1
+                self.pulses += 1
+                board.set_pin(self.pin, 1)
+                board.set_pin(self.pin, 0)
+
+
+def install_default(ph=7.0, do_mg_l=8.0, nh3_v=0.30, h2s_v=0.10,
+                    level_mm=1940, temp_c=24.0, flow_lpm=12.0):
+    """Placa del reactor con los sensores de la v1.3 en valores nominales."""
+    from config import pins, sensor_params
+
+    board.adc[pins.PH_PIN] = int(ph / 3.5 / 3.3 * 4095)
+    board.adc[pins.OXIGENO_PIN] = int(do_mg_l / 20.0 * 3722)
+    board.i2c_devices[0x48] = VirtualADS1115({0: nh3_v, 1: h2s_v, 2: 0.0, 3: 0.0})
+    board.i2c_devices[0x68] = VirtualDS3231()
+    board.i2c_devices[0x27] = VirtualLcd()
+    level = ModbusSlave(1, {4: level_mm, 5: int(temp_c * 10)},
+                        de_pin=sensor_params.RS485_DE_RE)
+    board.uart_peers[2] = RS485Bus(level, de_pin=sensor_params.RS485_DE_RE)
+    # Solo hay caudal con la bomba encendida (relé activo en alto).
+    pump = lambda t: flow_lpm if board.pins.get(pins.PUMP_RELAY_PIN) else 0.0
+    board.flow = VirtualFlowMeter(pins.FLOW_PIN, pump, sensor_params.FLOW_PULSES_PER_L)
+    return level
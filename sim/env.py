@@ -0,0 +1,85 @@
+# sim/env.py
+#
+# Prepara un proceso CPython para importar el firmware de `device/`:
+# rutas de importación, extensiones de MicroPython en `time`/`gc` y
+# `const` como builtin (lo usa ads1x15.py sin importarlo).
+
+import builtins
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SIM_DIR)
+DEVICE_DIR = os.path.join(REPO_DIR, "device")
+
+# Montículo típico disponible en un ESP32 sin PSRAM tras arrancar.
+HEAP_BYTES = 110 * 1024
+
+_installed = False
+_T0 = time.monotonic_ns()
+_host_time = time.time
+_host_localtime = time.localtime
+
+
+def _ticks_ms():
+    return ((time.monotonic_ns() - _T0) // 1_000_000) & 0x3FFFFFFF
+
+
+def _ticks_us():
+    return ((time.monotonic_ns() - _T0) // 1_000) & 0x3FFFFFFF
+
+
+def _ticks_diff(a, b):
+    d = (a - b) & 0x3FFFFFFF
+    return d - 0x40000000 if d & 0x20000000 else d
+
+
+def _ticks_add(t, delta):
+    return (t + delta) & 0x3FFFFFFF
+
+
+def _time():
+    # MicroPython devuelve segundos enteros.
+    return int(_host_time())
+
+
+def _localtime(secs=None):
+    t = _host_localtime(secs)
+    # (year, month, mday, hour, minute, second, weekday, yearday)
+    return tuple(t[:8])
+
+
+def _mem_alloc():
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _mem_free():
+    return max(0, HEAP_BYTES - _mem_alloc())
+
+
+def install():
+    """Idempotente: deja el intérprete listo para `import main`."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for p in (DEVICE_DIR, SIM_DIR):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1_000_000)
+    time.ticks_ms = _ticks_ms
+    time.ticks_us = _ticks_us
+    time.ticks_cpu = _ticks_us
+    time.ticks_diff = _ticks_diff
+    time.ticks_add = _ticks_add
+    time.time = _time
+    time.localtime = _localtime
+    gc.mem_free = _mem_free
+    gc.mem_alloc = _mem_alloc
+    gc.threshold = lambda *a: -1
+    builtins.const = lambda x: x
+    sys.print_exception = lambda e, f=None: __import__("traceback").print_exception(e)
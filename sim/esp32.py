@@ -0,0 +1,45 @@
+# sim/esp32.py
+#
+# Sustituto de `esp32` para CPython: solo el contador de pulsos (PCNT),
+# que cuenta los flancos que los dispositivos virtuales producen en
+# `board.set_pin`.
+
+import threading
+from board import board
+
+
+class PCNT:
+    INCREMENT = 1
+    DECREMENT = -1
+    IGNORE = 0
+
+    def __init__(self, id, *, pin, rising=0, falling=0, filter=0, **kw):
+        self._id = id
+        self._count = 0
+        self._running = False
+        self._lock = threading.Lock()
+        self._rising = rising
+        self._falling = falling
+        pin_id = self._pin = pin._id if hasattr(pin, "_id") else pin
+        board.pin_irqs.setdefault(pin_id, []).append((self._edge, 3, self))
+
+    def _edge(self, _):
+        if not self._running:
+            return
+        step = self._rising if board.pin_value(self._pin) else self._falling
+        with self._lock:
+            # Contador de 16 bits con signo, como el periférico.
+            self._count = (self._count + step + 0x8000) % 0x10000 - 0x8000
+
+    def start(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def value(self, value=None):
+        with self._lock:
+            n = self._count
+            if value == 0:
+                self._count = 0
+        return n
@@ -0,0 +1,311 @@
+# sim/machine.py
+#
+# Sustituto de `machine` para CPython. Reproduce la API del puerto ESP32
+# que usa el firmware y delega el comportamiento eléctrico en `board`.
+
+import time
+from board import board, SOFT_I2C_HZ, HW_I2C_HZ
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=-1, pull=-1, *, value=None):
+        self._id = id
+        self.init(mode, pull, value=value)
+
+    def init(self, mode=-1, pull=-1, *, value=None):
+        if mode != -1:
+            self._mode = mode
+        if value is not None:
+            board.pins[self._id] = 1 if value else 0
+        elif self._id not in board.pins:
+            board.pins[self._id] = 1 if pull == self.PULL_UP else 0
+
+    def value(self, v=None):
+        if v is None:
+            return board.pin_value(self._id)
+        v = 1 if v else 0
+        if board.pins.get(self._id) != v:
+            board.pin_changed[self._id] = board.now()
+        board.pins[self._id] = v
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, **kw):
+        handlers = board.pin_irqs.setdefault(self._id, [])
+        handlers[:] = [h for h in handlers if h[2] is not self]
+        if handler is not None:
+            handlers.append((handler, trigger, self))
+
+    def __repr__(self):
+        return "Pin(%d)" % self._id
+
+
+class _I2CBase:
+    def __init__(self, freq):
+        self._freq = freq
+
+    def scan(self):
+        return sorted(board.i2c_devices)
+
+    def writeto(self, addr, buf, stop=True):
+        dev = board.i2c_device(addr)
+        board.i2c_account(addr, len(buf), self._freq)
+        dev.write(bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        data = b"".join(bytes(b) for b in vector)
+        return self.writeto(addr, data, stop)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        dev = board.i2c_device(addr)
+        board.i2c_account(addr, nbytes, self._freq)
+        return dev.read(nbytes)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        data = self.readfrom(addr, len(buf), stop)
+        buf[:len(data)] = data
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        dev = board.i2c_device(addr)
+        board.i2c_account(addr, len(buf) + 1, self._freq)
+        dev.write_mem(memaddr, bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        dev = board.i2c_device(addr)
+        # Escritura del registro + lectura con start repetido.
+        board.i2c_account(addr, nbytes + 2, self._freq)
+        return dev.read_mem(memaddr, nbytes)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8):
+        data = self.readfrom_mem(addr, memaddr, len(buf))
+        buf[:len(data)] = data
+
+
+class SoftI2C(_I2CBase):
+    def __init__(self, scl, sda, *, freq=SOFT_I2C_HZ, timeout=50000):
+        super().__init__(freq)
+
+
+class I2C(_I2CBase):
+    def __init__(self, id=0, *, scl=None, sda=None, freq=HW_I2C_HZ, timeout=50000):
+        super().__init__(freq)
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin, *, atten=None):
+        self._id = pin._id if isinstance(pin, Pin) else pin
+
+    def atten(self, attn):
+        pass
+
+    def width(self, bits):
+        pass
+
+    def read(self):
+        src = board.adc.get(self._id, 0)
+        raw = src(board.now()) if callable(src) else src
+        return max(0, min(4095, int(raw)))
+
+    def read_u16(self):
+        return self.read() << 4
+
+    def read_uv(self):
+        return self.read() * 3_300_000 // 4095
+
+
+class UART:
+    def __init__(self, id, baudrate=115200, *, tx=None, rx=None, **kw):
+        self._id = id
+        self._baud = baudrate
+        self._rx = []         # [(instante de llegada, byte)]
+        self._rx_ok = 0       # bytes de _rx que ya llegaron con el bus libre
+        self._tx_end = 0.0
+        self._de_pin = None   # DE/RE del transceptor RS485 del par, si lo hay
+
+    def _char_s(self):
+        return 10.0 / self._baud
+
+    def _de_high(self, t):
+        """True si el transceptor seguía en transmisión en el instante `t`."""
+        if board.pin_value(self._de_pin):
+            return True
+        return board.pin_changed.get(self._de_pin, 0) > t
+
+    def _arrived(self):
+        now = board.now()
+        n = self._rx_ok
+        while n < len(self._rx):
+            t = self._rx[n][0]
+            if t > now:
+                break
+            if self._de_pin is not None and self._de_high(t):
+                # Con DE/RE aún en alto el receptor está deshabilitado: el
+                # byte que manda el esclavo se pierde.
+                del self._rx[n]
+                board.stats["rs485_lost_bytes"] += 1
+                continue
+            n += 1
+        self._rx_ok = n
+        return n
+
+    def any(self):
+        return self._arrived()
+
+    def read(self, nbytes=None):
+        n = self._arrived()
+        if nbytes is not None:
+            n = min(n, nbytes)
+        if not n:
+            return None
+        data = bytes(b for _, b in self._rx[:n])
+        del self._rx[:n]
+        self._rx_ok -= n
+        board.stats["uart_rx_bytes"] += n
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        data = self.read(len(buf) if nbytes is None else nbytes)
+        if not data:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def write(self, buf):
+        buf = bytes(buf)
+        board.stats["uart_tx_frames"] += 1
+        self._tx_end = board.now() + len(buf) * self._char_s()
+        peer = board.uart_peers.get(self._id)
+        if peer is not None:
+            resp, latency_ms = peer.handle(buf)
+            self._de_pin = getattr(peer, "de_pin", None)
+            if resp:
+                t = self._tx_end + latency_ms / 1000
+                for b in resp:
+                    t += self._char_s()
+                    self._rx.append((t, b))
+        return len(buf)
+
+    def flush(self):
+        pass
+
+    def txdone(self):
+        return board.now() >= self._tx_end
+
+    def deinit(self):
+        pass
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        self._timeout = timeout
+        self._last = time.monotonic()
+        board.wdt = self
+
+    def feed(self):
+        now = time.monotonic()
+        gap = int((now - self._last) * 1000)
+        st = board.stats
+        st["wdt_feeds"] += 1
+        if gap > st["wdt_max_gap_ms"]:
+            st["wdt_max_gap_ms"] = gap
+        if gap > self._timeout:
+            print("SIM: el watchdog habría reiniciado la placa (%d ms)" % gap)
+        self._last = now
+
+
+class RTC:
+    def __init__(self, id=0):
+        pass
+
+    def datetime(self, dt=None):
+        if dt is None:
+            if board.rtc_datetime is not None:
+                return board.rtc_datetime
+            t = time.localtime()
+            return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+        board.rtc_datetime = tuple(dt)
+
+    def init(self, dt):
+        self.datetime(dt)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1):
+        self._t = None
+
+    def init(self, *, mode=PERIODIC, period=1000, callback=None, freq=None):
+        import threading
+        self.deinit()
+        if freq:
+            period = 1000 // freq
+
+        def fire():
+            if callback:
+                callback(self)
+            if mode == self.PERIODIC and self._t is not None:
+                arm()
+
+        def arm():
+            self._t = threading.Timer(period / 1000, fire)
+            self._t.daemon = True
+            self._t.start()
+
+        arm()
+
+    def deinit(self):
+        if self._t is not None:
+            self._t.cancel()
+            self._t = None
+
+
+def unique_id():
+    return b"\x24\x0a\xc4\x00\x51\x4d"
+
+
+def freq(hz=None):
+    return 240_000_000
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+def soft_reset():
+    raise SystemExit("machine.soft_reset()")
+
+
+def idle():
+    pass
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
@@ -0,0 +1,26 @@
+# sim/micropython.py
+
+
+def const(expr):
+    return expr
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(func, arg):
+    func(arg)
+
+
+def mem_info(verbose=False):
+    import gc
+    print("mem: total=%d, current=%d" % (gc.mem_alloc() + gc.mem_free(), gc.mem_alloc()))
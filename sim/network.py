@@ -0,0 +1,36 @@
+# sim/network.py
+
+from board import board
+
+STA_IF = 0
+AP_IF = 1
+
+AUTH_OPEN = 0
+AUTH_WPA2_PSK = 3
+
+
+class WLAN:
+    def __init__(self, interface_id=STA_IF):
+        self._if = interface_id
+        self._st = board.wlan.setdefault(interface_id, {"active": False, "config": {}})
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._st["active"]
+        self._st["active"] = bool(is_active)
+
+    def config(self, *args, **kwargs):
+        if args:
+            return self._st["config"].get(args[0])
+        self._st["config"].update(kwargs)
+
+    def ifconfig(self, cfg=None):
+        if self._if == AP_IF:
+            return ("192.168.4.1", "255.255.255.0", "192.168.4.1", "8.8.8.8")
+        return ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0")
+
+    def isconnected(self):
+        return self._if == AP_IF and self._st["active"]
+
+    def status(self, *args):
+        return 0
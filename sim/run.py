@@ -0,0 +1,87 @@
+# sim/run.py
+#
+# Arranca el firmware completo (boot.py + main.py) en un proceso Linux.
+#
+#   python sim/run.py --mode WORKING --seconds 60 --http-port 8080
+#
+# El sistema de archivos del dispositivo (event.log, start_time.txt, ...)
+# vive en --workdir para no ensuciar el repositorio.
+
+import argparse
+import os
+import runpy
+import sys
+import tempfile
+
+import env
+
+_MODES = {
+    "PROGRAM": (0, 0),
+    "WORKING": (1, 0),
+    "DEMO": (0, 1),
+    "EMERGENCY": (1, 1),
+}
+
+
+def prepare(mode="WORKING", workdir=None, http_port=8080, timing=True):
+    """Deja la placa virtual lista y el cwd apuntando a su "flash"."""
+    env.install()
+    from board import board
+    import devices
+    from config import pins
+
+    board.timing = timing
+    devices.install_default()
+    sw1, sw2 = _MODES[mode]
+    board.pins[pins.MODE_SW1_PIN] = sw1
+    board.pins[pins.MODE_SW2_PIN] = sw2
+    board.pins[pins.BUTTON_PIN] = 1
+
+    workdir = workdir or tempfile.mkdtemp(prefix="bioreactor-sim-")
+    os.makedirs(workdir, exist_ok=True)
+    www = os.path.join(workdir, "www")
+    if not os.path.exists(www):
+        os.symlink(os.path.join(env.DEVICE_DIR, "www"), www)
+    os.chdir(workdir)
+
+    import microdot
+    _start = microdot.Microdot.start_server
+
+    async def start_server(self, host="0.0.0.0", port=5000, debug=False, ssl=None):
+        return await _start(self, host="127.0.0.1", port=http_port, debug=debug, ssl=ssl)
+
+    microdot.Microdot.start_server = start_server
+    return board, workdir
+
+
+def boot_and_run(seconds=None):
+    """Ejecuta boot.py y main.py como lo haría el intérprete del ESP32."""
+    import uasyncio
+    uasyncio.run_for = seconds
+    runpy.run_path(os.path.join(env.DEVICE_DIR, "boot.py"), run_name="__main__")
+    runpy.run_path(os.path.join(env.DEVICE_DIR, "main.py"), run_name="__main__")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Simulador host del bioreactor")
+    ap.add_argument("--mode", choices=sorted(_MODES), default="WORKING")
+    ap.add_argument("--seconds", type=float, default=None,
+                    help="detener tras N segundos (por defecto, hasta Ctrl-C)")
+    ap.add_argument("--workdir", default=None)
+    ap.add_argument("--http-port", type=int, default=8080)
+    ap.add_argument("--no-timing", action="store_true",
+                    help="no simular el tiempo bloqueado por los buses")
+    args = ap.parse_args(argv)
+
+    board, workdir = prepare(args.mode, args.workdir, args.http_port,
+                             timing=not args.no_timing)
+    print("SIM: flash virtual en %s" % workdir)
+    try:
+        boot_and_run(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    print("\n" + board.summary())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
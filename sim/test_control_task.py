@@ -0,0 +1,87 @@
+# sim/test_control_task.py
+#
+#   python -m pytest sim
+
+import calendar
+import time
+
+import pytest
+
+import env
+
+env.install()
+
+import devices  # noqa: E402
+import uasyncio as asyncio  # noqa: E402
+from config import sensor_params  # noqa: E402
+from hw.relay_controller import controller as relays  # noqa: E402
+from tasks import control_task, dosing  # noqa: E402
+from system_state import inoculation_day  # noqa: E402
+from utils.pump_schedule import PumpSchedule  # noqa: E402
+from utils.scheduler import Cycle  # noqa: E402
+
+devices.install_default()
+
+
+def test_schedule_table_turns_off_pump_of_fixed_cycle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sched = control_task.scheduler
+    # Ciclo fijo de 10 min con la ventana de bombeo en curso.
+    cycle = Cycle("pump", 600, ((0, control_task._pump_off), (60, control_task._pump_on)))
+    monkeypatch.setattr(control_task, "_pump_cycle", cycle)
+    sched.add(cycle)
+    sched.set_origin(time.time() - 120)
+    control_task._pump_on()
+    assert relays.pump_is_on()
+
+    control_task.set_pump_schedule([{"at": "03:00", "duration_s": 60}])
+
+    assert not relays.pump_is_on()
+    assert "pump" not in [c.name for c in sched.cycles]
+    assert sched.timers["pump_schedule"].next_ms is not None
+
+    # Sin tabla vuelve el ciclo fijo, que retoma su ventana de bombeo.
+    control_task.set_pump_schedule([])
+    assert cycle in sched.cycles and relays.pump_is_on()
+    sched.remove("pump")
+    control_task._pump_off()
+
+
+@pytest.mark.parametrize("entry", [
+    {"at": "03:00", "duration_s": sensor_params.DOSE_MAX_S + 1},
+    {"at": "03:00", "volume_l": 1.0, "max_s": sensor_params.DOSE_MAX_S + 1},
+    {"at": "03:00", "volume_l": 1.0, "max_s": -1},
+])
+def test_schedule_rejects_doses_beyond_safety_cutoff(entry, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        control_task.set_pump_schedule([entry])
+
+
+def test_dose_never_exceeds_safety_cutoff(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sensor_params, "DOSE_MAX_S", 1)
+    t0 = time.monotonic()
+    result = asyncio.run(dosing.dose(duration_s=600))
+    assert result == dosing.OK
+    assert time.monotonic() - t0 < 3
+    assert not relays.pump_is_on()
+    assert list(dosing.history())[-1][3] <= 1
+
+
+def test_schedule_days_match_the_lcd():
+    # Inoculación a las 23:00: la mañana siguiente sigue siendo el día 1.
+    origin = calendar.timegm((2026, 10, 17, 23, 0, 0, 0, 0, 0))
+    sched = PumpSchedule()
+    sched.set([{"at": "08:00", "days": [1, 1], "duration_s": 60},
+               {"at": "09:00", "days": [2, 2], "duration_s": 60}])
+
+    at, entry = sched.next_fire(origin + 60, origin)
+    assert entry["at"] == "08:00" and at == origin + 9 * 3600
+    assert inoculation_day(at, origin) == 1
+
+    at, entry = sched.next_fire(origin + 9 * 3600, origin)
+    assert entry["at"] == "09:00" and at == origin + 34 * 3600
+    assert inoculation_day(at, origin) == 2
+
+    assert sched.next_fire(origin + 34 * 3600, origin) is None
@@ -0,0 +1,109 @@
+# sim/test_log_sinks.py
+#
+#   python -m pytest sim
+
+import importlib
+import socket
+
+import pytest
+
+import env
+
+env.install()
+
+import uasyncio as asyncio  # noqa: E402
+from utils import logger  # noqa: E402
+from utils.log_sinks import UdpSyslogSink  # noqa: E402
+
+
+@pytest.fixture
+def collector():
+    """Colector syslog local en un puerto libre."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("127.0.0.1", 0))
+    s.setblocking(False)
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def lg(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    lg = importlib.reload(logger)
+    lg._sinks = []
+    yield lg
+    importlib.reload(logger)
+
+
+def _deliver(sink, collector, n, timeout_ms=1000):
+    """Ejecuta `sink.run()` hasta recibir `n` datagramas (o agotar el plazo)."""
+    async def main():
+        task = asyncio.create_task(sink.run())
+        got = []
+        for _ in range(timeout_ms // 10):
+            try:
+                got.append(collector.recv(512))
+            except BlockingIOError:
+                pass
+            if len(got) >= n and not sink._q:
+                break
+            await asyncio.sleep_ms(10)
+        task.cancel()
+        return got
+
+    return asyncio.run(main())
+
+
+def test_syslog_sink_filters_by_its_own_level(lg, collector):
+    port = collector.getsockname()[1]
+    sink = UdpSyslogSink("127.0.0.1", port, lg.level_num("WARNING"))
+    lg.add_sink(sink)
+    lg.info("Bomba encendida")
+    lg.warning("Nivel bajo: %d mm", 120)
+    lg.error("Sonda RS485 sin respuesta")
+    lg.debug("detalle")
+
+    got = _deliver(sink, collector, 2)
+    assert len(got) == 2
+    assert got[0].startswith(b"<132>bioreactor: [")
+    assert got[0].endswith(b"[WARNING] Nivel bajo: 120 mm")
+    assert got[1].startswith(b"<131>bioreactor: [")
+    assert got[1].endswith(b"[ERROR] Sonda RS485 sin respuesta")
+    assert sink.stats["records"] == 2 and sink.stats["sent"] == 2
+    # La flash guarda todo con su propio nivel.
+    assert lg.sinks()["flash"]["records"] == 4
+
+
+def test_syslog_info_priority(lg, collector):
+    sink = UdpSyslogSink("127.0.0.1", collector.getsockname()[1])
+    lg.add_sink(sink)
+    lg.info("Bomba encendida")
+    got = _deliver(sink, collector, 1)
+    assert len(got) == 1 and got[0].startswith(b"<134>bioreactor: [")
+
+
+def test_queue_drops_oldest_when_full(lg, collector):
+    sink = UdpSyslogSink("127.0.0.1", collector.getsockname()[1], maxlen=3)
+    lg.add_sink(sink)
+    # Sin la corrutina en marcha (p. ej. WiFi aún sin levantar) la cola se llena.
+    for i in range(5):
+        lg.info(f"Evento {i}")
+    assert sink.info()["queued"] == 3
+    assert sink.stats["dropped"] == 2
+
+    got = _deliver(sink, collector, 3)
+    assert [g.rsplit(b" ", 1)[1] for g in got] == [b"2", b"3", b"4"]
+    assert sink.info()["queued"] == 0
+
+
+def test_flash_level_is_independent(lg, collector):
+    sink = UdpSyslogSink("127.0.0.1", collector.getsockname()[1])
+    lg.add_sink(sink)
+    lg.set_sink_level("flash", "WARNING")
+    lg.info("Solo por syslog")
+    lg.warning("En ambos")
+    lg.flush()
+    with open("event.log", "rb") as f:
+        flash = f.read()
+    assert b"Solo por syslog" not in flash and b"En ambos" in flash
+    assert len(_deliver(sink, collector, 2)) == 2
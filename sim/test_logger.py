@@ -0,0 +1,228 @@
+# sim/test_logger.py
+#
+#   python -m pytest sim
+
+import calendar
+import importlib
+import os
+import struct
+import sys
+import time
+
+import pytest
+
+import env
+
+env.install()
+sys.path.insert(0, os.path.join(env.REPO_DIR, "tools"))
+
+import logq  # noqa: E402
+from utils import log_index  # noqa: E402
+from utils import logger  # noqa: E402
+
+DEVICE_EPOCH = calendar.timegm((2000, 1, 1, 0, 0, 0, 0, 0, 0))
+T0 = calendar.timegm((2026, 10, 17, 8, 0, 0, 0, 0, 0))
+
+
+def _write_device_segments(d, segments=3, records=100):
+    """Segmentos como los deja la placa: marcas de tiempo del RTC en las
+    líneas y `time.time()` del ESP32 (desde 2000) en el índice."""
+    t = T0
+    for i in range(segments - 1, -1, -1):
+        path = log_index.segment_path(os.path.join(d, "event.log"), i)
+        data = bytearray()
+        idx = bytearray()
+        for n in range(records):
+            if n % log_index.EVERY == 0:
+                idx += struct.pack(log_index.ENTRY, t - DEVICE_EPOCH, len(data), n)
+            level = "WARNING" if n % 10 == 0 else "INFO"
+            data += ("[%s][%s] registro %d\n" % (log_index.stamp(t), level, t - T0)).encode()
+            t += 60
+        if i:
+            idx += struct.pack(log_index.ENTRY, t - 60 - DEVICE_EPOCH, len(data), records)
+        with open(path, "wb") as f:
+            f.write(data)
+        with open(log_index.index_path(path), "wb") as f:
+            f.write(idx)
+
+
+def _lines(out):
+    return [line for line in out.split(b"\n") if line]
+
+
+def test_logq_range_uses_device_epoch(tmp_path, capsysbinary):
+    _write_device_segments(str(tmp_path))
+    # Segundo registro del segmento más antiguo (event.log.2), ya cerrado.
+    assert logq.main([str(tmp_path), "--from", "2026-10-17 08:01",
+                      "--to", "2026-10-17 08:03"]) == 0
+    lines = _lines(capsysbinary.readouterr().out)
+    assert lines == [b"[2026-10-17 08:01:00][INFO] registro 60",
+                     b"[2026-10-17 08:02:00][INFO] registro 120",
+                     b"[2026-10-17 08:03:00][INFO] registro 180"]
+
+    # Rango que cruza de event.log.1 a event.log, solo WARNING.
+    logq.main([str(tmp_path), "--from", "2026-10-17 11:00",
+               "--to", "2026-10-17 12:00", "--level", "WARNING"])
+    lines = _lines(capsysbinary.readouterr().out)
+    assert len(lines) == 7
+    assert lines[0].startswith(b"[2026-10-17 11:00:00][WARNING]")
+    assert lines[-1].startswith(b"[2026-10-17 12:00:00][WARNING]")
+
+
+def test_logq_segments_show_rtc_dates(tmp_path, capsysbinary):
+    _write_device_segments(str(tmp_path))
+    logq.main([str(tmp_path), "--segments"])
+    rows = _lines(capsysbinary.readouterr().out)
+    assert len(rows) == 3
+    assert b"2026-10-17 11:20:00 .. (en curso)" in rows[0]
+    assert b"2026-10-17 09:40:00 .. 2026-10-17 11:19:00  100 registros" in rows[1]
+    assert b"2026-10-17 08:00:00 .. 2026-10-17 09:39:00  100 registros" in rows[2]
+
+
+class _Clock:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def board_log(tmp_path, monkeypatch):
+    """Logger recién arrancado sobre una flash vacía, con segmentos de
+    4 KB, sin consola ni límite por plantilla y reloj controlado."""
+    monkeypatch.chdir(tmp_path)
+    clock = _Clock(calendar.timegm((2026, 10, 17, 8, 0, 0, 0, 0, 0)))
+    monkeypatch.setattr(time, "time", clock)
+
+    def boot(rate_limit=False):
+        lg = importlib.reload(logger)
+        lg._MAX_SIZE_BYTES = 4096
+        lg._sinks = []
+        if not rate_limit:
+            lg._allow = lambda key, now: True
+        return lg
+
+    yield boot, clock
+    importlib.reload(logger)
+
+
+def _fill(lg, clock, n, step=10):
+    for i in range(n):
+        lg.info("registro %d", clock.t)
+        clock.t += step
+
+
+def test_rotation_after_reboot_closes_segment_with_real_time(board_log):
+    boot, clock = board_log
+    lg = boot()
+    t_start = clock.t
+    # Casi lleno: el primer registro tras el reinicio provoca la rotación.
+    while True:
+        _fill(lg, clock, 1)
+        lg.flush()
+        if lg._file_size > 4096 - 60:
+            break
+    written = lg._seg_count
+
+    lg = boot()
+    _fill(lg, clock, 1)
+    lg.flush()
+
+    entries = log_index.read_index("event.log.1")
+    assert entries[-1][0] >= clock.t - 10
+    assert entries[-1][1:] == (os.stat("event.log.1")[6], written)
+    got = list(lg.between(t_start, clock.t))
+    assert len(got) == written + 1
+
+
+def test_between_across_segments(board_log):
+    boot, clock = board_log
+    lg = boot()
+    t_start = clock.t
+    _fill(lg, clock, 300)
+    segs = lg.segments()
+    assert len(segs) >= 4
+    assert sum(s["records"] for s in segs) == 300
+
+    # Del registro 50 al 249 (inclusive), a caballo entre varios segmentos.
+    t0, t1 = t_start + 50 * 10, t_start + 249 * 10
+    got = [line for _, line in lg.between(t0, t1)]
+    assert len(got) == 200
+    assert got[0].endswith(b"registro %d" % t0)
+    assert got[-1].endswith(b"registro %d" % t1)
+
+
+def test_reboot_keeps_record_count_of_current_segment(board_log):
+    boot, clock = board_log
+    lg = boot()
+    _fill(lg, clock, 40)
+    lg.flush()
+    count = lg._seg_count
+    lg = boot()
+    lg.segments()
+    assert lg._seg_count == count
+
+
+def test_ring_cut_keeps_utf8_characters(board_log):
+    boot, clock = board_log
+    lg = boot()
+    head = len("[2026-10-17 08:00:00][INFO] ")
+    for pad in range(lg._RING_SLOT - head - 4, lg._RING_SLOT - head + 2):
+        lg.info("a" * pad + "ó" * 4)
+        (_, _, line), = lg.tail(lg.last_seq() - 1)
+        assert len(line) <= lg._RING_SLOT
+        assert line.decode().startswith("[2026-10-17 08:00:00][INFO] aaa")
+
+
+def test_storm_bucket_survives_eviction(board_log):
+    boot, clock = board_log
+    lg = boot(rate_limit=True)
+    for i in range(lg._BUCKET_BURST):
+        lg.warning("Sonda %d sin respuesta", i)
+    # Plantillas distintas (f-strings) hasta llenar la tabla de cubos.
+    for i in range(2 * lg._BUCKETS_MAX):
+        lg.info(f"Evento {i}")
+    assert len(lg._buckets) <= lg._BUCKETS_MAX
+    assert "Sonda %d sin respuesta" in lg._buckets
+
+    limited = lg.stats["rate_limited"]
+    lg.warning("Sonda %d sin respuesta", 99)
+    assert lg.stats["rate_limited"] == limited + 1
+
+
+def test_tail_stops_at_request_snapshot(board_log):
+    boot, clock = board_log
+    lg = boot()
+    _fill(lg, clock, 10)
+    upto = lg.last_seq()
+    gen = lg.tail(0, 0, upto)
+    first = next(gen)
+    _fill(lg, clock, 5)          # registros llegados mientras se envía la respuesta
+    got = [first] + list(gen)
+    assert [seq for seq, _, _ in got] == list(range(1, 11))
+
+    # Si el anillo da la vuelta entre medias, el generador se detiene en
+    # lugar de devolver registros nuevos con secuencias viejas.
+    upto = lg.last_seq()
+    gen = lg.tail(upto - 5, 0, upto)
+    next(gen)
+    _fill(lg, clock, lg._RING_N)
+    assert list(gen) == []
+
+
+def test_unix_offset_follows_board_epoch(monkeypatch):
+    assert log_index.UNIX_OFFSET == 0                 # simulador: time.time() de CPython
+    monkeypatch.setattr(log_index, "_gmtime", lambda t: time.gmtime(t + DEVICE_EPOCH))
+    assert log_index._unix_offset() == DEVICE_EPOCH   # ESP32: desde 2000-01-01
+
+
+def test_error_storm_with_varying_text_shares_one_bucket(board_log):
+    boot, clock = board_log
+    lg = boot(rate_limit=True)
+    # Como rs485_level: el texto de la excepción cambia en cada fallo.
+    for i in range(50):
+        lg.error("Error en transacción RS485: %s", OSError(110 + i))
+    assert lg.stats["records"] == lg._BUCKET_BURST
+    assert lg.stats["rate_limited"] == 50 - lg._BUCKET_BURST
+    assert len(lg._buckets) == 1
@@ -0,0 +1,63 @@
+# sim/test_rs485.py
+#
+#   python -m pytest sim
+
+import env
+
+env.install()
+
+import uasyncio as asyncio  # noqa: E402
+from board import board  # noqa: E402
+from devices import ModbusSlave, RS485Bus  # noqa: E402
+from machine import Pin, UART  # noqa: E402
+from utils.drivers.rs485 import RS485  # noqa: E402
+from utils.modbus import ModbusClient, ModbusError  # noqa: E402
+
+_UART = 7
+_DE = 40
+
+
+async def _watch_de(seen, stop):
+    # Cualquier otra tarea (y sus secciones síncronas) corre entre dos
+    # `await`: si alguna ve DE/RE en alto, el bus puede seguir ocupado
+    # cuando responde el esclavo.
+    while not stop:
+        seen.append(board.pin_value(_DE))
+        await asyncio.sleep_ms(0)
+
+
+def test_de_never_held_across_a_yield():
+    # Solo se comprueban invariantes del driver, no tiempos de reloj: DE/RE
+    # cae sin ceder el bucle entre medias y nunca antes del último bit, así
+    # que ninguna tarea puede retrasarlo hasta la respuesta de un esclavo
+    # rápido (3.5 caracteres). La latencia holgada del esclavo evita que
+    # un proceso del host sin CPU pierda bytes en la simulación.
+    slave = ModbusSlave(1, {4: 1234}, de_pin=_DE, latency_ms=50)
+    board.uart_peers[_UART] = RS485Bus(slave, de_pin=_DE)
+    uart = UART(_UART, baudrate=9600)
+    bus = RS485(uart, Pin(_DE, Pin.OUT), baudrate=9600)
+    client = ModbusClient(bus, timeout_ms=100)
+    lost = board.stats["rs485_lost_bytes"]
+
+    async def main():
+        seen, stop = [], []
+        watcher = asyncio.create_task(_watch_de(seen, stop))
+        got, released = [], []
+        for _ in range(10):
+            try:
+                got.append(await client.read_holding(1, 4))
+            except ModbusError as e:
+                got.append(e)
+            # DE/RE cae justo al terminar la trama, nunca antes.
+            released.append(board.pin_changed[_DE] - uart._tx_end)
+            await asyncio.sleep_ms(1)
+        stop.append(1)
+        await watcher
+        return got, seen, released
+
+    got, seen, released = asyncio.run(main())
+    assert seen and not any(seen)
+    assert min(released) >= 0
+    assert board.stats["rs485_lost_bytes"] == lost
+    assert got == [[1234]] * 10
+    assert not board.pin_value(_DE)
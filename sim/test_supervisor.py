@@ -0,0 +1,33 @@
+# sim/test_supervisor.py
+#
+#   python -m pytest sim
+
+import env
+
+env.install()
+
+import uasyncio as asyncio  # noqa: E402
+from utils import supervisor as sv  # noqa: E402
+
+
+def test_critical_task_that_returns_is_restarted(monkeypatch):
+    monkeypatch.setattr(sv, "_BACKOFF_MIN_MS", 5)
+    monkeypatch.setattr(sv, "_BACKOFF_MAX_MS", 5)
+    sup = sv.Supervisor()
+    runs = []
+
+    async def no_sources(watch):
+        runs.append(1)          # como sensor_task._loop sin fuentes registradas
+
+    async def main():
+        w = sup.spawn("sensor", no_sources, stall_s=90)
+        b = sup.spawn("button", no_sources, critical=False)
+        await asyncio.sleep_ms(100)
+        return w, b
+
+    w, b = asyncio.run(main())
+    assert b.state == sv.DONE
+    assert w.state == sv.RESTARTING and w.restarts > sv._MAX_FAILS
+    assert w.last_error == "terminó"
+    # Deja de alimentar el WDT: la placa se reinicia.
+    assert not sup.check()
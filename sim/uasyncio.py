@@ -0,0 +1,136 @@
+# sim/uasyncio.py
+#
+# Capa `uasyncio` -> `asyncio` de CPython. Añade lo que MicroPython tiene
+# y CPython no (sleep_ms, wait_for_ms, ThreadSafeFlag, streams sobre UART)
+# y permite acotar la duración de `run()` para las simulaciones.
+
+import asyncio as _a
+from asyncio import *  # noqa: F401,F403
+from asyncio import (CancelledError, Event, TimeoutError,  # noqa: F401
+                     create_task, gather, get_running_loop, sleep, wait_for)
+
+# Configurable desde sim/run.py y sim/bench.py.
+run_for = None          # segundos; None = indefinido
+hooks = []              # corrutinas (sin argumentos) a lanzar junto a main
+
+_STOPPED = object()
+
+
+async def sleep_ms(ms):
+    await sleep(ms / 1000)
+
+
+async def wait_for_ms(aw, timeout):
+    return await wait_for(aw, timeout / 1000)
+
+
+async def _bounded(main):
+    for hook in hooks:
+        create_task(hook())
+    if run_for is None:
+        return await main
+    try:
+        return await wait_for(main, run_for)
+    except TimeoutError:
+        return _STOPPED
+
+
+def run(main):
+    """Como `asyncio.run`; al agotar `run_for` simula un Ctrl-C."""
+    result = _a.run(_bounded(main))
+    if result is _STOPPED:
+        raise KeyboardInterrupt
+    return result
+
+
+def get_event_loop(runq_len=0, waitq_len=0):
+    try:
+        return _a.get_running_loop()
+    except RuntimeError:
+        return _a.new_event_loop()
+
+
+class ThreadSafeFlag:
+    """Bandera que se puede activar desde una IRQ (otro hilo en el host)."""
+
+    def __init__(self):
+        self._pending = False
+        self._event = None
+        self._loop = None
+
+    def set(self):
+        if self._loop is None:
+            self._pending = True
+        else:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    def clear(self):
+        self._pending = False
+        if self._event is not None:
+            self._event.clear()
+
+    async def wait(self):
+        if self._event is None:
+            self._loop = get_running_loop()
+            self._event = Event()
+            if self._pending:
+                self._pending = False
+                self._event.set()
+        await self._event.wait()
+        self._event.clear()
+
+
+class StreamReader:
+    """Stream sobre un objeto tipo UART (`any`/`read`/`write`).
+
+    En el dispositivo el poller de uasyncio despierta la tarea cuando hay
+    bytes; aquí se sondea `any()` cada milisegundo, que es equivalente a
+    efectos de latencia.
+    """
+
+    def __init__(self, s, e=None):
+        self.s = s
+        self.e = e
+
+    async def read(self, n=-1):
+        while True:
+            avail = self.s.any()
+            if avail:
+                return self.s.read(avail if n < 0 else min(n, avail))
+            await sleep_ms(1)
+
+    async def readinto(self, buf):
+        data = await self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    async def readexactly(self, n):
+        out = b""
+        while len(out) < n:
+            out += await self.read(n - len(out))
+        return out
+
+    async def readline(self):
+        out = b""
+        while not out.endswith(b"\n"):
+            out += await self.read(1)
+        return out
+
+    def write(self, buf):
+        self.s.write(buf)
+
+    async def drain(self):
+        pass
+
+    async def awrite(self, buf, off=0, sz=-1):
+        self.s.write(buf[off:] if sz < 0 else buf[off:off + sz])
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+StreamWriter = StreamReader
+Stream = StreamReader
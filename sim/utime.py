@@ -0,0 +1,7 @@
+# sim/utime.py
+#
+# `env.install()` ya añade las extensiones de MicroPython al `time` del
+# host; `utime` es simplemente un alias.
+
+from time import *  # noqa: F401,F403
+from time import sleep_ms, sleep_us, ticks_ms, ticks_us, ticks_diff, ticks_add  # noqa: F401
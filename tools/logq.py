@@ -0,0 +1,87 @@
+# tools/logq.py
+#
+# Consulta los logs copiados de la placa (event.log, event.log.1 ... y sus
+# .idx) usando el índice de cada segmento:
+#
+#   python tools/logq.py ./logs --segments
+#   python tools/logq.py ./logs --from "2026-10-17 08:00" --to "2026-10-17 09:00" --level WARNING
+#
+# Las fechas se interpretan como la hora del RTC de la placa. El índice
+# guarda `time.time()` de la placa, que en el ESP32 cuenta desde
+# 2000-01-01 (`--epoch 1970` para logs del simulador).
+
+import argparse
+import calendar
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "device"))
+
+from utils import log_index  # noqa: E402
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+SEGMENTS = 5
+INDEX_MAX = 2 ** 32 - 1
+
+
+def _epoch(text):
+    """Fecha del RTC -> segundos desde 1970."""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(text, fmt))
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError("fecha no válida: %s" % text)
+
+
+def epoch_offset(year):
+    """Segundos de 1970 al origen de `time.time()` de la placa."""
+    return calendar.timegm((year, 1, 1, 0, 0, 0, 0, 0, 0))
+
+
+def _show_segments(base, offset):
+    for i in range(SEGMENTS):
+        path = log_index.segment_path(base, i)
+        if not os.path.exists(path):
+            break
+        size = os.path.getsize(path)
+        entries = log_index.read_index(path)
+        first = log_index.stamp(entries[0][0] + offset) if entries else "-"
+        if log_index.closed(entries, size):
+            last, records = log_index.stamp(entries[-1][0] + offset), entries[-1][2]
+        else:
+            last, records = "(en curso)", "?"
+        print("%-14s %7d bytes  %3d entradas  %s .. %s  %s registros" % (
+            os.path.basename(path), size, len(entries), first, last, records))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Consulta por rango de tiempo de los logs de la placa")
+    ap.add_argument("dir", help="directorio con event.log y sus segmentos")
+    ap.add_argument("--from", dest="t0", type=_epoch)
+    ap.add_argument("--to", dest="t1", type=_epoch)
+    ap.add_argument("--level", default="DEBUG", choices=sorted(LEVELS))
+    ap.add_argument("--segments", action="store_true", help="resumen de los segmentos")
+    ap.add_argument("--epoch", type=int, default=2000, choices=(1970, 2000),
+                    help="año de origen de time.time() en la placa (2000 en el ESP32)")
+    args = ap.parse_args(argv)
+
+    offset = epoch_offset(args.epoch)
+    base = os.path.join(args.dir, "event.log")
+    if args.segments:
+        _show_segments(base, offset)
+        return 0
+    # Rango en la época de la placa, como el índice.
+    t0 = 0 if args.t0 is None else max(0, args.t0 - offset)
+    t1 = INDEX_MAX if args.t1 is None else min(INDEX_MAX, args.t1 - offset)
+    if t1 < t0:
+        return 0
+    out = sys.stdout.buffer
+    for _, line in log_index.query(base, SEGMENTS, t0, t1, LEVELS, LEVELS[args.level], offset):
+        out.write(line + b"\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
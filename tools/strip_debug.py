@@ -0,0 +1,79 @@
+# tools/strip_debug.py
+#
+# Elimina las llamadas a DEBUG del firmware antes de empaquetarlo:
+#
+#   python tools/strip_debug.py device
+#
+# Cada sentencia `debug(...)` o `<logger>.debug(...)` se sustituye por
+# `pass` con la misma sangría y sus líneas de continuación quedan en
+# blanco, de modo que los números de línea de las trazas no cambian.
+# Los argumentos dejan de evaluarse y el .py/.mpy resultante no los
+# contiene. Se ejecuta en el workflow de release sobre la copia del CI.
+
+import argparse
+import ast
+import os
+import sys
+
+_SKIP = {"microdot.py"}
+
+
+def _is_debug_call(node):
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return False
+    func = node.value.func
+    if isinstance(func, ast.Name):
+        return func.id == "debug"
+    return isinstance(func, ast.Attribute) and func.attr == "debug"
+
+
+def strip(source):
+    """Devuelve (código sin DEBUG, número de llamadas eliminadas)."""
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    removed = 0
+    for node in ast.walk(tree):
+        if not _is_debug_call(node):
+            continue
+        first, last = node.lineno - 1, node.end_lineno - 1
+        head = lines[first]
+        # Solo sentencias que ocupan sus líneas completas (nada de `x; debug()`).
+        if head[:node.col_offset].strip() or lines[last][node.end_col_offset:].strip():
+            continue
+        eol = "\n" if head.endswith("\n") else ""
+        lines[first] = head[:node.col_offset] + "pass" + eol
+        for i in range(first + 1, last + 1):
+            lines[i] = "\n"
+        removed += 1
+    return "".join(lines), removed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Quita las llamadas debug() del firmware")
+    ap.add_argument("root", help="directorio del firmware (p. ej. device)")
+    ap.add_argument("--check", action="store_true",
+                    help="solo informa, sin reescribir los archivos")
+    args = ap.parse_args(argv)
+
+    total = 0
+    for dirpath, _, files in os.walk(args.root):
+        for name in sorted(files):
+            if not name.endswith(".py") or name in _SKIP:
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, encoding="utf-8") as f:
+                source = f.read()
+            out, removed = strip(source)
+            if not removed:
+                continue
+            compile(out, path, "exec")
+            total += removed
+            print("%s: %d llamadas debug eliminadas" % (path, removed))
+            if not args.check:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(out)
+    print("Total: %d" % total)
+
+
+if __name__ == "__main__":
+    sys.exit(main())